@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+import ccxt.async_support as ccxt_async
+
+from exchanges import binance_api_key, binance_api_secret, coinone_api_key, coinone_api_secret, upbit_api_key, upbit_api_secret
+from snapshot import Quote, build_premium_snapshot
+
+
+# Constructor arguments for the async clients, keyed by venue name.
+VENUE_CONFIGS = {
+    'binance': (ccxt_async.binance, binance_api_key, binance_api_secret),
+    'coinone': (ccxt_async.coinone, coinone_api_key, coinone_api_secret),
+    'upbit': (ccxt_async.upbit, upbit_api_key, upbit_api_secret),
+}
+
+# Maximum number of in-flight requests per venue.
+VENUE_CONCURRENCY = {
+    'binance': 20,
+    'coinone': 8,
+    'upbit': 8,
+}
+
+
+class AsyncScanner:
+    def __init__(self, concurrency=None):
+        """
+        Runs premium scans on ccxt.async_support clients inside one long-lived event loop.
+
+        Each venue gets a single client (and therefore a single HTTP session) and a semaphore
+        bounding its in-flight requests. Synchronous code calls in through `run`.
+
+        :param concurrency: Optional overrides of `VENUE_CONCURRENCY`.
+        """
+        self.concurrency = dict(VENUE_CONCURRENCY, **(concurrency or {}))
+        self.exchanges = {}
+        self.semaphores = {}
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine on the scanner loop from synchronous code and wait for its result.
+
+        :param coro: The coroutine to run.
+        :param timeout: Optional timeout in seconds.
+        :return: The coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def _exchange(self, venue):
+        # Only called on the loop thread, so no locking is needed.
+        if venue not in self.exchanges:
+            exchange_class, api_key, api_secret = VENUE_CONFIGS[venue]
+            exchange = exchange_class({
+                'apiKey': api_key,
+                'secret': api_secret,
+                'enableRateLimit': True,
+            })
+            exchange.options['adjustForTimeDifference'] = True
+            self.exchanges[venue] = exchange
+            self.semaphores[venue] = asyncio.Semaphore(
+                self.concurrency.get(venue, 4))
+        return self.exchanges[venue]
+
+    async def call(self, venue, method, *args, **kwargs):
+        """
+        Call a client method while holding the venue's semaphore.
+
+        :param venue: The venue name (e.g., 'coinone').
+        :param method: The ccxt method name (e.g., 'fetch_tickers').
+        :return: The method's result.
+        """
+        exchange = self._exchange(venue)
+        async with self.semaphores[venue]:
+            return await getattr(exchange, method)(*args, **kwargs)
+
+    async def fetch_quotes(self, venue, quote, symbols=None):
+        """
+        Fetch every ticker quoted in `quote` on a venue.
+
+        Uses one bulk request when the venue supports it, otherwise fetches `symbols`
+        individually within the venue's concurrency bound.
+
+        :param venue: The venue name (e.g., 'coinone').
+        :param quote: The quote currency to keep (e.g., 'KRW').
+        :param symbols: Base currencies to fetch when no bulk endpoint exists.
+        :return: A dictionary mapping base currencies to `Quote` tuples.
+        """
+        exchange = self._exchange(venue)
+        suffix = '/' + quote
+
+        if exchange.has.get('fetchTickers'):
+            tickers = await self.call(venue, 'fetch_tickers')
+        else:
+            pairs = [symbol.split('/')[0] + suffix for symbol in symbols or []]
+            results = await asyncio.gather(
+                *(self.call(venue, 'fetch_ticker', pair) for pair in pairs), return_exceptions=True)
+            tickers = {pair: ticker for pair, ticker in zip(pairs, results)
+                       if not isinstance(ticker, Exception)}
+
+        return {symbol[:-len(suffix)]: Quote(ticker['last'], ticker['bid'], ticker['ask'])
+                for symbol, ticker in tickers.items() if symbol.endswith(suffix)}
+
+    async def take_premium_snapshot(self, fx_rate, ex_a='coinone', ex_b='binance', symbols=None):
+        """
+        Fetch both venues concurrently so a scan costs a single round-trip window.
+
+        :param fx_rate: The exchange rate from USDT to KRW.
+        :param ex_a: The KRW venue name.
+        :param ex_b: The USDT venue name.
+        :param symbols: Base currencies to fetch on venues without a bulk endpoint.
+        :return: A `PremiumSnapshot`.
+        """
+        krw_quotes, usdt_quotes = await asyncio.gather(
+            self.fetch_quotes(ex_a, 'KRW', symbols),
+            self.fetch_quotes(ex_b, 'USDT', symbols))
+
+        return build_premium_snapshot(fx_rate, krw_quotes, usdt_quotes)
+
+    async def _close(self):
+        for exchange in self.exchanges.values():
+            await exchange.close()
+        self.exchanges.clear()
+
+    def close(self):
+        """
+        Close every venue session and stop the event loop.
+        """
+        self.run(self._close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+
+def get_async_scanner():
+    """
+    :return: The process-wide `AsyncScanner`, started on first use.
+    """
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = AsyncScanner()
+        return _scanner
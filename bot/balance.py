@@ -1,23 +1,27 @@
 import time
 from decimal import Decimal, ROUND_DOWN
 from fetch_data import *
+from ledger import portfolio_ledger
+from transfer_monitor import UNCERTAIN, normalize_coinone_transaction, transfer_monitor
+from routes import BINANCE_TO_COINONE, route_table
 
 
 def fetch_balance(exchange, currency):
     """
     Check the balance of a specified currency on the given exchange.
 
+    Reads the portfolio ledger, which fetches the account from the exchange only when it is uncertain.
+
     :param exchange: The ccxt exchange instance.
     :param currency: The currency to check balance for (e.g., 'BTC', 'KRW').
     :return: The balance of the specified currency.
     """
     try:
-        # Load the balances from the exchange
-        balance = exchange.fetch_balance()
+        balance = portfolio_ledger.balance(exchange, currency)
 
         # Check if the specified currency is in the balance
-        if currency in balance['total']:
-            return balance['total'][currency]
+        if balance is not None:
+            return float(balance)
         else:
             print(
                 f"Error: Currency {currency} is not available in the balance.")
@@ -35,12 +39,12 @@ def fetch_all_balances(exchange):
     :return: A dictionary with currencies and their respective balances.
     """
     try:
-        # Fetch all balances
-        balance = exchange.fetch_balance()
+        # Read all balances from the ledger
+        balances = portfolio_ledger.balances(exchange)
 
         # Filter out only the non-zero balances
-        non_zero_balances = {currency: balance['total'][currency]
-                             for currency in balance['total'] if balance['total'][currency] > 0}
+        non_zero_balances = {currency: float(total)
+                             for currency, total in balances.items() if total > 0}
 
         return non_zero_balances
     except Exception as e:
@@ -63,12 +67,14 @@ def transfer_usdt(exchange, from_account, to_account, amount):
             'amount': amount,
             'type': 1  # 1: transfer from spot to futures
         })
+        portfolio_ledger.apply_transfer(exchange, exchange, 'USDT', amount, 'spot', 'future')
     elif from_account == 'future' and to_account == 'spot':
         exchange.sapi_post_futures_transfer({
             'asset': 'USDT',
             'amount': amount,
             'type': 2  # 2: transfer from futures to spot
         })
+        portfolio_ledger.apply_transfer(exchange, exchange, 'USDT', amount, 'future', 'spot')
 
 
 def adjust_balances_to_leverage(spot_exchange, futures_exchange, leverage):
@@ -115,13 +121,14 @@ def transfer_to_master(exchange, master_exchange, currency, amount):
             'amount': float(amount)
         })
         print(f"Transfer to master account successful: {transfer}")
+        portfolio_ledger.apply_transfer(exchange, master_exchange, currency, amount)
         return transfer
     except Exception as e:
         print(f"An error occurred during transfer: {e}")
         return None
 
 
-def withdraw(exchange, master_exchange, currency, percentage, address, tag=None, network=None):
+def withdraw(exchange, master_exchange, currency, percentage, address, tag=None, network=None, amount=None):
     """
     Withdraws a specified percentage of a currency to a given address, optionally specifying a network.
 
@@ -131,6 +138,7 @@ def withdraw(exchange, master_exchange, currency, percentage, address, tag=None,
     :param address: The address to withdraw to.
     :param tag: An optional tag or memo for the withdrawal.
     :param network: An optional network to specify for the withdrawal.
+    :param amount: A fixed amount to withdraw instead of the percentage, capped at the balance.
     :return: The withdrawal details if successful, None otherwise.
     """
     try:
@@ -142,15 +150,21 @@ def withdraw(exchange, master_exchange, currency, percentage, address, tag=None,
         print(f"Sub-account Balance: {balance} {currency}")
 
         # Calculate the amount to withdraw based on the specified percentage of the balance
-        amount = Decimal(balance) * Decimal(percentage) / Decimal(100)
+        if amount is None:
+            amount = Decimal(balance) * Decimal(percentage) / Decimal(100)
+        else:
+            amount = min(Decimal(str(amount)), Decimal(balance))
 
-        # Fetch the withdraw integer multiple for the currency and network
-        withdraw_integer_multiple = get_withdraw_integer_multiple(
-            exchange, currency, network)
-        if withdraw_integer_multiple is None:
+        # Look up the withdraw integer multiple for the currency and network in the route table
+        route = route_table.get(currency, BINANCE_TO_COINONE)
+        if route is None or route.network != network or route.withdraw_step is None:
             print(
                 f"Error: Unable to fetch withdraw integer multiple for currency {currency} on network {network}.")
             return None
+        if not route.withdraw_enabled:
+            print(f"Error: Withdrawal of {currency} on network {network} is disabled.")
+            return None
+        withdraw_integer_multiple = route.withdraw_step
 
         print(withdraw_integer_multiple)
         print("amount", float(amount))
@@ -161,6 +175,10 @@ def withdraw(exchange, master_exchange, currency, percentage, address, tag=None,
 
         print("amount", float(amount))
 
+        if route.withdraw_min is not None and amount < route.withdraw_min:
+            print(f"Error: Amount {amount} is less than the minimum withdrawal {route.withdraw_min}.")
+            return None
+
         # Transfer the amount to the master account
         transfer_result = transfer_to_master(
             exchange, master_exchange, currency, amount)
@@ -181,12 +199,86 @@ def withdraw(exchange, master_exchange, currency, percentage, address, tag=None,
                 currency, float(amount), address, params=params)
 
         print(f"Withdrawal request successful: {withdrawal}")
+        portfolio_ledger.apply_withdrawal(master_exchange, currency, amount)
+        return withdrawal
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return None
+
+
+def withdraw_amount(exchange, currency, amount, address, tag=None, network=None):
+    """
+    Withdraws a fixed amount of a currency directly from the given account.
+
+    :param exchange: The ccxt exchange instance to withdraw from (e.g., ccxt.coinone()).
+    :param currency: The currency to withdraw (e.g., 'XRP').
+    :param amount: The amount to withdraw.
+    :param address: The address to withdraw to.
+    :param tag: An optional tag or memo for the withdrawal.
+    :param network: An optional network to specify for the withdrawal.
+    :return: The withdrawal details if successful, None otherwise.
+    """
+    try:
+        if exchange.id == 'coinone':
+            withdrawal = coinone_withdraw(exchange, currency, amount, address, tag)
+        else:
+            params = {}
+            if network:
+                params['network'] = network
+
+            withdrawal = exchange.withdraw(currency, float(amount), address, tag, params=params)
+
+        print(f"Withdrawal request successful: {withdrawal}")
+        portfolio_ledger.apply_withdrawal(exchange, currency, amount)
         return withdrawal
     except Exception as e:
         print(f"An error occurred: {e}")
         return None
 
 
+def coinone_withdraw(exchange, currency, amount, address, tag=None):
+    """
+    Withdraws through Coinone's v2.1 coin withdrawal endpoint, which ccxt does not wrap.
+
+    The address must be registered in the Coinone withdrawal address book.
+
+    :param exchange: The Coinone exchange instance.
+    :param currency: The currency to withdraw (e.g., 'XRP').
+    :param amount: The amount to withdraw.
+    :param address: The address to withdraw to.
+    :param tag: An optional destination tag or memo.
+    :return: The withdrawal in the transfer monitor's format, with the Coinone transaction ID as 'id'.
+    """
+    params = {
+        'currency': currency,
+        'amount': str(amount),
+        'address': address,
+    }
+    if tag:
+        params['secondary_address'] = tag
+
+    response = exchange.request('transaction/coin/withdrawal', 'v2_1Private', 'POST', params)
+    if response.get('result') != 'success' or not response.get('transaction'):
+        raise Exception(f"Coinone rejected the withdrawal: {response.get('error_code')}")
+    return normalize_coinone_transaction(response['transaction'])
+
+
+def coinone_withdrawal_available(exchange, currency):
+    """
+    Checks that the API key can reach Coinone's private withdrawal endpoints.
+
+    :param exchange: The Coinone exchange instance.
+    :param currency: A currency to query the withdrawal limit of (e.g., 'XRP').
+    :return: True if the withdrawal limit was returned, False otherwise.
+    """
+    try:
+        response = exchange.v2_1PrivatePostTransactionCoinWithdrawalLimit({'currency': currency})
+        return response.get('result') == 'success'
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return False
+
+
 def fetch_withdrawal_status(exchange, currency, withdrawal_id):
     """
     Fetch the status of a specific withdrawal.
@@ -229,47 +321,48 @@ def fetch_deposit_status(exchange, currency, txid):
         return None
 
 
-def wait_for_withdrawal_completion(from_exchange, to_exchange, currency, withdrawal_id, polling_interval=10):
+def wait_for_withdrawal_completion(from_exchange, to_exchange, currency, withdrawal_id, expected_seconds=None):
     """
     Waits for a withdrawal to be completed on one exchange and the corresponding deposit to be credited on another exchange.
 
+    Both legs are tracked by the shared transfer monitor, which polls each account once for all pending transfers.
+
     :param from_exchange: The exchange from which the withdrawal is made.
     :param to_exchange: The exchange to which the deposit is made.
     :param currency: The currency of the withdrawal and deposit (e.g., 'BTC').
     :param withdrawal_id: The ID of the withdrawal to check.
-    :param polling_interval: The interval (in seconds) between status checks.
+    :param expected_seconds: The expected time until the withdrawal completes, used to schedule polling.
+    :return: True if the deposit was credited, False otherwise.
     """
-    while True:
-        # Check withdrawal status on the source exchange
-        withdrawal_status = fetch_withdrawal_status(
-            from_exchange, currency, withdrawal_id)
-        if withdrawal_status:
-            status = withdrawal_status['status']
-            print(f"Current withdrawal status: {status}")
-            if status in ['ok', 'completed']:
-                print("The withdrawal has been completed.")
-                txid = withdrawal_status['txid']
-
-                # Check deposit status on the destination exchange
-                while True:
-                    deposit_status = fetch_deposit_status(
-                        to_exchange, currency, txid)
-                    if deposit_status:
-                        deposit_status_str = deposit_status['status']
-                        print(f"Current deposit status: {deposit_status_str}")
-                        if deposit_status_str == 'ok':
-                            print("The deposit has been credited to your account.")
-                            return
-                    else:
-                        print("Failed to retrieve deposit status.")
-
-                    time.sleep(polling_interval)
-
-                break
-            elif status == 'canceled':
-                print("The withdrawal has been canceled.")
-                break
-        else:
-            print("Failed to retrieve withdrawal status.")
+    try:
+        record = transfer_monitor.watch_transfer(
+            from_exchange, to_exchange, currency, withdrawal_id, expected_seconds).result()
+    except Exception as e:
+        print(f"An error occurred while waiting for the transfer: {e}")
+        return False
+
+    return complete_transfer(to_exchange, currency, record)
+
 
-        time.sleep(polling_interval)
+def complete_transfer(to_exchange, currency, record):
+    """
+    Applies the final record of a tracked transfer to the portfolio ledger.
+
+    :param to_exchange: The exchange to which the deposit is made.
+    :param currency: The currency of the deposit (e.g., 'BTC').
+    :param record: The record a `transfer_monitor.watch_transfer` future resolved with.
+    :return: True if the deposit was credited, False otherwise.
+    """
+    if record['status'] == UNCERTAIN:
+        print("The deposit could not be confirmed. The balances will be fetched again.")
+        return False
+    if record['status'] != 'ok':
+        print(f"The transfer has been {record['status']}.")
+        return False
+
+    print("The deposit has been credited to your account.")
+    if record.get('amount') is not None:
+        portfolio_ledger.apply_deposit(to_exchange, currency, record['amount'])
+    else:
+        portfolio_ledger.mark_uncertain(to_exchange)
+    return True
@@ -0,0 +1,178 @@
+import concurrent.futures
+import threading
+import time
+
+
+class CacheEntry:
+    __slots__ = ('value', 'fetched_at', 'ttl', 'loader', 'refreshing')
+
+    def __init__(self, value, fetched_at, ttl, loader):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+        self.loader = loader
+        self.refreshing = False
+
+    def age(self, now=None):
+        return (now or time.time()) - self.fetched_at
+
+
+class MarketDataCache:
+    def __init__(self, refresh_ahead=0.8, max_workers=4):
+        """
+        Process-wide cache of exchange data with a TTL per key.
+
+        Callers pass the maximum age they accept. Entries read after `refresh_ahead` of their TTL
+        are reloaded in the background so the next reader still gets a fresh value without waiting.
+
+        :param refresh_ahead: The fraction of the TTL after which a read triggers a background refresh.
+        :param max_workers: The number of background refresh threads.
+        """
+        self.refresh_ahead = refresh_ahead
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='cache-refresh')
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def get(self, key, loader, ttl: float, max_age: float = None):
+        """
+        Return the cached value for `key`, loading it if it is missing or older than `max_age`.
+
+        :param key: A hashable cache key, e.g. ('binance', 'spot', 'ticker', 'BTC/USDT').
+        :param loader: A function without arguments that fetches the value.
+        :param ttl: How long a loaded value stays valid, in seconds.
+        :param max_age: The oldest value the caller accepts, in seconds. Defaults to `ttl`.
+        :return: The cached or freshly loaded value.
+        """
+        if max_age is None:
+            max_age = ttl
+
+        entry = self._fresh_entry(key, max_age)
+        if entry is not None:
+            return entry.value
+
+        # Only one thread loads a given key; the others wait and reuse its result.
+        with self._key_lock(key):
+            entry = self._fresh_entry(key, max_age, count=False)
+            if entry is not None:
+                return entry.value
+
+            with self.lock:
+                self.misses += 1
+            value = loader()
+            with self.lock:
+                self.entries[key] = CacheEntry(value, time.time(), ttl, loader)
+            return value
+
+    def _fresh_entry(self, key, max_age, count=True):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.age(now) > max_age:
+                return None
+            if count:
+                self.hits += 1
+            if not entry.refreshing and entry.age(now) >= entry.ttl * self.refresh_ahead:
+                entry.refreshing = True
+                self.executor.submit(self._refresh, key, entry)
+            return entry
+
+    def _key_lock(self, key):
+        with self.lock:
+            if key not in self.key_locks:
+                self.key_locks[key] = threading.Lock()
+            return self.key_locks[key]
+
+    def _refresh(self, key, entry):
+        try:
+            value = entry.loader()
+        except Exception as e:
+            print(f"An error occurred while refreshing {key}: {e}")
+            with self.lock:
+                self.errors += 1
+                entry.refreshing = False
+            return
+
+        with self.lock:
+            self.refreshes += 1
+            self.entries[key] = CacheEntry(value, time.time(), entry.ttl, entry.loader)
+
+    def put(self, key, value, ttl: float, loader=None):
+        """
+        Store a value obtained elsewhere, e.g. from a bulk request or a stream.
+        """
+        with self.lock:
+            self.entries[key] = CacheEntry(value, time.time(), ttl, loader)
+
+    def age(self, key):
+        """
+        :return: The age of the cached value in seconds, or None if the key is not cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry.age()
+
+    def invalidate(self, key=None):
+        """
+        Drop one key, or every key if none is given.
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        """
+        :return: A dictionary with hit, miss, refresh and error counters, the hit rate and the age of every entry.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'errors': self.errors,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'ages': {key: entry.age() for key, entry in self.entries.items()},
+            }
+
+
+market_cache = MarketDataCache()
+
+# Default TTLs in seconds.
+TICKER_TTL = 2
+MARKETS_TTL = 3600
+
+
+def exchange_key(exchange):
+    """
+    :return: A key shared by clients that see the same market data (e.g. ('binance', 'future')).
+    """
+    return exchange.id, exchange.options.get('defaultType', 'spot')
+
+
+def cached_ticker(exchange, symbol: str, max_age: float = None):
+    """
+    :param exchange: The exchange instance (e.g., ccxt.binance()).
+    :param symbol: The trading pair symbol (e.g., 'BTC/USDT').
+    :param max_age: The oldest ticker the caller accepts, in seconds.
+    :return: The ticker, at most `max_age` seconds old.
+    """
+    return market_cache.get(exchange_key(exchange) + ('ticker', symbol),
+                            lambda: exchange.fetch_ticker(symbol), TICKER_TTL, max_age)
+
+
+def cached_markets(exchange, max_age: float = None):
+    """
+    :param exchange: The exchange instance (e.g., ccxt.binance()).
+    :param max_age: The oldest market list the caller accepts, in seconds.
+    :return: The exchange's markets keyed by symbol, at most `max_age` seconds old.
+    """
+    return market_cache.get(exchange_key(exchange) + ('markets',),
+                            lambda: exchange.load_markets(True), MARKETS_TTL, max_age)
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from http_pool import http_pool
+
+
+COINONE_CURRENCIES_URL = 'https://api.coinone.co.kr/public/v2/currencies'
+CURRENCY_STATUS_FILE = 'coinone_currencies.json'
+
+# The oldest table a per-currency check accepts before refetching, in seconds.
+CURRENCY_STATUS_MAX_AGE = 60
+
+# Raw Coinone statuses (e.g., 'normal', 'suspended') per currency.
+CurrencyStatus = namedtuple('CurrencyStatus', ['deposit_status', 'withdraw_status'])
+
+# Withdrawal rules per currency from the same response. Amounts are floats, None where Coinone omits them.
+CurrencyTransferInfo = namedtuple('CurrencyTransferInfo', [
+    'withdrawal_fee', 'withdrawal_min', 'max_precision', 'deposit_confirm_count'])
+
+# One change between consecutive tables. `old` is None for listings, `new` is None for delistings.
+CurrencyStatusChange = namedtuple('CurrencyStatusChange', ['currency', 'field', 'old', 'new', 'timestamp'])
+
+
+class CurrencyStatusTable:
+    def __init__(self, statuses=None, timestamp=None, transfers=None):
+        """
+        Deposit and withdraw status of every Coinone currency, parsed from one all-currencies response.
+
+        :param statuses: A dictionary mapping currencies to `CurrencyStatus` tuples.
+        :param timestamp: When the statuses were fetched, in seconds.
+        :param transfers: A dictionary mapping currencies to `CurrencyTransferInfo` tuples.
+        """
+        self.statuses = statuses or {}
+        self.timestamp = timestamp
+        self.transfers = transfers or {}
+
+    def __contains__(self, currency):
+        return currency in self.statuses
+
+    def __len__(self):
+        return len(self.statuses)
+
+    def age(self):
+        """
+        :return: The age of the table in seconds, or None if it was never fetched.
+        """
+        return None if self.timestamp is None else time.time() - self.timestamp
+
+    def is_depositable(self, currency):
+        """
+        :return: True if deposits for the currency are not suspended, False if suspended or unlisted.
+        """
+        status = self.statuses.get(currency)
+        return status is not None and status.deposit_status != 'suspended'
+
+    def is_deposit_suspended(self, currency):
+        """
+        :return: True if deposits for the currency are suspended, False if not, None if unlisted.
+        """
+        status = self.statuses.get(currency)
+        return None if status is None else status.deposit_status == 'suspended'
+
+    def is_withdrawable(self, currency):
+        """
+        :return: True if withdrawals for the currency are not suspended, False if suspended or unlisted.
+        """
+        status = self.statuses.get(currency)
+        return status is not None and status.withdraw_status != 'suspended'
+
+    def transfer_info(self, currency):
+        """
+        :return: The currency's `CurrencyTransferInfo`, or None if unlisted.
+        """
+        return self.transfers.get(currency)
+
+    def diff(self, previous):
+        """
+        :param previous: The table this one replaces.
+        :return: A list of `CurrencyStatusChange` for every status that differs, including listings and delistings.
+        """
+        changes = []
+        for currency in sorted(set(self.statuses) | set(previous.statuses)):
+            old = previous.statuses.get(currency)
+            new = self.statuses.get(currency)
+            if old == new:
+                continue
+            for field in CurrencyStatus._fields:
+                old_value = getattr(old, field) if old else None
+                new_value = getattr(new, field) if new else None
+                if old_value != new_value:
+                    changes.append(CurrencyStatusChange(currency, field, old_value, new_value, self.timestamp))
+        return changes
+
+    def save(self, path=CURRENCY_STATUS_FILE):
+        """
+        Write the table as compact row-oriented JSON.
+        """
+        data = {
+            'timestamp': self.timestamp,
+            'fields': CurrencyStatus._fields,
+            'rows': [[currency, *status] for currency, status in self.statuses.items()],
+            'transfer_fields': CurrencyTransferInfo._fields,
+            'transfer_rows': [[currency, *info] for currency, info in self.transfers.items()],
+        }
+        with open(path, mode='w') as file:
+            json.dump(data, file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path=CURRENCY_STATUS_FILE):
+        """
+        Read a table written by `save`. Returns an empty table if the file does not exist.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, mode='r') as file:
+            data = json.load(file)
+        if (tuple(data['fields']) != CurrencyStatus._fields
+                or tuple(data.get('transfer_fields', ())) != CurrencyTransferInfo._fields):
+            print(f"Currency status file {path} has an outdated layout and will be refetched.")
+            return cls()
+        statuses = {row[0]: CurrencyStatus(*row[1:]) for row in data['rows']}
+        transfers = {row[0]: CurrencyTransferInfo(*row[1:]) for row in data['transfer_rows']}
+        return cls(statuses, data['timestamp'], transfers)
+
+
+def _to_float(value):
+    return None if value in (None, '') else float(value)
+
+
+def fetch_currency_status_table():
+    """
+    Fetch the status and withdrawal rules of every Coinone currency with a single request.
+
+    :return: A `CurrencyStatusTable`.
+    """
+    response = http_pool.get(COINONE_CURRENCIES_URL)
+    response.raise_for_status()
+    data = response.json()
+    statuses = {}
+    transfers = {}
+    for currency in data['currencies']:
+        symbol = currency['symbol'].upper()
+        statuses[symbol] = CurrencyStatus(currency['deposit_status'], currency['withdraw_status'])
+        transfers[symbol] = CurrencyTransferInfo(
+            _to_float(currency.get('withdrawal_fee')), _to_float(currency.get('withdrawal_min_amount')),
+            currency.get('max_precision'), currency.get('deposit_confirm_count'))
+    return CurrencyStatusTable(statuses, time.time(), transfers)
+
+
+# The table used during cycles, warm-started from disk.
+coinone_currencies = CurrencyStatusTable.load()
+
+# Functions called with the list of `CurrencyStatusChange` after every refresh that changed something.
+currency_status_listeners = []
+
+_refresh_lock = threading.Lock()
+
+
+def refresh_coinone_currencies(path=CURRENCY_STATUS_FILE, max_age: float = None):
+    """
+    Refetch the Coinone currency table, emit its changes against the previous one and persist it.
+
+    :param path: The file the table is persisted to.
+    :param max_age: If given, skip the request when the current table is at most this old.
+    :return: The current `CurrencyStatusTable`.
+    """
+    global coinone_currencies
+
+    with _refresh_lock:
+        age = coinone_currencies.age()
+        if max_age is not None and age is not None and age <= max_age:
+            return coinone_currencies
+
+        table = fetch_currency_status_table()
+        # A table loaded from disk still yields the changes that happened while the bot was down.
+        changes = table.diff(coinone_currencies) if len(coinone_currencies) else []
+        coinone_currencies = table
+        table.save(path)
+
+    for change in changes:
+        print(f"Coinone {change.currency} {change.field}: {change.old} -> {change.new}")
+    if changes:
+        for listener in list(currency_status_listeners):
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"An error occurred in a currency status listener: {e}")
+    return table
+
+
+def current_coinone_currencies(max_age: float = CURRENCY_STATUS_MAX_AGE):
+    """
+    :param max_age: The oldest table accepted, in seconds.
+    :return: The current `CurrencyStatusTable`, refetched first if it is older than `max_age`.
+    """
+    table = coinone_currencies
+    age = table.age()
+    if age is not None and age <= max_age:
+        return table
+    return refresh_coinone_currencies(max_age=max_age)
+
+
+if __name__ == "__main__":
+    print(len(refresh_coinone_currencies()))
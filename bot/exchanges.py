@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 import os
 import ccxt
+from http_pool import http_pool
 
 
 load_dotenv()
@@ -19,6 +20,8 @@ upbit_api_key = os.getenv('UPBIT_API_KEY')
 upbit_api_secret = os.getenv('UPBIT_API_SECRET')
 coinone_api_key = os.getenv('COINONE_API_KEY')
 coinone_api_secret = os.getenv('COINONE_API_SECRET')
+bybit_api_key = os.getenv('BYBIT_API_KEY')
+bybit_api_secret = os.getenv('BYBIT_API_SECRET')
 
 alphavantage_api_key = os.getenv('ALPHAVNTAGE_API_KEY')
 
@@ -73,6 +76,15 @@ upbit = ccxt.upbit({
     'enableRateLimit': True,
 })
 
+bybit = ccxt.bybit({
+    'apiKey': bybit_api_key,
+    'secret': bybit_api_secret,
+    'enableRateLimit': True,
+    'options': {
+        'defaultType': 'spot',
+    },
+})
+
 coinone = ccxt.coinone({
     'apiKey': coinone_api_key,
     'secret': coinone_api_secret,
@@ -83,4 +95,13 @@ binance.options['adjustForTimeDifference'] = True
 binance_futures.options['adjustForTimeDifference'] = True
 binance_test.options['adjustForTimeDifference'] = True
 upbit.options['adjustForTimeDifference'] = True
+bybit.options['adjustForTimeDifference'] = True
 coinone.options['adjustForTimeDifference'] = True
+
+# Send every client's requests through pooled keep-alive sessions.
+http_pool.attach(binance, 'binance')
+http_pool.attach(binance_futures, 'binance_futures')
+http_pool.attach(binance_master, 'binance_master')
+http_pool.attach(upbit, 'upbit')
+http_pool.attach(bybit, 'bybit')
+http_pool.attach(coinone, 'coinone')
@@ -0,0 +1,135 @@
+import asyncio
+from collections import namedtuple
+
+import numpy as np
+
+from market_stream import BINANCE_SPOT, COINONE
+
+
+# The first three fields match the (symbol, price_diff, price_diff_percent) premium tuples.
+ExecutablePremium = namedtuple('ExecutablePremium', [
+    'symbol', 'price_diff', 'price_diff_percent', 'quantity',
+    'buy_vwap', 'sell_vwap', 'buy_slippage_percent', 'sell_slippage_percent'])
+
+
+def _pad_levels(books, depth):
+    # Stack ragged (price, quantity) ladders into (n, depth) arrays padded with zero quantity.
+    prices = np.zeros((len(books), depth))
+    quantities = np.zeros((len(books), depth))
+    for row, levels in enumerate(books):
+        levels = np.asarray([level[:2] for level in levels[:depth]], dtype=np.float64).reshape(-1, 2)
+        prices[row, :len(levels)] = levels[:, 0]
+        quantities[row, :len(levels)] = levels[:, 1]
+    return prices, quantities
+
+
+def _fill_index(cumulative, target):
+    # Index of the level that completes the fill and whether the ladder is deep enough.
+    reached = cumulative >= target[:, None]
+    return reached.argmax(axis=1), reached.any(axis=1)
+
+
+def calc_executable_premiums(symbols, ask_books, bid_books, notional: float, fx_rate: float):
+    """
+    Compute premiums after slippage for every candidate in one batched pass.
+
+    For each candidate, `notional` USDT buys up the Binance asks, and the bought quantity is then sold
+    into the Coinone bids. Candidates whose books are too thin for the notional are dropped.
+
+    :param symbols: The candidate currencies (e.g., ['BTC', 'XRP']).
+    :param ask_books: Binance ask ladders, a list of (price, quantity) lists ordered from the best price.
+    :param bid_books: Coinone bid ladders in KRW, a list of (price, quantity) lists ordered from the best price.
+    :param notional: The amount of USDT to trade.
+    :param fx_rate: The exchange rate from USDT to KRW.
+    :return: A list of `ExecutablePremium` sorted by premium after slippage in descending order.
+    """
+    if not symbols:
+        return []
+
+    depth = max(max(len(book) for book in ask_books), max(len(book) for book in bid_books), 1)
+    ask_prices, ask_quantities = _pad_levels(ask_books, depth)
+    bid_prices, bid_quantities = _pad_levels(bid_books, depth)
+    rows = np.arange(len(symbols))
+
+    # Buy leg: walk the asks until the notional is spent.
+    ask_costs = np.cumsum(ask_prices * ask_quantities, axis=1)
+    ask_filled = np.cumsum(ask_quantities, axis=1)
+    notionals = np.full(len(symbols), float(notional))
+    buy_index, buy_ok = _fill_index(ask_costs, notionals)
+    cost_before = ask_costs[rows, buy_index] - ask_prices[rows, buy_index] * ask_quantities[rows, buy_index]
+    filled_before = ask_filled[rows, buy_index] - ask_quantities[rows, buy_index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quantity = filled_before + (notionals - cost_before) / ask_prices[rows, buy_index]
+
+    # Sell leg: walk the bids until the bought quantity is sold.
+    bid_filled = np.cumsum(bid_quantities, axis=1)
+    bid_proceeds = np.cumsum(bid_prices * bid_quantities, axis=1)
+    sell_index, sell_ok = _fill_index(bid_filled, quantity)
+    proceeds_before = bid_proceeds[rows, sell_index] - bid_prices[rows, sell_index] * bid_quantities[rows, sell_index]
+    sold_before = bid_filled[rows, sell_index] - bid_quantities[rows, sell_index]
+    proceeds_krw = proceeds_before + (quantity - sold_before) * bid_prices[rows, sell_index]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        buy_vwap = notionals / quantity
+        sell_vwap = proceeds_krw / quantity
+        price_diff = sell_vwap / fx_rate - buy_vwap
+        price_diff_percent = price_diff / buy_vwap * 100
+        buy_slippage = (buy_vwap / ask_prices[:, 0] - 1) * 100
+        sell_slippage = (1 - sell_vwap / bid_prices[:, 0]) * 100
+
+    valid = buy_ok & sell_ok & np.isfinite(price_diff_percent)
+    order = [i for i in np.argsort(-price_diff_percent, kind='stable') if valid[i]]
+
+    return [ExecutablePremium(symbols[i], float(price_diff[i]), float(price_diff_percent[i]), float(quantity[i]),
+                              float(buy_vwap[i]), float(sell_vwap[i]), float(buy_slippage[i]), float(sell_slippage[i]))
+            for i in order]
+
+
+def books_from_board(board, symbols, depth=50):
+    """
+    Read the Binance ask and Coinone bid ladders for the candidates from a `PremiumBoard`.
+
+    :param board: The `PremiumBoard` holding the streamed books.
+    :param symbols: The candidate currencies.
+    :param depth: The number of levels to read per side.
+    :return: A tuple of (symbols, ask_books, bid_books) for the candidates with both books synced.
+    """
+    found, ask_books, bid_books = [], [], []
+    with board.lock:
+        for symbol in symbols:
+            ask_book = board.books.get((BINANCE_SPOT, symbol))
+            bid_book = board.books.get((COINONE, symbol))
+            if not (ask_book and ask_book.synced and bid_book and bid_book.synced):
+                continue
+            found.append(symbol)
+            ask_books.append(ask_book.levels('asks', depth))
+            bid_books.append(bid_book.levels('bids', depth))
+    return found, ask_books, bid_books
+
+
+def fetch_candidate_books(scanner, symbols, depth=50):
+    """
+    Fetch the Binance ask and Coinone bid ladders for the candidates concurrently over REST.
+
+    :param scanner: The `AsyncScanner` to fetch with.
+    :param symbols: The candidate currencies.
+    :param depth: The number of levels to fetch per side.
+    :return: A tuple of (symbols, ask_books, bid_books) for the candidates both books were fetched for.
+    """
+    async def fetch_all():
+        return await asyncio.gather(
+            *(scanner.call('binance', 'fetch_order_book', symbol + '/USDT', depth) for symbol in symbols),
+            *(scanner.call('coinone', 'fetch_order_book', symbol + '/KRW') for symbol in symbols),
+            return_exceptions=True)
+
+    results = scanner.run(fetch_all())
+    asks, bids = results[:len(symbols)], results[len(symbols):]
+
+    found, ask_books, bid_books = [], [], []
+    for symbol, ask, bid in zip(symbols, asks, bids):
+        if isinstance(ask, Exception) or isinstance(bid, Exception):
+            continue
+        found.append(symbol)
+        ask_books.append(ask['asks'][:depth])
+        bid_books.append(bid['bids'][:depth])
+    return found, ask_books, bid_books
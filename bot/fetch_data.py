@@ -10,21 +10,30 @@ from address import get_address_from_csv
 from decimal import Decimal
 
 from symbols import coinone_tradeable_symbols
+from universe import universe
 from exchanges import *
+from snapshot import PremiumSnapshot, take_premium_snapshot
+from async_scanner import get_async_scanner
+from cache import market_cache, cached_ticker, cached_markets
+from http_pool import http_pool
+from fx import fx_engine
+from currency_status import current_coinone_currencies
+from routes import BINANCE_TO_COINONE, route_table
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-def fetch_exchange_price(exchange, symbol: str):
+def fetch_exchange_price(exchange, symbol: str, max_age: float = None):
     """
     Fetch the latest price for a given symbol from the specified exchange.
 
     :param exchange: The exchange instance (e.g., ccxt.binance()).
     :param symbol: The trading pair symbol (e.g., 'BTC/USDT').
+    :param max_age: The oldest cached price accepted, in seconds. Defaults to the ticker TTL.
     :return: The last price of the symbol from the specified exchange.
     """
-    return exchange.fetch_ticker(symbol)['last']
+    return cached_ticker(exchange, symbol, max_age)['last']
 
 
 def fetch_fx_rate():
@@ -44,7 +53,7 @@ def fetch_fx_rate():
         'apikey': alphavantage_api_key
     }
 
-    response = requests.get(BASE_URL, params=params)
+    response = http_pool.get(BASE_URL, params=params)
     if response.status_code == 200:
         data = response.json()
         try:
@@ -82,69 +91,58 @@ def calc_price_diff(target: str = 'BTC', ex_a=None, ex_b=None, fx_rate: float =
     return price_diff, price_diff_percent, ex_a_price_krw, ex_a_price, ex_b_price, fx_rate
 
 
-def conc_calc_transfer_loss(fx_rate: float):
+# Run scans on the long-lived asyncio scanner instead of the synchronous clients.
+USE_ASYNC_SCANNER = False
+
+
+def take_scan_snapshot(fx_rate: float, ex=coinone, symbols=None):
     """
-    Concurrently calculate transfer loss for all specified transfer mediums.
+    Take a premium snapshot against Binance, on the async scanner when it is enabled.
 
     :param fx_rate: The exchange rate from USDT to KRW.
-    :return: A sorted list of transfer mediums and their respective price differences and percentage differences.
+    :param ex: The KRW exchange instance (default is ccxt.coinone()).
+    :param symbols: The currencies to fetch one by one on venues without a bulk ticker endpoint.
+        Defaults to the universe and the transfer mediums.
+    :return: A `PremiumSnapshot`.
     """
-    def fetch_and_calc(medium):
-        try:
-            price_diff, price_diff_percent, _, _, _, _ = calc_price_diff(
-                medium, coinone, binance, fx_rate)
-            return (medium, price_diff, price_diff_percent)
-        except Exception as e:
-            print(e)
+    if USE_ASYNC_SCANNER:
+        if symbols is None:
+            symbols = universe.currencies() + [medium for medium in transfer_mediums if medium not in universe]
+        scanner = get_async_scanner()
+        return scanner.run(scanner.take_premium_snapshot(fx_rate, ex.id, symbols=symbols))
+    return take_premium_snapshot(fx_rate, ex)
 
-    results = []
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {executor.submit(
-            fetch_and_calc, medium): medium for medium in transfer_mediums}
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            results.append(result)
 
-    results.sort(key=lambda x: x[2])
-    return results
+def conc_calc_transfer_loss(fx_rate: float, snapshot=None):
+    """
+    Calculate transfer loss for all specified transfer mediums from a single premium snapshot.
+
+    :param fx_rate: The exchange rate from USDT to KRW.
+    :param snapshot: An optional `PremiumSnapshot` to read prices from. A new one is taken if omitted.
+    :return: A sorted list of transfer mediums and their respective price differences and percentage differences.
+    """
+    if snapshot is None:
+        snapshot = take_scan_snapshot(fx_rate, symbols=transfer_mediums)
+
+    return snapshot.transfer_losses(transfer_mediums)
 
 
-def conc_find_highest_premium(fx_rate: float, currencies, ex=coinone):
+def conc_find_highest_premium(fx_rate: float, currencies, ex=coinone, snapshot=None):
     """
-    Concurrently find the cryptocurrency with the highest premium on Coinone compared to Binance.
+    Find the cryptocurrency with the highest premium on Coinone compared to Binance.
+
+    All prices come from one bulk ticker request per exchange instead of one request per symbol.
 
     :param fx_rate: The exchange rate from USDT to KRW.
+    :param currencies: The currencies or trading pairs to rank (e.g., ['BTC', 'XRP/KRW']).
     :param ex: The exchange instance to compare (default is ccxt.coinone()).
+    :param snapshot: An optional `PremiumSnapshot` to read prices from. A new one is taken if omitted.
     :return: A sorted list of trading pairs with their premiums in descending order.
     """
-    def calc_premium_for_symbol(symbol, ex, fx_rate):
-        target = symbol.split('/')[0]
-        # print("Calculating " + target + "...")
+    if snapshot is None:
+        snapshot = take_scan_snapshot(fx_rate, ex, symbols=currencies)
 
-        try:
-            price_diff, price_diff_percent, _, _, _, _ = calc_price_diff(
-                target, ex, binance, fx_rate)
-            premium = (symbol, price_diff, price_diff_percent)
-            return premium
-        except Exception as e:
-            print(e)
-            return None
-
-    premiums = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {executor.submit(
-            calc_premium_for_symbol, symbol, ex, fx_rate): symbol for symbol in currencies}
-        for future in concurrent.futures.as_completed(futures):
-            symbol = futures[future]
-            try:
-                premium = future.result()
-                if premium:
-                    premiums.append(premium)
-            except Exception as e:
-                print(f"Error processing {symbol}: {e}")
-
-    return sorted(premiums, key=lambda x: x[2], reverse=True)
+    return snapshot.premiums(currencies)
 
 
 def fetch_supported_networks(exchange, currency):
@@ -203,26 +201,14 @@ def is_currency_depositable(currency):
     """
     Checks if a given currency is depositable on Coinone.
 
+    Reads the all-currencies table, which is refetched with one request once it is older than
+    `CURRENCY_STATUS_MAX_AGE`.
+
     :param currency: The currency to check (e.g., 'BTC').
     :return: True if the currency is depositable, False otherwise.
     """
     try:
-        # API endpoint for Coinone currency info
-        url = f'https://api.coinone.co.kr/public/v2/currencies/{currency}'
-
-        # Make the request
-        response = requests.get(url)
-
-        # Check if the request was successful
-        if response.status_code == 200:
-            data = response.json()
-            # Check the deposit status for the currency
-            deposit_status = data['currencies'][0]['deposit_status']
-            return deposit_status != 'suspended'
-        else:
-            print(
-                f"Failed to fetch data for {currency}. Status code: {response.status_code}")
-            return False
+        return current_coinone_currencies().is_depositable(currency)
     except Exception as e:
         print(f"An error occurred: {e}")
         return False
@@ -253,8 +239,12 @@ def fetch_deposit_address(exchange, target, is_fetch=True):
             print(f"An error occurred: {e}")
             return None, None, None
     else:
-        # Fetch the address and tag from the CSV file
-        return get_address_from_csv('address.csv', target)
+        # Read the address, tag and network of the route built from the CSV file
+        route = route_table.get(target, BINANCE_TO_COINONE)
+        if route is None:
+            print(f"No entry found for {target} in the CSV file.")
+            return None, None, None
+        return route.address, route.tag, route.network
 
 
 def check_coinone_deposit_suspended(currency):
@@ -262,24 +252,10 @@ def check_coinone_deposit_suspended(currency):
     Checks if the deposit for a given currency is suspended on Coinone.
 
     :param currency: The currency to check (e.g., 'CHZ').
-    :return: True if the deposit is suspended, False otherwise.
+    :return: True if the deposit is suspended, False otherwise, None if the currency is not listed.
     """
     try:
-        # Construct the URL
-        url = f'https://api.coinone.co.kr/public/v2/currencies/{currency}'
-
-        # Make the custom request
-        response = coinone.fetch(url)
-
-        # Debug: Print the response to understand its structure
-        # print(response['currencies'][0])
-
-        # Check if the deposit status is suspended
-        if response['currencies'][0]['deposit_status'] == 'suspended':
-            return True
-        else:
-            return False
-
+        return current_coinone_currencies().is_deposit_suspended(currency)
     except Exception as e:
         print(f"An error occurred: {e}")
         return None
@@ -299,12 +275,14 @@ fx_rate = None
 
 def update_fx_rate():
     """
-    Periodically updates the FX rate by fetching the latest rate every 10 minutes.
+    Periodically updates the reference FX rate by fetching the latest rate every 10 minutes.
     """
     global fx_rate
 
     while True:
-        fx_rate = fetch_fx_rate()
+        # The reference rate is blended with market-implied rates by the FX engine.
+        fx_engine.update_reference(fetch_fx_rate())
+        fx_rate = fx_engine.rate()
         time.sleep(600)  # Sleep for 10 minutes before updating again
 
 
@@ -0,0 +1,128 @@
+import threading
+import time
+
+
+# Blend weights per source. The reference is the Alpha Vantage USD/KRW feed.
+# BTC and ETH cross rates carry the K-premium itself, so they are weighted low.
+DEFAULT_WEIGHTS = {
+    'reference': 0.4,
+    'USDT': 0.2,
+    'USDC': 0.2,
+    'BTC': 0.1,
+    'ETH': 0.1,
+}
+
+
+class FxEngine:
+    def __init__(self, weights=None, sample_max_age: float = 30, reference_max_age: float = 1800):
+        """
+        Implied KRW per USD rate derived from prices the scanner already fetches, blended with a reference feed.
+
+        Sources are Coinone USDT/KRW and USDC/KRW, and BTC and ETH KRW prices divided by their Binance
+        USDT prices. Every sample is time-stamped, stale samples drop out of the blend, and each new
+        rate is published to subscribers.
+
+        :param weights: Blend weights per source, defaults to `DEFAULT_WEIGHTS`.
+        :param sample_max_age: Seconds after which a market-derived sample is ignored.
+        :param reference_max_age: Seconds after which the reference rate is ignored.
+        """
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.sample_max_age = sample_max_age
+        self.reference_max_age = reference_max_age
+        self.samples = {}
+        self.current = None
+        self.timestamp = None
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def update_reference(self, rate, timestamp=None):
+        """
+        Record a rate from the reference feed.
+
+        :param rate: The USD to KRW rate, or None if the feed failed.
+        :param timestamp: The time of the rate in seconds, defaults to now.
+        """
+        if rate:
+            self._update({'reference': (float(rate), timestamp or time.time())})
+
+    def update_from_quotes(self, krw_quotes, usdt_quotes, timestamp=None):
+        """
+        Derive implied rates from quote mappings keyed by base currency, as held by a `PremiumSnapshot`.
+
+        :param krw_quotes: A mapping of base currency to `Quote` on the KRW exchange.
+        :param usdt_quotes: A mapping of base currency to `Quote` on the USDT exchange.
+        :param timestamp: The time of the quotes in seconds, defaults to now.
+        :return: The blended rate after the update, or None.
+        """
+        timestamp = timestamp or time.time()
+        samples = {}
+        for stablecoin in ('USDT', 'USDC'):
+            quote = krw_quotes.get(stablecoin)
+            if quote and quote.last:
+                samples[stablecoin] = (float(quote.last), timestamp)
+        for base in ('BTC', 'ETH'):
+            krw_quote = krw_quotes.get(base)
+            usdt_quote = usdt_quotes.get(base)
+            if krw_quote and usdt_quote and krw_quote.last and usdt_quote.last:
+                samples[base] = (krw_quote.last / usdt_quote.last, timestamp)
+        return self._update(samples)
+
+    def _update(self, samples):
+        if not samples:
+            return self.current
+
+        with self.lock:
+            self.samples.update(samples)
+            now = time.time()
+            total_weight = 0.0
+            weighted_sum = 0.0
+            for source, (rate, timestamp) in self.samples.items():
+                max_age = self.reference_max_age if source == 'reference' else self.sample_max_age
+                weight = self.weights.get(source, 0)
+                if weight <= 0 or now - timestamp > max_age:
+                    continue
+                total_weight += weight
+                weighted_sum += weight * rate
+            if total_weight == 0:
+                return self.current
+
+            self.current = weighted_sum / total_weight
+            self.timestamp = max(timestamp for _, timestamp in samples.values())
+            rate = self.current
+            listeners = list(self.listeners)
+
+        for listener in listeners:
+            try:
+                listener(rate)
+            except Exception as e:
+                print(f"An error occurred in an FX rate listener: {e}")
+        return rate
+
+    def rate(self, max_age: float = None):
+        """
+        :param max_age: The oldest rate accepted, in seconds.
+        :return: The current blended rate, or None if there is none recent enough.
+        """
+        with self.lock:
+            if self.current is None:
+                return None
+            if max_age is not None and time.time() - self.timestamp > max_age:
+                return None
+            return self.current
+
+    def components(self):
+        """
+        :return: A dictionary mapping each source to its (rate, timestamp) sample.
+        """
+        with self.lock:
+            return dict(self.samples)
+
+    def subscribe(self, listener):
+        """
+        Call `listener(rate)` whenever a new rate is published.
+        """
+        with self.lock:
+            self.listeners.append(listener)
+
+
+fx_engine = FxEngine()
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from exchanges import binance_futures
+from cache import market_cache, exchange_key
+from market_spec import market_specs
+from ledger import portfolio_ledger
+from positions import position_index
+
+
+MARK_PRICE_TTL = 1
+LEVERAGE_BRACKET_TTL = 3600
+
+# One hedged trade: monotonic timestamps of the spot and hedge acknowledgements.
+HedgeLatency = namedtuple('HedgeLatency', ['symbol', 'spot_acked_at', 'hedge_acked_at', 'latency'])
+
+
+class HedgeEngine:
+    def __init__(self, exchange=binance_futures, max_records=1000):
+        """
+        Places futures hedges with a single order request.
+
+        Leverage is kept as per-symbol state and only sent when it changes. The short is sized from a
+        mark price and leverage brackets that are refreshed in bulk by the shared cache, and from the
+        margin balance held by the portfolio ledger.
+
+        :param exchange: The Binance USDT-M futures client.
+        :param max_records: The number of latency records kept.
+        """
+        self.exchange = exchange
+        self.max_records = max_records
+        self.leverages = {}
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    def _spec(self, target):
+        specs = market_specs(self.exchange)
+        return specs.get(target + '/USDT:USDT') or specs.get(target + '/USDT')
+
+    def mark_prices(self, max_age: float = None):
+        """
+        :return: A dictionary mapping futures market IDs to mark prices, from one bulk request.
+        """
+        def load():
+            return {item['symbol']: Decimal(item['markPrice'])
+                    for item in self.exchange.fapiPublicGetPremiumIndex()}
+        return market_cache.get(exchange_key(self.exchange) + ('mark_prices',), load, MARK_PRICE_TTL, max_age)
+
+    def leverage_brackets(self, max_age: float = None):
+        """
+        :return: A dictionary mapping futures market IDs to (notional cap, max leverage) tuples, lowest cap first.
+        """
+        def load():
+            return {item['symbol']: [(Decimal(str(bracket['notionalCap'])), int(bracket['initialLeverage']))
+                                     for bracket in item['brackets']]
+                    for item in self.exchange.fapiPrivateGetLeverageBracket()}
+        return market_cache.get(exchange_key(self.exchange) + ('leverage_brackets',), load,
+                                LEVERAGE_BRACKET_TTL, max_age)
+
+    def max_notional(self, market_id, leverage):
+        """
+        :return: The largest position notional the brackets allow at `leverage`, or None if unknown.
+        """
+        brackets = self.leverage_brackets().get(market_id)
+        if not brackets:
+            return None
+        allowed = [cap for cap, max_leverage in brackets if max_leverage >= leverage]
+        return max(allowed) if allowed else Decimal(0)
+
+    def ensure_leverage(self, market_id, leverage):
+        """
+        Set the symbol's leverage unless it is already set to `leverage`.
+        """
+        with self.lock:
+            if self.leverages.get(market_id) == leverage:
+                return
+        self.exchange.fapiPrivatePostLeverage({'symbol': market_id, 'leverage': leverage})
+        with self.lock:
+            self.leverages[market_id] = leverage
+
+    def prepare(self, target, leverage):
+        """
+        Warm every input of `short` so the hedge itself is a single request.
+        Call this once the target is known, before the spot leg is sent.
+
+        :return: True if the target can be hedged.
+        """
+        try:
+            spec = self._spec(target)
+            if spec is None:
+                print(f"Error: Symbol {target}/USDT is not available on the exchange.")
+                return False
+            self.ensure_leverage(spec.id, leverage)
+            self.leverage_brackets()
+            portfolio_ledger.balance(self.exchange, 'USDT')
+            return spec.id in self.mark_prices()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return False
+
+    def short(self, target, leverage, percentage=100, cost=None):
+        """
+        Place a market short sized at `percentage` of the futures USDT balance times `leverage`.
+
+        :param target: The target currency to short (e.g., 'BTC').
+        :param leverage: The leverage rate to use.
+        :param percentage: The percentage of the USDT balance to use.
+        :param cost: A fixed margin in USDT to use instead of `percentage` of the balance.
+        :return: A dictionary with order details if successful, None otherwise.
+        """
+        try:
+            spec = self._spec(target)
+            if spec is None:
+                print(f"Error: Symbol {target}/USDT is not available on the exchange.")
+                return None
+
+            # A no-op once `prepare` has run for this leverage.
+            self.ensure_leverage(spec.id, leverage)
+
+            if cost is None:
+                usdt_balance = portfolio_ledger.balance(self.exchange, 'USDT')
+                if usdt_balance is None:
+                    return None
+                cost = usdt_balance * Decimal(percentage) / Decimal(100)
+            cost = spec.floor_cost(Decimal(str(cost)))
+            if cost < spec.min_cost:
+                print(f"Error: Cost {cost} is less than the minimum order size {spec.min_cost}.")
+                return None
+
+            notional = cost * leverage
+            max_notional = self.max_notional(spec.id, leverage)
+            if max_notional is not None and notional > max_notional:
+                print(f"Notional {notional} capped at {max_notional} by the leverage brackets.")
+                notional = max_notional
+
+            mark_price = self.mark_prices()[spec.id]
+            amount = spec.floor_amount(notional / mark_price)
+            if amount < spec.min_amount:
+                print(f"Error: Amount {amount} is less than the minimum order size {spec.min_amount}.")
+                return None
+
+            order = self.exchange.create_order(spec.symbol, 'market', 'sell', float(amount))
+            print(f"Market short order created: {order}")
+            portfolio_ledger.apply_fill(self.exchange, order)
+            if self.exchange is position_index.exchange:
+                position_index.apply_fill(order)
+
+            return {
+                'order': order,
+                'average_price': order['average'],
+                'quantity': order['filled'],
+                'total_cost': order['cost'],
+                'fee': order['fees'],
+            }
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def record_latency(self, symbol, spot_acked_at, hedge_acked_at):
+        """
+        Record the time from the spot order's acknowledgement to the hedge's.
+        The spot fill may only be known later, so acknowledgements are compared. Both timestamps come from
+        `time.monotonic()`; a negative latency means the hedge was acknowledged first.
+
+        :return: The `HedgeLatency` record.
+        """
+        record = HedgeLatency(symbol, spot_acked_at, hedge_acked_at, hedge_acked_at - spot_acked_at)
+        with self.lock:
+            self.latencies.append(record)
+            del self.latencies[:-self.max_records]
+        print(f"Spot ack to hedge ack for {symbol}: {record.latency * 1000:.1f} ms")
+        return record
+
+    def latency_stats(self):
+        """
+        :return: A dictionary with the count, mean and max of the recorded latencies in seconds.
+        """
+        with self.lock:
+            latencies = [record.latency for record in self.latencies]
+        if not latencies:
+            return {'count': 0, 'mean': None, 'max': None}
+        return {'count': len(latencies), 'mean': sum(latencies) / len(latencies), 'max': max(latencies)}
+
+
+hedge_engine = HedgeEngine()
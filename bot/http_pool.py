@@ -0,0 +1,88 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpPool:
+    def __init__(self, pool_connections=8, pool_maxsize=32, max_retries=1, timeout=10):
+        """
+        Keep-alive HTTP sessions reused across cycles, one per client or host.
+
+        Each session has its own tuned connection pools, so repeated requests to a host skip the
+        TCP and TLS handshakes and cost a single round trip.
+
+        :param pool_connections: The number of per-host pools each session keeps.
+        :param pool_maxsize: The number of idle connections kept per host.
+        :param max_retries: Retries for failed connection attempts.
+        :param timeout: The default request timeout in seconds.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def session(self, name):
+        """
+        :param name: A client name or host (e.g., 'binance' or 'www.alphavantage.co').
+        :return: The pooled `requests.Session` for the name, created on first use.
+        """
+        with self.lock:
+            if name not in self.sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                      pool_maxsize=self.pool_maxsize,
+                                      max_retries=self.max_retries)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['Connection'] = 'keep-alive'
+                self.sessions[name] = session
+            return self.sessions[name]
+
+    def get(self, url, **kwargs):
+        """
+        Send a GET request on the pooled session of the URL's host.
+
+        :param url: The URL to request.
+        :return: The `requests.Response`.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session(urlsplit(url).netloc).get(url, **kwargs)
+
+    def attach(self, exchange, name):
+        """
+        Make a synchronous ccxt client send its requests through a pooled session.
+
+        :param exchange: The ccxt exchange instance.
+        :param name: The name to register the session under (e.g., 'binance_futures').
+        """
+        exchange.session = self.session(name)
+
+    def stats(self):
+        """
+        :return: A dictionary mapping each session and host to its request count, opened connections
+                 and connection reuse rate.
+        """
+        stats = {}
+        with self.lock:
+            sessions = list(self.sessions.items())
+        for name, session in sessions:
+            pools = session.get_adapter('https://').poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent = pool.num_requests
+                connections = pool.num_connections
+                stats[(name, key.key_host)] = {
+                    'requests': requests_sent,
+                    'connections': connections,
+                    'reuse_rate': 1 - connections / requests_sent if requests_sent else None,
+                }
+        return stats
+
+
+http_pool = HttpPool()
@@ -0,0 +1,214 @@
+import concurrent.futures
+import threading
+from decimal import Decimal
+
+from exchanges import binance, binance_master, binance_futures, coinone
+from fx import fx_engine
+from balance import adjust_balances_to_leverage, fetch_balance, withdraw, wait_for_withdrawal_completion
+from order import buy_cost, trade_amount, net_of_fees
+from positions import position_index
+from universe import universe
+from leg_executor import Leg, leg_executor
+from routes import BINANCE_TO_COINONE, route_table
+
+
+# Rebalance a coin once Coinone holds less than this share of its inventory.
+COIN_REBALANCE_THRESHOLD = 0.25
+
+# Rebalance the quote once Binance USDT is less than this share of the quote capital.
+QUOTE_REBALANCE_THRESHOLD = 0.25
+
+# The largest share of a coin's inventory its futures short may differ from it by.
+HEDGE_TOLERANCE = 0.05
+
+
+class InventoryEngine:
+    def __init__(self, currencies, leverage, rebalance_quote=None,
+                 coin_threshold=COIN_REBALANCE_THRESHOLD, quote_threshold=QUOTE_REBALANCE_THRESHOLD):
+        """
+        Trades the premium out of coin inventory held on both exchanges.
+
+        Each trade buys the target on Binance and sells the same amount on Coinone at the same moment, so
+        the total coin inventory, and the futures short hedging it, stays constant. Transfers only move
+        inventory back into place: coins from Binance to Coinone, and the quote from Coinone KRW to
+        Binance USDT. They run on background workers once a threshold is crossed, one at a time per kind.
+
+        The engine does not open the hedge itself: each currency's total inventory must already be shorted
+        on Binance futures, which `unhedged` checks. A trade with only one filled leg is unwound, so the
+        inventory stays constant.
+
+        :param currencies: The currencies held as inventory (e.g., ['XRP', 'TRX']).
+        :param leverage: The leverage of the hedge, used to split Binance USDT between spot and futures.
+        :param rebalance_quote: A function that moves Coinone KRW to Binance USDT, e.g. a medium round trip.
+        :param coin_threshold: The Coinone share of a coin's inventory below which it is rebalanced.
+        :param quote_threshold: The Binance share of the quote capital below which it is rebalanced.
+        """
+        self.currencies = list(currencies)
+        self.leverage = leverage
+        self.rebalance_quote = rebalance_quote
+        self.coin_threshold = coin_threshold
+        self.quote_threshold = quote_threshold
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='inventory-rebalance')
+        self.rebalancing = set()
+        self.lock = threading.Lock()
+
+    def inventory(self, currency):
+        """
+        :return: A tuple of the Binance and Coinone balances of `currency`, 0 where unknown.
+        """
+        return fetch_balance(binance, currency) or 0, fetch_balance(coinone, currency) or 0
+
+    def unhedged(self, tolerance=HEDGE_TOLERANCE):
+        """
+        :param tolerance: The largest share of the inventory the short may differ from it by.
+        :return: A list of the currencies whose futures short does not match their total inventory.
+        """
+        currencies = []
+        for currency in self.currencies:
+            binance_amount, coinone_amount = self.inventory(currency)
+            total = Decimal(str(binance_amount)) + Decimal(str(coinone_amount))
+            entry = universe.get(currency)
+            short = -position_index.amount(entry.futures_id if entry else currency + 'USDT')
+            if abs(short - total) > total * Decimal(str(tolerance)):
+                print(f"{currency} inventory of {total} is hedged by a short of {short}.")
+                currencies.append(currency)
+        return currencies
+
+    def tradable_amount(self, currency, price, notional):
+        """
+        :param currency: The currency to trade (e.g., 'XRP').
+        :param price: The Binance price of the currency in USDT.
+        :param notional: The most USDT to trade, or None for no limit.
+        :return: The largest amount both legs can fill from the current inventory.
+        """
+        _, coinone_amount = self.inventory(currency)
+        usdt_balance = fetch_balance(binance, 'USDT') or 0
+        amounts = [coinone_amount, usdt_balance / price]
+        if notional is not None:
+            amounts.append(notional / price)
+        return min(amounts)
+
+    def trade(self, target, price, notional=None):
+        """
+        Buy `target` on Binance and sell the same amount on Coinone, then start any rebalance now due.
+
+        :param target: The currency to trade (e.g., 'XRP').
+        :param price: The Binance price of the currency in USDT.
+        :param notional: The most USDT to trade, or None to trade as much as the inventory allows.
+        :return: A tuple containing Binance buy order details and Coinone sell order details.
+        """
+        amount = self.tradable_amount(target, price, notional)
+        if amount <= 0:
+            print(f"No {target} inventory to trade.")
+            self.maybe_rebalance(target)
+            return None, None
+
+        (buy_details, sell_details), _ = leg_executor.execute('inventory_trade', [
+            Leg('binance', binance, trade_amount, (binance, target, 'USDT', 'buy', amount)),
+            Leg('coinone', coinone, trade_amount, (coinone, target, 'KRW', 'sell', amount)),
+        ])
+
+        if buy_details:
+            print("Binance buy order details:", buy_details)
+        else:
+            print("Failed to place the Binance buy order.")
+
+        if sell_details:
+            print("Coinone sell order details:", sell_details)
+        else:
+            print("Failed to place the Coinone sell order.")
+
+        if bool(buy_details) != bool(sell_details):
+            self._unwind(target, buy_details, sell_details)
+
+        self.maybe_rebalance(target)
+        return buy_details, sell_details
+
+    def _unwind(self, target, buy_details, sell_details):
+        # Reverse the leg that filled, so the inventory matches the short again.
+        if buy_details:
+            unwind = trade_amount(binance, target, 'USDT', 'sell', net_of_fees(buy_details, 'quantity', target))
+        else:
+            unwind = buy_cost(coinone, target, 'KRW', net_of_fees(sell_details, 'total_cost', 'KRW'))
+        if unwind:
+            print("Unwound the filled leg:", unwind)
+        else:
+            print(f"Failed to unwind the filled {target} leg. The inventory is no longer hedged.")
+        return unwind
+
+    def maybe_rebalance(self, currency):
+        """
+        Start a background rebalance of `currency` and of the quote if either crossed its threshold.
+
+        :return: A list of the futures of the rebalances started.
+        """
+        started = []
+
+        binance_amount, coinone_amount = self.inventory(currency)
+        total = binance_amount + coinone_amount
+        if total > 0 and coinone_amount / total < self.coin_threshold:
+            # Move Binance's excess over an even split back to Coinone.
+            future = self._submit(currency, self._rebalance_coin, currency, total / 2 - coinone_amount)
+            if future:
+                started.append(future)
+
+        if self.rebalance_quote is not None:
+            usdt_balance = fetch_balance(binance, 'USDT') or 0
+            krw_balance = fetch_balance(coinone, 'KRW') or 0
+            # Futures margin backs the hedge and is never traded, so it is left out of the share.
+            if self._quote_share(usdt_balance, krw_balance) < self.quote_threshold:
+                future = self._submit('quote', self._rebalance_quote)
+                if future:
+                    started.append(future)
+
+        return started
+
+    def _quote_share(self, usdt_balance, krw_balance):
+        fx_rate = fx_engine.rate()
+        if not fx_rate:
+            return 1
+        capital = usdt_balance + krw_balance / fx_rate
+        return usdt_balance / capital if capital > 0 else 1
+
+    def _submit(self, kind, function, *args):
+        with self.lock:
+            if kind in self.rebalancing:
+                return None
+            self.rebalancing.add(kind)
+
+        def run():
+            try:
+                return function(*args)
+            except Exception as e:
+                print(f"An error occurred while rebalancing {kind}: {e}")
+                return False
+            finally:
+                with self.lock:
+                    self.rebalancing.discard(kind)
+
+        return self.executor.submit(run)
+
+    def _rebalance_coin(self, currency, amount):
+        binance_amount = fetch_balance(binance, currency)
+        if not binance_amount or amount <= 0:
+            return False
+        route = route_table.get(currency, BINANCE_TO_COINONE)
+        if route is None:
+            print(f"Error: No withdrawal route for {currency}.")
+            return False
+
+        percentage = min(Decimal(100), Decimal(str(amount)) / Decimal(str(binance_amount)) * 100)
+        withdrawal = withdraw(binance, binance_master, currency, percentage, route.address,
+                              tag=route.tag, network=route.network)
+        if withdrawal is None:
+            return False
+        print(f"Rebalancing {currency}: withdrawal {withdrawal['id']} sent to Coinone.")
+        return wait_for_withdrawal_completion(binance_master, coinone, currency, withdrawal['id'])
+
+    def _rebalance_quote(self):
+        print("Rebalancing the quote from Coinone to Binance.")
+        success = self.rebalance_quote()
+        # The quote lands on Binance spot, so restore the spot/futures split of the hedge.
+        adjust_balances_to_leverage(binance, binance_futures, self.leverage)
+        return success
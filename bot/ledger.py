@@ -0,0 +1,219 @@
+import threading
+import time
+from decimal import Decimal
+
+
+# Differences below this are treated as rounding when reconciling.
+RECONCILE_TOLERANCE = Decimal('1e-8')
+
+# Fetches of one account before a fetch that raced with an update is kept, still marked uncertain.
+FETCH_ATTEMPTS = 3
+
+
+def _to_decimal(value):
+    return Decimal(0) if value is None else Decimal(str(value))
+
+
+def account_key(exchange, account_type=None):
+    """
+    :param exchange: The exchange instance (e.g., ccxt.binance()).
+    :param account_type: Overrides the client's account type (e.g., 'future' for the Binance futures wallet).
+    :return: A key identifying one venue, account type and sub-account.
+    """
+    return exchange.id, account_type or exchange.options.get('defaultType', 'spot'), exchange.apiKey
+
+
+class Account:
+    def __init__(self, exchange):
+        """
+        In-memory balances of one venue account.
+
+        :param exchange: The exchange instance the account is fetched with.
+        """
+        self.exchange = exchange
+        self.balances = {}
+        self.uncertain = True
+        self.version = 0
+        self.reconciled_at = None
+
+
+class PortfolioLedger:
+    def __init__(self, reconcile_interval: float = 30):
+        """
+        Multi-asset balances per venue and sub-account, seeded with one bulk balance fetch and then kept
+        current from order fills, transfers, withdrawals and deposits.
+
+        Reads are served from memory. An account is fetched again only when it is marked uncertain
+        (e.g. a fill without fill details), and a background thread reconciles every account against
+        the exchange.
+
+        :param reconcile_interval: Seconds between background reconciliations.
+        """
+        self.reconcile_interval = reconcile_interval
+        self.accounts = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _account(self, exchange):
+        key = account_key(exchange)
+        with self.lock:
+            account = self.accounts.get(key)
+            if account is None:
+                account = self.accounts[key] = Account(exchange)
+        return account
+
+    def _fetch(self, account):
+        for attempt in range(FETCH_ATTEMPTS):
+            with self.lock:
+                version = account.version
+            balance = account.exchange.fetch_balance()
+            fetched = {currency: _to_decimal(total) for currency, total in balance['total'].items()
+                       if total is not None}
+
+            with self.lock:
+                # Updates applied while the request was in flight may or may not be in the fetched totals.
+                raced = account.version != version
+                if raced and attempt < FETCH_ATTEMPTS - 1:
+                    continue
+                previous = account.balances
+                account.balances = fetched
+                # After the last attempt the totals are kept, but the next read fetches them again.
+                account.uncertain = raced
+                account.version += 1
+                account.reconciled_at = time.time()
+            return previous
+
+    def balances(self, exchange):
+        """
+        :param exchange: The exchange instance (e.g., ccxt.binance()).
+        :return: A dictionary mapping currencies to Decimal totals, fetched first if the account is uncertain.
+        """
+        account = self._account(exchange)
+        if account.uncertain:
+            self._fetch(account)
+        with self.lock:
+            return dict(account.balances)
+
+    def balance(self, exchange, currency):
+        """
+        :param exchange: The exchange instance (e.g., ccxt.binance()).
+        :param currency: The currency to read (e.g., 'USDT').
+        :return: The total balance as a Decimal, or None if the account holds no such currency.
+        """
+        return self.balances(exchange).get(currency)
+
+    def mark_uncertain(self, exchange, account_type=None):
+        """
+        Make the next read of the account fetch it from the exchange.
+        """
+        with self.lock:
+            account = self.accounts.get(account_key(exchange, account_type))
+            if account:
+                account.uncertain = True
+
+    def _adjust(self, key, currency, delta):
+        # Accounts that were never read are seeded on first read, so there is nothing to adjust.
+        account = self.accounts.get(key)
+        if account is None:
+            return
+        account.balances[currency] = account.balances.get(currency, Decimal(0)) + delta
+        account.version += 1
+
+    def apply_fill(self, exchange, order):
+        """
+        Apply a spot order's fills and fees.
+
+        :param exchange: The exchange instance the order was placed on.
+        :param order: The ccxt order structure.
+        """
+        key = account_key(exchange)
+        filled = order.get('filled')
+        cost = order.get('cost')
+        if key[1] != 'spot' or not filled or cost is None:
+            # Futures fills move margin and PnL, and unfilled responses carry no amounts.
+            self.mark_uncertain(exchange)
+            return
+
+        base, quote = order['symbol'].split(':')[0].split('/')
+        filled = _to_decimal(filled)
+        cost = _to_decimal(cost)
+        sign = 1 if order['side'] == 'buy' else -1
+        with self.lock:
+            self._adjust(key, base, sign * filled)
+            self._adjust(key, quote, -sign * cost)
+            for fee in order.get('fees') or []:
+                if fee and fee.get('cost') and fee.get('currency'):
+                    self._adjust(key, fee['currency'], -_to_decimal(fee['cost']))
+
+    def apply_transfer(self, from_exchange, to_exchange, currency, amount, from_type=None, to_type=None):
+        """
+        Move an amount between two accounts (e.g. spot to futures, or sub-account to master).
+        """
+        amount = _to_decimal(amount)
+        with self.lock:
+            self._adjust(account_key(from_exchange, from_type), currency, -amount)
+            self._adjust(account_key(to_exchange, to_type), currency, amount)
+
+    def apply_withdrawal(self, exchange, currency, amount):
+        """
+        Debit a withdrawal. The network fee is taken out of the withdrawn amount.
+        """
+        with self.lock:
+            self._adjust(account_key(exchange), currency, -_to_decimal(amount))
+
+    def apply_deposit(self, exchange, currency, amount):
+        """
+        Credit a deposit once it is confirmed.
+        """
+        with self.lock:
+            self._adjust(account_key(exchange), currency, _to_decimal(amount))
+
+    def reconcile(self, exchange):
+        """
+        Fetch the account and report any drift between the ledger and the exchange.
+
+        :return: A dictionary mapping drifted currencies to (ledger, exchange) totals.
+        """
+        account = self._account(exchange)
+        was_uncertain = account.uncertain
+        previous = self._fetch(account)
+        if was_uncertain or account.uncertain:
+            return {}
+
+        with self.lock:
+            current = account.balances
+        drift = {}
+        for currency in set(previous) | set(current):
+            expected = previous.get(currency, Decimal(0))
+            actual = current.get(currency, Decimal(0))
+            if abs(expected - actual) > RECONCILE_TOLERANCE:
+                drift[currency] = (expected, actual)
+        if drift:
+            print(f"Ledger drift on {exchange.id}: {drift}")
+        return drift
+
+    def start(self):
+        """
+        Reconcile every known account on a daemon thread.
+        """
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.reconcile_interval):
+            with self.lock:
+                exchanges = [account.exchange for account in self.accounts.values()]
+            for exchange in exchanges:
+                try:
+                    self.reconcile(exchange)
+                except Exception as e:
+                    print(f"An error occurred while reconciling {exchange.id}: {e}")
+
+
+portfolio_ledger = PortfolioLedger()
@@ -0,0 +1,177 @@
+import concurrent.futures
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+from order_tracker import order_tracker
+
+
+LEG_LATENCY_FILE = 'leg_latency.json'
+
+# One leg of a paired trade. `function(*args)` places the order and returns its order details.
+Leg = namedtuple('Leg', ['venue', 'exchange', 'function', 'args'])
+
+# Monotonic timestamps of one leg. `filled_at` is None until the fill is known.
+LegTiming = namedtuple('LegTiming', ['venue', 'submitted_at', 'acked_at', 'filled_at'])
+
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    def __init__(self, window=500):
+        """
+        The most recent `window` samples of one latency, summarized as percentiles.
+        """
+        self.samples = deque(maxlen=window)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def summary(self):
+        """
+        :return: A dictionary with the sample count and the p50, p95 and p99 in seconds.
+        """
+        ordered = sorted(self.samples)
+        summary = {'count': len(ordered)}
+        for percentile in PERCENTILES:
+            summary[f'p{percentile}'] = (ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)]
+                                         if ordered else None)
+        return summary
+
+
+class LegExecutor:
+    def __init__(self, workers=8, window=500, start_timeout: float = 1.0):
+        """
+        Long-lived workers that send the legs of a paired trade at the same moment and time every leg.
+
+        Legs wait on a shared barrier so they are released together. A pair is only submitted once a worker
+        is free for every one of its legs, so concurrent pairs cannot leave a leg waiting for a thread.
+        Submit, ack and fill are stamped with `time.monotonic()`, and each leg's lag behind the earliest
+        leg of its pair is kept in rolling histograms per venue, together with the unhedged window
+        (first fill to last fill) per pair.
+
+        :param workers: The number of worker threads.
+        :param window: The number of samples kept per histogram.
+        :param start_timeout: How long a leg waits for its partners before it is sent alone, in seconds.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='leg-executor')
+        self.workers = workers
+        self.free_workers = workers
+        self.workers_free = threading.Condition()
+        self.window = window
+        self.start_timeout = start_timeout
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def _histogram(self, *key):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = RollingHistogram(self.window)
+        return histogram
+
+    def _run_leg(self, leg, barrier):
+        try:
+            barrier.wait(self.start_timeout)
+        except threading.BrokenBarrierError:
+            pass
+        submitted_at = time.monotonic()
+        try:
+            result = leg.function(*leg.args)
+        except Exception as e:
+            print(f"An error occurred during the {leg.venue} leg: {e}")
+            result = None
+        return result, submitted_at, time.monotonic()
+
+    def execute(self, name, legs):
+        """
+        Send every leg at once and wait for all acknowledgements.
+
+        :param name: The name of the pair (e.g., 'adjust_and_hedge').
+        :param legs: The `Leg` tuples to send.
+        :return: A tuple of the legs' results and their `LegTiming` tuples, in the order of `legs`.
+        """
+        if len(legs) > self.workers:
+            raise ValueError(f"{name} has {len(legs)} legs but the executor only has {self.workers} workers.")
+
+        # Reserve a worker for every leg before submitting any of them.
+        with self.workers_free:
+            self.workers_free.wait_for(lambda: self.free_workers >= len(legs))
+            self.free_workers -= len(legs)
+        try:
+            barrier = threading.Barrier(len(legs))
+            futures = [self.executor.submit(self._run_leg, leg, barrier) for leg in legs]
+            outcomes = [future.result() for future in futures]
+        finally:
+            with self.workers_free:
+                self.free_workers += len(legs)
+                self.workers_free.notify_all()
+
+        results = [result for result, _, _ in outcomes]
+        timings = [None] * len(legs)
+        pending = []
+        for index, (leg, (result, submitted_at, acked_at)) in enumerate(zip(legs, outcomes)):
+            order = result.get('order') if isinstance(result, dict) else None
+            if order is not None and order.get('status') not in ('closed', 'canceled', 'expired', 'rejected'):
+                pending.append((index, order_tracker.track_order(leg.exchange, order)))
+                filled_at = None
+            else:
+                filled_at = acked_at if order is not None else None
+            timings[index] = LegTiming(leg.venue, submitted_at, acked_at, filled_at)
+
+        if not pending:
+            self._record(name, timings)
+        else:
+            self._record_when_filled(name, timings, pending)
+        return results, timings
+
+    def _record_when_filled(self, name, timings, pending):
+        remaining = [len(pending)]
+
+        def on_done(index, future):
+            filled = not future.exception() and future.result().get('status') == 'closed'
+            with self.lock:
+                if filled:
+                    timings[index] = timings[index]._replace(filled_at=time.monotonic())
+                remaining[0] -= 1
+                done = remaining[0] == 0
+            if done:
+                self._record(name, timings)
+
+        for index, future in pending:
+            future.add_done_callback(lambda future, index=index: on_done(index, future))
+
+    def _record(self, name, timings):
+        with self.lock:
+            for field in ('submitted_at', 'acked_at', 'filled_at'):
+                values = [getattr(timing, field) for timing in timings]
+                if None in values:
+                    continue
+                first = min(values)
+                for timing, value in zip(timings, values):
+                    self._histogram(timing.venue, field).add(value - first)
+            fills = [timing.filled_at for timing in timings]
+            if None not in fills:
+                self._histogram('pair', name).add(max(fills) - min(fills))
+
+    def summary(self):
+        """
+        :return: A nested dictionary of histogram summaries, e.g. summary['binance']['acked_at']['p99'],
+            and summary['pair']['adjust_and_hedge'] for the unhedged window.
+        """
+        with self.lock:
+            summary = {}
+            for (group, field), histogram in self.histograms.items():
+                summary.setdefault(group, {})[field] = histogram.summary()
+            return summary
+
+    def export(self, path=LEG_LATENCY_FILE):
+        """
+        Write the histogram summaries to a JSON file.
+        """
+        with open(path, mode='w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+leg_executor = LegExecutor()
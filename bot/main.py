@@ -2,6 +2,18 @@ from order import *
 from fetch_data import *
 from logger import *
 from safety import *
+from market_stream import PremiumBoard, StreamingSource
+from executable import calc_executable_premiums, books_from_board, fetch_candidate_books
+from scanner_service import ScannerService
+from premium_matrix import fetch_premium_matrix
+from hedge import hedge_engine
+from leg_executor import Leg, leg_executor
+from inventory import InventoryEngine
+from medium_cost import rank_mediums
+from pipeline import CyclePipeline
+from routes import COINONE_TO_BINANCE
+from market_spec import Quantizer
+from universe import start_universe_refresh
 
 
 class State:
@@ -41,25 +53,143 @@ class State:
         return self.krw_balance / fx_rate + self.usdt_balance
 
 
-fx_rate = 1300
-
 BUY_PERCENTAGE = 100
 
+# Maintain streaming local order books instead of scanning with REST snapshots.
+USE_MARKET_STREAM = False
+
+# The PremiumBoard kept current by the market stream, if it is running.
+market_board = None
+
+# Keep a background scanner taking snapshots over pooled connections.
+USE_SCANNER_SERVICE = False
+
+# The oldest scanner service snapshot a cycle accepts, in seconds.
+SNAPSHOT_MAX_AGE = 2
+
+# The running ScannerService, if any.
+scanner_service = None
+
+# Rank every KRW venue against Binance (and optionally Bybit) instead of Coinone alone.
+USE_PREMIUM_MATRIX = False
+INCLUDE_BYBIT = False
+
+# Rank targets by premium after slippage for the traded notional instead of by last price.
+USE_EXECUTABLE_PREMIUM = False
+
+# Number of last-price leaders whose books are walked for the executable premium.
+EXECUTABLE_CANDIDATES = 20
+
+# Number of top candidates whose safety checks run in parallel. 1 checks them one at a time.
+SPECULATIVE_CHECKS = 1
+
+# Track Binance orders over the user-data streams instead of polling open orders.
+USE_USER_DATA_STREAM = False
+
+# Pick the transfer medium by the expected round-trip cost of the KRW balance, counting fees,
+# withdrawal minimums and rounding, instead of by last-price premium alone.
+# The cost of time in transit is `medium_cost.TIME_COST_PER_HOUR`.
+USE_MEDIUM_COST_MODEL = False
+
+# Consider every coin quoted on both exchanges as a medium, not only `transfer_mediums`.
+MEDIUM_ALL_COINS = False
+
+# Run cycles as pipelined state machines, so a new cycle scans and hedges
+# while earlier cycles are still transferring.
+USE_PIPELINE = False
+
+# The most cycles in flight at once.
+PIPELINE_MAX_CYCLES = 3
+
+# The USDT each cycle spends on its buy, or None to split the free capital between the free slots.
+PIPELINE_CYCLE_NOTIONAL = None
+
+# Trade from coin inventory held on both exchanges and rebalance it in the background
+# instead of withdrawing the target inside every cycle.
+USE_INVENTORY_MODE = False
 
-def determine_target(fx_rate: float, network_data):
+# The currencies held as inventory. Each one's total inventory must already be shorted on Binance futures;
+# the engine refuses to start otherwise.
+INVENTORY_CURRENCIES = []
+
+# The smallest premium percentage an inventory trade is sent for.
+MIN_INVENTORY_PREMIUM = 1.0
+
+# The running InventoryEngine, if any.
+inventory_engine = None
+
+
+def rank_by_executable_premium(premiums, notional: float, fx_rate: float):
+    """
+    Re-ranks the leading candidates by their premium after walking the order books for `notional`.
+
+    :param premiums: Premium tuples sorted in descending order.
+    :param notional: The amount of USDT the buy leg will spend.
+    :param fx_rate: The exchange rate from USDT to KRW.
+    :return: `ExecutablePremium` tuples sorted in descending order. Candidates too thin to fill are dropped.
+    """
+    symbols = [premium[0].split("/")[0] for premium in premiums[:EXECUTABLE_CANDIDATES]]
+
+    if market_board is not None:
+        symbols, ask_books, bid_books = books_from_board(market_board, symbols)
+    else:
+        symbols, ask_books, bid_books = fetch_candidate_books(
+            get_async_scanner(), symbols)
+
+    return calc_executable_premiums(symbols, ask_books, bid_books, notional, fx_rate)
+
+
+def determine_target(fx_rate: float, network_data, snapshot=None, notional=None):
     """
     Finds the cryptocurrency with the highest K-premium that is also depositable.
 
     :param fx_rate: The exchange rate from USDT to KRW.
+    :param network_data: The currency details read from address_network.csv.
+    :param snapshot: An optional `PremiumSnapshot` to read prices from.
+    :param notional: The amount of USDT to trade. If given, candidates are ranked by executable premium.
     :return: The target currency with the highest premium that is depositable.
     """
-    # Calculate premiums for all tradable pairs in Coinone.
-    # Returns an array sorted in descending order by premium percentage.
-    premiums = conc_find_highest_premium(fx_rate, list(network_data.keys()))
+    def is_safe(premium):
+        target = premium[0].split("/")[0]
+        return target in network_data and safety_check(target, network_data)
 
-    # Iterate through the sorted premiums to find the first depositable currency
-    for premium in premiums:
-        if safety_check(premium[0].split("/")[0], network_data):
+    if notional is not None:
+        if market_board is not None:
+            premiums = market_board.ranked_premiums()
+        else:
+            premiums = conc_find_highest_premium(
+                fx_rate, list(network_data.keys()), snapshot=snapshot)
+
+        # Find the first depositable currency among the executable premiums
+        premium = find_first_safe(
+            rank_by_executable_premium(premiums, notional, fx_rate), is_safe, SPECULATIVE_CHECKS)
+        if premium:
+            return premium
+    elif USE_PREMIUM_MATRIX:
+        # One bulk request per venue. The other venues are compared for monitoring, but the legs
+        # only trade Binance against Coinone, so only that pair is ranked for execution.
+        matrix = fetch_premium_matrix(fx_rate, INCLUDE_BYBIT)
+        premiums = matrix.ranked(symbols=network_data, venues={'coinone'}, references={'binance'})
+        premium = find_first_safe(premiums, is_safe, SPECULATIVE_CHECKS)
+        if premium:
+            return premium
+    elif market_board is not None:
+        if SPECULATIVE_CHECKS > 1:
+            premium = find_first_safe(market_board.ranked_premiums(), is_safe, SPECULATIVE_CHECKS)
+        else:
+            # The streamed board keeps its premiums in a heap, so no list is built or sorted.
+            premium = market_board.next_best_premium(is_safe)
+        if premium:
+            return premium
+    else:
+        # Calculate premiums for all tradable pairs in Coinone.
+        # Returns an array sorted in descending order by premium percentage.
+        premiums = conc_find_highest_premium(
+            fx_rate, list(network_data.keys()), snapshot=snapshot)
+
+        # Find the first depositable currency among the sorted premiums
+        premium = find_first_safe(premiums, is_safe, SPECULATIVE_CHECKS)
+        if premium:
             return premium
 
     # If no depositable currency is found, return None or raise an exception
@@ -133,8 +263,12 @@ def try_target_short(exchange, target: str, leverage: int):
     :return: A dictionary with order details including average price, quantity, total cost, and fee if successful, None otherwise.
     """
     try:
-        # Place market short order for the target currency with 100% of the USDT balance
-        order_details = short(exchange, target, 100, leverage)
+        # Place market short order for the target currency with 100% of the USDT balance.
+        # The hedge engine sends it as a single request from cached leverage, brackets and mark price.
+        if exchange is hedge_engine.exchange:
+            order_details = hedge_engine.short(target, leverage, 100)
+        else:
+            order_details = short(exchange, target, 100, leverage)
         if not order_details:
             return None
 
@@ -192,8 +326,9 @@ def try_target_withdraw(target: str):
                 coinone, target, is_fetch=False)
 
             # Make the withdraw request
+            # Withdrawals are sent from the master account after a sub-to-master transfer
             target_withdrawal = withdraw(
-                binance, target, 100, target_withdraw_address, tag=target_withdraw_tag, network=network)
+                binance, binance_master, target, 100, target_withdraw_address, tag=target_withdraw_tag, network=network)
 
             # Return the withdrawal status
             if target_withdrawal is None:
@@ -201,11 +336,9 @@ def try_target_withdraw(target: str):
 
             target_withdrawal_id = target_withdrawal['id']
 
-            # Wait until the withdrawal is complete
-            wait_for_withdrawal_completion(
-                binance, coinone, target, target_withdrawal_id)
-
-            return True
+            # Wait until the withdrawal is complete and credited
+            return wait_for_withdrawal_completion(
+                binance_master, coinone, target, target_withdrawal_id)
         else:
             # If the currency is not depositable, sell it on Binance
             sell_order_details = sell(binance, target, "USDT", 100)
@@ -245,16 +378,20 @@ def try_target_sell(target: str):
         return None
 
 
-def try_medium_sell(medium: str):
+def try_medium_sell(medium: str, amount=None):
     """
     Places and confirms a market sell order for the medium currency on Binance.
 
     :param medium: The medium currency to sell (e.g., 'BTC').
+    :param amount: The amount to sell. The whole Binance balance if omitted.
     :return: A dictionary with order details including average price, quantity, total cost, and fee if successful, None otherwise.
     """
     try:
         # Place market sell order for the medium currency.
-        order_details = sell(binance, medium, "USDT", 100)
+        if amount is not None:
+            order_details = trade_amount(binance, medium, "USDT", "sell", amount)
+        else:
+            order_details = sell(binance, medium, "USDT", 100)
         if not order_details:
             return None
 
@@ -273,51 +410,81 @@ def try_medium_sell(medium: str):
         return None
 
 
-def determine_medium():
+def determine_medium(snapshot=None, notional_krw=None):
     """
     Determines the cryptocurrency with the least transfer loss based on the current FX rate.
 
+    :param snapshot: An optional `PremiumSnapshot` to read prices from.
+    :param notional_krw: The amount of KRW to transfer, used by the cost model. Defaults to the share of the
+        Coinone KRW balance `try_medium_buy` spends.
     :return: The currency with the least transfer loss.
     """
+    if USE_MEDIUM_COST_MODEL:
+        if snapshot is None:
+            snapshot = take_scan_snapshot(fx_engine.rate())
+        if notional_krw is None:
+            notional_krw = (fetch_balance(coinone, "KRW") or 0) * BUY_PERCENTAGE / 100
+        if notional_krw:
+            candidates = transfer_mediums
+            if MEDIUM_ALL_COINS:
+                candidates = sorted(set(snapshot.krw_quotes) & set(snapshot.usdt_quotes))
+            # Inventory currencies are never used as mediums, so a transfer cannot move the inventory.
+            candidates = [currency for currency in candidates if currency not in INVENTORY_CURRENCIES]
+            costs = rank_mediums(snapshot, notional_krw, candidates)
+            if costs:
+                print(f"Medium {costs[0].currency}: {costs[0].cost_percent:.3f}% cost, "
+                      f"{costs[0].arrival_seconds:.0f} s expected arrival")
+                return costs[0].currency
+
     # Calculate transfer losses for all possible transfer mediums.
-    transfers = conc_calc_transfer_loss(fx_rate)
+    transfers = conc_calc_transfer_loss(fx_engine.rate(), snapshot)
 
-    # Take the currency with the least transfer loss.
-    medium = transfers[0][0]
+    # Take the currency with the least transfer loss that is not held as inventory.
+    medium = next(transfer[0] for transfer in transfers if transfer[0] not in INVENTORY_CURRENCIES)
 
     return medium
 
 
-def try_medium_withdraw(medium: str):
+def try_medium_withdraw(medium: str, amount=None):
     """
     Places and confirms a WITHDRAW request for the medium currency from Coinone to Binance.
 
     :param medium: The medium currency to withdraw (e.g., 'BTC').
-    :return: True if the withdrawal is successful, False otherwise.
+    :param amount: The amount to withdraw. The whole Coinone balance if omitted.
+    :return: The amount that arrived on Binance as a Decimal if the deposit was credited, None otherwise.
     """
     try:
-        # Fetch withdraw address and (optionally) tag from Binance.
-        medium_withdraw_address, medium_withdraw_tag = fetch_deposit_address(
-            binance, medium)
+        # Fetch the Binance deposit address and (optionally) tag from the route table.
+        route = route_table.get(medium, COINONE_TO_BINANCE)
+        if route is None or not route.address:
+            print(f"Error: No deposit address for {medium} on Binance.")
+            return None
+
+        if amount is None:
+            amount = fetch_balance(coinone, medium)
+        amount = Decimal(str(amount or 0))
+        info = current_coinone_currencies().transfer_info(medium)
+        if info is not None and info.max_precision is not None:
+            amount = Quantizer(info.max_precision, ccxt.DECIMAL_PLACES)(amount)
 
         # Make the withdraw request.
-        medium_withdrawal = withdraw(
-            coinone, medium, 100, medium_withdraw_address, medium_withdraw_tag)
+        medium_withdrawal = withdraw_amount(coinone, medium, amount, route.address, tag=route.tag)
 
         # Return the withdrawal status.
         if medium_withdrawal is None:
-            return False
+            return None
 
         medium_withdrawal_id = medium_withdrawal['id']
 
-        # Wait until the withdrawal is complete.
-        wait_for_withdrawal_completion(
-            coinone, binance, medium, medium_withdrawal_id)
+        # Wait until the withdrawal is complete and credited.
+        if not wait_for_withdrawal_completion(coinone, binance, medium, medium_withdrawal_id):
+            return None
 
-        return True
+        fee = info.withdrawal_fee if info is not None and info.withdrawal_fee else 0
+        return amount - Decimal(str(fee))
     except Exception as e:
         print(f"An error occurred: {e}")
-        return False
+        return None
 
 
 def adjust_and_hedge(target, leverage):
@@ -332,50 +499,27 @@ def adjust_and_hedge(target, leverage):
     # Adjust balances to maintain the specified leverage ratio
     adjust_balances_to_leverage(binance, binance_futures, leverage)
 
-    buy_details = None
-    short_details = None
+    # Set leverage and warm the mark price and brackets before either leg is sent
+    hedge_engine.prepare(target, leverage)
 
-    def buy_spot():
-        """
-        Buy the target currency with 100% of the spot balance.
-        """
-        nonlocal buy_details
-        try:
-            # Place market buy order for the target currency with 100% of the spot USDT balance
-            buy_details = try_target_buy(target, binance)
-            if buy_details:
-                print("Spot buy order details:", buy_details)
-            else:
-                print("Failed to place the spot buy order.")
-        except Exception as e:
-            print(f"An error occurred during spot buy: {e}")
-
-    def short_futures():
-        """
-        Place a short position with 100% of the futures balance, using the specified leverage rate.
-        """
-        nonlocal short_details
-        try:
-            # Place market short order for the target currency with 100% of the futures USDT balance
-            short_details = try_target_short(binance_futures, target, leverage)
-            if short_details:
-                print("Futures short order details:", short_details)
-            else:
-                print("Failed to place the futures short order.")
-        except Exception as e:
-            print(f"An error occurred during futures short: {e}")
-
-    # Create threads for buying and shorting
-    buy_thread = threading.Thread(target=buy_spot)
-    short_thread = threading.Thread(target=short_futures)
-
-    # Start threads
-    buy_thread.start()
-    short_thread.start()
-
-    # Wait for both threads to finish
-    buy_thread.join()
-    short_thread.join()
+    # Send both legs together on the long-lived leg executor
+    (buy_details, short_details), timings = leg_executor.execute('adjust_and_hedge', [
+        Leg('binance', binance, try_target_buy, (target, binance)),
+        Leg('binance_futures', binance_futures, try_target_short, (binance_futures, target, leverage)),
+    ])
+
+    if buy_details:
+        print("Spot buy order details:", buy_details)
+    else:
+        print("Failed to place the spot buy order.")
+
+    if short_details:
+        print("Futures short order details:", short_details)
+    else:
+        print("Failed to place the futures short order.")
+
+    if buy_details and short_details:
+        hedge_engine.record_latency(target, timings[0].acked_at, timings[1].acked_at)
 
     print("Completed spot buy and futures short operations.")
     return buy_details, short_details
@@ -383,54 +527,27 @@ def adjust_and_hedge(target, leverage):
 
 def sell_and_close(target):
     """
-    Queries for the target balance in Coinone and uses two threads to concurrently sell all the target balance
-    in Coinone and close 100% of the target short position in Binance Futures.
+    Queries for the target balance in Coinone and concurrently sells all the target balance in Coinone
+    and closes 100% of the target short position in Binance Futures.
 
     :param target: The target currency to trade (e.g., 'BTC').
     :return: A tuple containing Coinone sell order details and Binance Futures close short order details.
     """
-    sell_details = None
-    close_details = None
-
-    def sell_target_in_coinone():
-        """
-        Sells all the target balance in Coinone.
-        """
-        nonlocal sell_details
-        try:
-            sell_details = try_target_sell(target)
-            if sell_details:
-                print("Coinone sell order details:", sell_details)
-            else:
-                print("Failed to place the sell order in Coinone.")
-        except Exception as e:
-            print(f"An error occurred during Coinone sell: {e}")
-
-    def close_short_in_binance():
-        """
-        Closes 100% of the target short position in Binance Futures.
-        """
-        nonlocal close_details
-        try:
-            close_details = close_short(binance_futures, target, 'USDT')
-            if close_details:
-                print("Binance Futures close short order details:", close_details)
-            else:
-                print("Failed to close the short position in Binance Futures.")
-        except Exception as e:
-            print(f"An error occurred during Binance Futures close short: {e}")
-
-    # Create threads for selling and closing the short position
-    sell_thread = threading.Thread(target=sell_target_in_coinone)
-    close_thread = threading.Thread(target=close_short_in_binance)
-
-    # Start threads
-    sell_thread.start()
-    close_thread.start()
-
-    # Wait for both threads to finish
-    sell_thread.join()
-    close_thread.join()
+    # Send both legs together on the long-lived leg executor
+    (sell_details, close_details), _ = leg_executor.execute('sell_and_close', [
+        Leg('coinone', coinone, try_target_sell, (target,)),
+        Leg('binance_futures', binance_futures, close_short, (binance_futures, target, 'USDT')),
+    ])
+
+    if sell_details:
+        print("Coinone sell order details:", sell_details)
+    else:
+        print("Failed to place the sell order in Coinone.")
+
+    if close_details:
+        print("Binance Futures close short order details:", close_details)
+    else:
+        print("Failed to close the short position in Binance Futures.")
 
     print("Completed Coinone sell and Binance Futures short position close operations.")
     return sell_details, close_details
@@ -470,11 +587,25 @@ def cycle(state: State, csv_file_data):
     :param state: The current state of balances in KRW and USDT.
     :return: A dictionary with the order details for target buy, target sell, medium buy, and medium sell.
     """
+    # Reuse the scanner service's snapshot when it is recent enough.
+    snapshot = None
+    if scanner_service is not None:
+        snapshot = scanner_service.latest_snapshot(SNAPSHOT_MAX_AGE)
+
+    # Otherwise take one snapshot of every price for the scan (one request per exchange).
+    if snapshot is None:
+        snapshot = take_scan_snapshot(fx_engine.rate())
+
+    # The snapshot carries the FX rate implied by its own prices.
+    fx_rate = snapshot.fx_rate
     if fx_rate is None:
         return None
 
     # Determine the target currency with the highest premium.
-    target_data = determine_target(fx_rate, csv_file_data)
+    notional = None
+    if USE_EXECUTABLE_PREMIUM:
+        notional = state.usdt_balance * BUY_PERCENTAGE / 100
+    target_data = determine_target(fx_rate, csv_file_data, snapshot, notional)
     target = target_data[0]
 
     print(target_data)
@@ -492,7 +623,8 @@ def cycle(state: State, csv_file_data):
     target_sell_details, target_close_details = sell_and_close(target)
 
     # Determine the medium currency with the least transfer loss.
-    medium = determine_medium()
+    # The target leg takes minutes, so the medium is ranked on a fresh snapshot.
+    medium = determine_medium(take_scan_snapshot(fx_rate))
 
     # TODO: Maybe change to using just USDT or USDC?
 
@@ -511,6 +643,149 @@ def cycle(state: State, csv_file_data):
     }
 
 
+def rebalance_quote():
+    """
+    Moves the KRW balance on Coinone to USDT on Binance through the medium currency with the least transfer loss.
+
+    Only the medium this round trip bought is withdrawn and sold, so inventory held in the same currency
+    is never moved.
+
+    :return: True if the medium was sold on Binance, False otherwise.
+    """
+    medium = determine_medium(take_scan_snapshot(fx_engine.rate()))
+    medium_buy_details = try_medium_buy(medium)
+    if not medium_buy_details:
+        return False
+    arrived = try_medium_withdraw(medium, net_of_fees(medium_buy_details, 'quantity', medium))
+    if arrived is None:
+        return False
+    return try_medium_sell(medium, arrived) is not None
+
+
+def inventory_cycle(state: State, csv_file_data):
+    """
+    Executes one inventory trade: buys the target on Binance and sells it on Coinone at the same time.
+    Transfers are left to the inventory engine's background rebalancing.
+
+    :param state: The current state of balances in KRW and USDT.
+    :return: A dictionary with the order details for target buy and target sell.
+    """
+    snapshot = None
+    if scanner_service is not None:
+        snapshot = scanner_service.latest_snapshot(SNAPSHOT_MAX_AGE)
+    if snapshot is None:
+        snapshot = take_scan_snapshot(fx_engine.rate())
+
+    fx_rate = snapshot.fx_rate
+    if fx_rate is None:
+        return None
+
+    # Only currencies held as inventory can be traded without a transfer.
+    inventory_data = {currency: csv_file_data[currency]
+                      for currency in inventory_engine.currencies if currency in csv_file_data}
+
+    notional = None
+    if USE_EXECUTABLE_PREMIUM:
+        notional = state.usdt_balance * BUY_PERCENTAGE / 100
+    target_data = determine_target(fx_rate, inventory_data, snapshot, notional)
+    if not target_data or target_data[2] < MIN_INVENTORY_PREMIUM:
+        return None
+    target = target_data[0].split("/")[0]
+
+    price = snapshot.usdt_quotes[target].ask or snapshot.usdt_quotes[target].last
+    target_buy_details, target_sell_details = inventory_engine.trade(target, price, notional)
+
+    return {
+        'target_buy': target_buy_details,
+        'target_sell': target_sell_details,
+    }
+
+
+def start_pipeline(csv_file_data):
+    """
+    Starts the pipelined cycle state machine, resuming any cycles persisted by a previous run.
+
+    :param csv_file_data: The currency details read from address_network.csv.
+    :return: The `CyclePipeline`, or None if Coinone withdrawals are not available.
+    """
+    def select_target(held, notional):
+        snapshot = None
+        if scanner_service is not None:
+            snapshot = scanner_service.latest_snapshot(SNAPSHOT_MAX_AGE)
+        if snapshot is None:
+            snapshot = take_scan_snapshot(fx_engine.rate())
+        if snapshot.fx_rate is None:
+            return None
+
+        # Targets held by running cycles are left to them, and inventory currencies to the inventory engine.
+        network_data = {currency: data for currency, data in csv_file_data.items()
+                        if currency not in held and currency not in INVENTORY_CURRENCIES}
+        target_data = determine_target(
+            snapshot.fx_rate, network_data, snapshot, notional if USE_EXECUTABLE_PREMIUM else None)
+        return target_data[0].split("/")[0] if target_data else None
+
+    def select_medium(notional_krw):
+        return determine_medium(notional_krw=notional_krw)
+
+    # Every cycle withdraws its medium from Coinone, so do not start one the key cannot complete.
+    if not coinone_withdrawal_available(coinone, transfer_mediums[0]):
+        print("Coinone withdrawals are not available to this API key. The pipeline was not started.")
+        return None
+
+    pipeline = CyclePipeline(select_target, select_medium, leverage,
+                             PIPELINE_MAX_CYCLES, PIPELINE_CYCLE_NOTIONAL)
+    resumed = pipeline.load()
+    if resumed:
+        print(f"Resumed {resumed} cycles.")
+    return pipeline
+
+
+def start_inventory_engine(currencies):
+    """
+    Starts trading from the inventory of the given currencies.
+
+    :param currencies: The currencies held as inventory (e.g., ['XRP', 'TRX']).
+    :return: The `InventoryEngine`, or None if some inventory is not hedged.
+    """
+    global inventory_engine
+
+    engine = InventoryEngine(currencies, leverage, rebalance_quote)
+    if engine.unhedged():
+        print("Hedge the inventory on Binance futures before starting the inventory mode.")
+        return None
+    inventory_engine = engine
+    return inventory_engine
+
+
+def start_market_stream(symbols):
+    """
+    Starts streaming order books for the given currencies and routes determine_target to them.
+
+    :param symbols: The base currencies to stream (e.g., ['BTC', 'XRP']).
+    :return: The `PremiumBoard` being updated.
+    """
+    global market_board
+
+    market_board = PremiumBoard(fx_engine.rate())
+    fx_engine.subscribe(market_board.set_fx_rate)
+    StreamingSource(market_board, symbols).start()
+    return market_board
+
+
+def start_scanner_service(interval=1.0):
+    """
+    Starts the background scanner service that cycles read their snapshots from.
+
+    :param interval: Seconds between scans.
+    :return: The running `ScannerService`.
+    """
+    global scanner_service
+
+    scanner_service = ScannerService(fx_engine.rate, interval)
+    scanner_service.start()
+    return scanner_service
+
+
 def go():
     fx_rate_thread = threading.Thread(target=update_fx_rate)
     fx_rate_thread.daemon = True
@@ -518,16 +793,47 @@ def go():
 
     state = State(krw_balance=0, usdt_balance=0)
 
-    with read_address_network_csv("address_network.csv") as csv_file_data:
-
+    # Built synchronously on a fresh checkout, since every target lookup reads it.
+    start_universe_refresh()
+    status_registry.start()
+    portfolio_ledger.start()
+    position_index.start()
+    route_table.start()
+    if USE_USER_DATA_STREAM:
+        order_tracker.subscribe(position_index.handle_user_event)
+        order_tracker.start_user_stream(binance)
+        order_tracker.start_user_stream(binance_futures, futures=True)
+
+    csv_file_data = read_address_network_csv("address_network.csv")
+    if USE_MARKET_STREAM:
+        start_market_stream(list(csv_file_data.keys()))
+    if USE_SCANNER_SERVICE:
+        start_scanner_service()
+    if USE_INVENTORY_MODE and start_inventory_engine(INVENTORY_CURRENCIES) is None:
+        return
+
+    if USE_PIPELINE:
+        pipeline = start_pipeline(csv_file_data)
+        if pipeline is None:
+            return
         while True:
-            state.fetch_balance()
-            order_details = cycle(state, csv_file_data)
-            if order_details:
+            for order_details in pipeline.tick():
                 log_order_details_to_csv(order_details)
-            # Add a sleep interval to control the frequency of cycles
+                leg_executor.export()
             time.sleep(1)
 
+    while True:
+        state.fetch_balance()
+        if inventory_engine is not None:
+            order_details = inventory_cycle(state, csv_file_data)
+        else:
+            order_details = cycle(state, csv_file_data)
+        if order_details:
+            log_order_details_to_csv(order_details)
+            leg_executor.export()
+        # Add a sleep interval to control the frequency of cycles
+        time.sleep(1)
+
 
 if __name__ == "__main__":
     # print(fetch_deposit_address(coinone, "BTC", False))
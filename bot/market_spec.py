@@ -0,0 +1,117 @@
+import threading
+from decimal import Decimal, ROUND_DOWN
+
+import ccxt
+
+from cache import cached_markets, exchange_key
+
+
+def _to_decimal(value):
+    return Decimal(0) if value is None else Decimal(str(value))
+
+
+class Quantizer:
+    __slots__ = ('quantum', 'step')
+
+    def __init__(self, precision, precision_mode):
+        """
+        Rounds Decimal values down to one precision field of a market.
+
+        :param precision: The ccxt precision value, a step size under TICK_SIZE or a digit count under DECIMAL_PLACES.
+        :param precision_mode: The exchange's `precisionMode`.
+        """
+        if precision is None:
+            self.quantum = None
+            self.step = None
+        elif precision_mode == ccxt.TICK_SIZE:
+            step = Decimal(str(precision)).normalize()
+            # A power-of-ten step is a plain quantize; other steps (e.g. 0.5) are floored to a multiple.
+            self.quantum = Decimal(1).scaleb(step.as_tuple().exponent)
+            self.step = None if step == self.quantum else step
+        else:
+            self.quantum = Decimal(1).scaleb(-int(precision))
+            self.step = None
+
+    def __call__(self, value: Decimal):
+        if self.quantum is None:
+            return value
+        value = value.quantize(self.quantum, rounding=ROUND_DOWN)
+        if self.step is not None:
+            value = (value // self.step) * self.step
+        return value
+
+
+class MarketSpec:
+    __slots__ = ('symbol', 'id', 'min_cost', 'min_amount', 'amount_step', 'price_step', 'taker',
+                 'floor_amount', 'floor_price', 'floor_cost')
+
+    def __init__(self, market, precision_mode):
+        """
+        Order sizing rules of one market, resolved once from its ccxt market structure.
+
+        :param market: The ccxt market dictionary.
+        :param precision_mode: The exchange's `precisionMode`.
+        """
+        precision = market['precision']
+        limits = market['limits']
+        self.symbol = market['symbol']
+        self.id = market['id']
+        self.min_cost = _to_decimal(limits['cost']['min'])
+        self.min_amount = _to_decimal(limits['amount']['min'])
+        self.taker = _to_decimal(market.get('taker'))
+        self.floor_amount = Quantizer(precision.get('amount'), precision_mode)
+        self.floor_price = Quantizer(precision.get('price'), precision_mode)
+        # Market buys are sized in the quote currency; fall back to the price precision when it is not given.
+        self.floor_cost = Quantizer(precision.get('quote') or precision.get('price'), precision_mode)
+        self.amount_step = self.floor_amount.step or self.floor_amount.quantum
+        self.price_step = self.floor_price.step or self.floor_price.quantum
+
+
+class MarketSpecTable:
+    def __init__(self, markets, precision_mode):
+        """
+        `MarketSpec` for every market of one venue, keyed by symbol.
+
+        :param markets: The exchange's markets keyed by symbol.
+        :param precision_mode: The exchange's `precisionMode`.
+        """
+        self.markets = markets
+        self.specs = {}
+        for symbol, market in markets.items():
+            try:
+                self.specs[symbol] = MarketSpec(market, precision_mode)
+            except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                print(f"Skipping market spec for {symbol}: {e}")
+
+    def __contains__(self, symbol):
+        return symbol in self.specs
+
+    def get(self, symbol):
+        """
+        :return: The `MarketSpec` for the symbol, or None if it is not listed.
+        """
+        return self.specs.get(symbol)
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def market_specs(exchange, max_age: float = None):
+    """
+    :param exchange: The exchange instance (e.g., ccxt.binance()).
+    :param max_age: The oldest market list accepted, in seconds.
+    :return: The venue's `MarketSpecTable`, rebuilt only when its market list was reloaded.
+    """
+    markets = cached_markets(exchange, max_age)
+    key = exchange_key(exchange)
+    table = _tables.get(key)
+    if table is not None and table.markets is markets:
+        return table
+
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None or table.markets is not markets:
+            table = MarketSpecTable(markets, exchange.precisionMode)
+            _tables[key] = table
+        return table
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import threading
+import time
+from itertools import islice
+
+import websockets
+
+from exchanges import binance, binance_futures
+from orderbook import LocalOrderBook, SequenceGapError
+from premium_heap import PremiumHeap
+
+
+# Venue names used for the local books.
+BINANCE_SPOT = 'binance'
+BINANCE_FUTURES = 'binance_futures'
+COINONE = 'coinone'
+
+BINANCE_SPOT_WS_URL = 'wss://stream.binance.com:9443/stream?streams='
+BINANCE_FUTURES_WS_URL = 'wss://fstream.binance.com/stream?streams='
+COINONE_WS_URL = 'wss://stream.coinone.co.kr'
+
+
+class PremiumBoard:
+    def __init__(self, fx_rate: float):
+        """
+        Local order books for every venue plus the premium of each symbol, updated per book event.
+
+        The premium of a symbol is the Coinone best bid (in USDT) against the Binance spot best ask,
+        i.e. what buying on Binance and selling on Coinone would capture at the top of book.
+
+        :param fx_rate: The exchange rate from USDT to KRW, or None until one is known.
+        """
+        self.fx_rate = fx_rate
+        self.books = {}
+        self.premiums = PremiumHeap()
+        self.lock = threading.Lock()
+
+    def book(self, venue, symbol):
+        """
+        :return: The `LocalOrderBook` for the venue and symbol, created on first use.
+        """
+        key = (venue, symbol)
+        if key not in self.books:
+            self.books[key] = LocalOrderBook(venue, symbol)
+        return self.books[key]
+
+    def handle_event(self, event):
+        """
+        Apply a normalized book event and recompute the premium of that symbol only.
+
+        :param event: A dictionary with 'venue', 'symbol', 'type' ('snapshot' or 'diff'), 'bids', 'asks',
+                      'last' and, for diffs, 'first' and optionally 'prev'.
+        :return: True if the book changed, False if the event was stale.
+        :raises SequenceGapError: If a diff skips updates. The book must be re-snapshotted.
+        """
+        with self.lock:
+            book = self.book(event['venue'], event['symbol'])
+            if event['type'] == 'snapshot':
+                if book.synced and book.last_update_id is not None and event['last'] < book.last_update_id:
+                    return False
+                book.apply_snapshot(
+                    event['bids'], event['asks'], event['last'], event.get('timestamp'))
+            elif not book.apply_diff(event['bids'], event['asks'], event['first'], event['last'],
+                                     event.get('prev'), event.get('timestamp')):
+                return False
+
+            if event['venue'] != BINANCE_FUTURES:
+                self._update_premium(event['symbol'])
+            return True
+
+    def set_fx_rate(self, fx_rate: float):
+        """
+        Change the FX rate and recompute every premium.
+        """
+        with self.lock:
+            self.fx_rate = fx_rate
+            for symbol in list(self.premiums.positions):
+                self._update_premium(symbol)
+
+    def _update_premium(self, symbol):
+        coinone_book = self.books.get((COINONE, symbol))
+        binance_book = self.books.get((BINANCE_SPOT, symbol))
+        bid = coinone_book.best_bid() if coinone_book and coinone_book.synced else None
+        ask = binance_book.best_ask() if binance_book and binance_book.synced else None
+
+        if bid is None or ask is None or self.fx_rate is None:
+            self.premiums.remove(symbol)
+            return
+
+        price_diff = bid[0] / self.fx_rate - ask[0]
+        self.premiums.update((symbol, price_diff, price_diff / ask[0] * 100))
+
+    def best_premium(self):
+        """
+        :return: The current best (symbol, price_diff, price_diff_percent), or None.
+        """
+        return self.premiums.peek()
+
+    def next_best_premium(self, predicate, skip=(), batch_size=8):
+        """
+        Walk the current premiums best-first until one passes the predicate.
+
+        Candidates are taken from the top of the heap in small batches so the predicate (which may
+        make network calls) runs without holding the board lock.
+
+        :param predicate: A function taking a premium tuple and returning whether it is acceptable.
+        :param skip: Symbols to pass over without evaluating the predicate.
+        :param batch_size: The number of candidates copied out per lock acquisition.
+        :return: The highest current premium that passes the predicate, or None.
+        """
+        rejected = set(skip)
+        while True:
+            with self.lock:
+                batch = list(islice((premium for premium in self.premiums.iter_best()
+                                     if premium[0] not in rejected), batch_size))
+            if not batch:
+                return None
+            for premium in batch:
+                if predicate(premium):
+                    return premium
+                rejected.add(premium[0])
+
+    def ranked_premiums(self):
+        """
+        :return: Every current premium sorted in descending order.
+        """
+        with self.lock:
+            return list(self.premiums.iter_best())
+
+
+def normalize_binance_depth(message, venue):
+    """
+    Convert a Binance spot or futures depthUpdate message into a normalized diff event.
+
+    :param message: The decoded websocket payload (the `data` field of a combined stream).
+    :param venue: BINANCE_SPOT or BINANCE_FUTURES.
+    :return: A normalized event dictionary.
+    """
+    return {
+        'venue': venue,
+        'symbol': message['s'][:-len('USDT')],
+        'type': 'diff',
+        'first': message['U'],
+        'last': message['u'],
+        'prev': message.get('pu'),
+        'bids': message['b'],
+        'asks': message['a'],
+        'timestamp': message['E'] / 1000,
+    }
+
+
+def normalize_coinone_orderbook(message):
+    """
+    Convert a Coinone ORDERBOOK message (always a full book) into a normalized snapshot event.
+
+    :param message: The decoded websocket payload.
+    :return: A normalized event dictionary.
+    """
+    data = message['data']
+    return {
+        'venue': COINONE,
+        'symbol': data['target_currency'],
+        'type': 'snapshot',
+        'last': int(data['timestamp']),
+        'bids': [(level['price'], level['qty']) for level in data['bids']],
+        'asks': [(level['price'], level['qty']) for level in data['asks']],
+        'timestamp': int(data['timestamp']) / 1000,
+    }
+
+
+def fetch_binance_snapshot_event(venue, symbol, limit=1000):
+    """
+    Fetch a REST depth snapshot for a Binance book as a normalized snapshot event.
+
+    :param venue: BINANCE_SPOT or BINANCE_FUTURES.
+    :param symbol: The base currency (e.g., 'BTC').
+    :param limit: The number of levels to fetch.
+    :return: A normalized event dictionary.
+    """
+    params = {'symbol': symbol + 'USDT', 'limit': limit}
+    if venue == BINANCE_FUTURES:
+        depth = binance_futures.fapiPublicGetDepth(params)
+    else:
+        depth = binance.publicGetDepth(params)
+    return {
+        'venue': venue,
+        'symbol': symbol,
+        'type': 'snapshot',
+        'last': int(depth['lastUpdateId']),
+        'bids': depth['bids'],
+        'asks': depth['asks'],
+    }
+
+
+class EventRecorder:
+    def __init__(self, path):
+        """
+        Appends normalized book events to a JSON lines file for later replay.
+
+        :param path: The file to append to.
+        """
+        self.file = open(path, mode='a')
+        self.lock = threading.Lock()
+
+    def record(self, event):
+        with self.lock:
+            self.file.write(json.dumps(event) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ReplaySource:
+    def __init__(self, board: PremiumBoard, path):
+        """
+        Feeds recorded book events from a JSON lines file into a board.
+
+        :param board: The board to update.
+        :param path: A file written by `EventRecorder`.
+        """
+        self.board = board
+        self.path = path
+
+    def run(self, speed=None, on_update=None):
+        """
+        Replay every event in the file.
+
+        :param speed: Replay at this multiple of recorded time, or as fast as possible if None.
+        :param on_update: Optional callback receiving the board's best premium after each applied event.
+        :return: The number of sequence gaps encountered.
+        """
+        gaps = 0
+        previous = None
+        with open(self.path, mode='r') as file:
+            for line in file:
+                event = json.loads(line)
+
+                if speed and previous is not None and event.get('timestamp'):
+                    time.sleep(max(0, (event['timestamp'] - previous) / speed))
+                previous = event.get('timestamp') or previous
+
+                try:
+                    if self.board.handle_event(event) and on_update:
+                        on_update(self.board.best_premium())
+                except SequenceGapError as e:
+                    # Recordings include the snapshots that followed a resync.
+                    print(e)
+                    gaps += 1
+        return gaps
+
+
+class StreamingSource:
+    def __init__(self, board: PremiumBoard, symbols, recorder: EventRecorder = None):
+        """
+        Maintains live books for Binance spot, Binance futures and Coinone on a background thread.
+
+        :param board: The board to update.
+        :param symbols: The base currencies to stream (e.g., ['BTC', 'XRP']).
+        :param recorder: Optional recorder receiving every normalized event.
+        """
+        self.board = board
+        self.symbols = list(symbols)
+        self.recorder = recorder
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+
+    def start(self):
+        """
+        Start streaming on a daemon thread.
+        """
+        self.thread = threading.Thread(
+            target=self.loop.run_until_complete, args=(self._run(),), daemon=True)
+        self.thread.start()
+
+    def _apply(self, event):
+        if self.recorder:
+            self.recorder.record(event)
+        self.board.handle_event(event)
+
+    async def _run(self):
+        await asyncio.gather(
+            self._binance(BINANCE_SPOT, BINANCE_SPOT_WS_URL),
+            self._binance(BINANCE_FUTURES, BINANCE_FUTURES_WS_URL),
+            self._coinone())
+
+    async def _binance(self, venue, base_url):
+        streams = '/'.join(symbol.lower() + 'usdt@depth@100ms' for symbol in self.symbols)
+        while True:
+            try:
+                async with websockets.connect(base_url + streams) as ws:
+                    # Diffs are buffered until the REST snapshot of their book has been applied.
+                    pending = {}
+                    async for raw in ws:
+                        event = normalize_binance_depth(json.loads(raw)['data'], venue)
+                        symbol = event['symbol']
+                        if symbol in pending or not self.board.book(venue, symbol).synced:
+                            if symbol not in pending:
+                                pending[symbol] = []
+                                asyncio.ensure_future(self._resync(venue, symbol, pending))
+                            pending[symbol].append(event)
+                            continue
+                        try:
+                            self._apply(event)
+                        except SequenceGapError as e:
+                            print(e)
+                            pending[symbol] = []
+                            asyncio.ensure_future(self._resync(venue, symbol, pending))
+            except Exception as e:
+                print(f"An error occurred in the {venue} depth stream: {e}")
+                await asyncio.sleep(1)
+
+    async def _resync(self, venue, symbol, pending):
+        try:
+            snapshot = await self.loop.run_in_executor(
+                None, fetch_binance_snapshot_event, venue, symbol)
+            self._apply(snapshot)
+            for event in pending.pop(symbol, []):
+                if event['last'] > snapshot['last']:
+                    self._apply(event)
+        except Exception as e:
+            print(f"An error occurred while resyncing {venue} {symbol}: {e}")
+            pending.pop(symbol, None)
+
+    async def _coinone(self):
+        while True:
+            try:
+                async with websockets.connect(COINONE_WS_URL) as ws:
+                    for symbol in self.symbols:
+                        await ws.send(json.dumps({
+                            'request_type': 'SUBSCRIBE',
+                            'channel': 'ORDERBOOK',
+                            'topic': {'quote_currency': 'KRW', 'target_currency': symbol},
+                        }))
+                    async for raw in ws:
+                        message = json.loads(raw)
+                        if message.get('response_type') == 'DATA' and message.get('channel') == 'ORDERBOOK':
+                            self._apply(normalize_coinone_orderbook(message))
+            except Exception as e:
+                print(f"An error occurred in the Coinone orderbook stream: {e}")
+                await asyncio.sleep(1)
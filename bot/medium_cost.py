@@ -0,0 +1,169 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from exchanges import binance, coinone
+from currency_status import current_coinone_currencies
+from market_spec import market_specs
+from routes import route_table
+from transfer_monitor import DEFAULT_EXPECTED_SECONDS
+
+
+# Percentage points added to a medium's cost per hour in transit, pricing the risk of holding it.
+# 0 ranks by cost alone.
+TIME_COST_PER_HOUR = 0.0
+
+# The expected outcome of moving KRW on Coinone to USDT on Binance through one medium.
+# `cost_percent` is the share of the KRW lost to spread, trading fees, withdrawal fee and rounding.
+MediumCost = namedtuple('MediumCost', ['currency', 'cost_percent', 'arrival_seconds', 'received_usdt', 'score'])
+
+
+def _floor_to_step(values, steps):
+    # The small offset keeps exact multiples from flooring one step down after the float division.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        floored = np.floor(values / steps + 1e-9) * steps
+    return np.where(steps > 0, floored, values)
+
+
+class MediumMetadata:
+    def __init__(self, currencies, table, coinone_specs, binance_specs):
+        """
+        Transfer rules of candidate mediums as arrays aligned with `currencies`.
+
+        Built from the Coinone currency table, both venues' market specs and the Binance deposit networks,
+        and rebuilt only when one of them is reloaded.
+
+        :param currencies: The candidate mediums (e.g., ['XRP', 'TRX']).
+        :param table: The Coinone `CurrencyStatusTable`.
+        :param coinone_specs: Coinone's `MarketSpecTable`.
+        :param binance_specs: Binance's `MarketSpecTable`.
+        """
+        self.currencies = list(currencies)
+        self.sources = None
+
+        size = len(self.currencies)
+        self.coinone_taker = np.full(size, np.nan)
+        self.binance_taker = np.full(size, np.nan)
+        self.withdrawal_fee = np.full(size, np.nan)
+        self.withdrawal_min = np.zeros(size)
+        self.withdrawal_step = np.zeros(size)
+        self.sell_step = np.zeros(size)
+        self.sell_min = np.zeros(size)
+        self.arrival_seconds = np.full(size, float(DEFAULT_EXPECTED_SECONDS))
+        self.usable = np.zeros(size, dtype=bool)
+
+        for i, currency in enumerate(self.currencies):
+            coinone_spec = coinone_specs.get(currency + '/KRW')
+            binance_spec = binance_specs.get(currency + '/USDT')
+            info = table.transfer_info(currency)
+            network = route_table.deposit_network(currency)
+            if coinone_spec is None or binance_spec is None or info is None or info.withdrawal_fee is None:
+                continue
+
+            self.coinone_taker[i] = coinone_spec.taker
+            self.binance_taker[i] = binance_spec.taker
+            self.withdrawal_fee[i] = info.withdrawal_fee
+            self.withdrawal_min[i] = info.withdrawal_min or 0
+            if info.max_precision is not None:
+                self.withdrawal_step[i] = 10.0 ** -int(info.max_precision)
+            self.sell_step[i] = binance_spec.amount_step or 0
+            self.sell_min[i] = binance_spec.min_amount
+            if network is not None and network.arrival_seconds:
+                self.arrival_seconds[i] = network.arrival_seconds
+            self.usable[i] = (table.is_withdrawable(currency)
+                              and network is not None and network.deposit_enabled)
+
+    def compute(self, snapshot, notional_krw: float, time_cost: float = None):
+        """
+        Compute the round trip of `notional_krw` through every medium in one vectorized pass:
+        a market buy at the Coinone ask, a withdrawal rounded to Coinone's precision minus its fee,
+        and a market sell at the Binance bid rounded to the Binance amount step.
+
+        :param snapshot: The `PremiumSnapshot` to read prices and the FX rate from.
+        :param notional_krw: The amount of KRW to move.
+        :param time_cost: Percentage points added per hour in transit. TIME_COST_PER_HOUR if omitted.
+        :return: A dictionary of float64 arrays aligned with `currencies`: 'received_usdt', 'cost_percent',
+                 'arrival_seconds' and 'score', and a boolean 'valid' mask.
+        """
+        if time_cost is None:
+            time_cost = TIME_COST_PER_HOUR
+        missing = (np.nan, np.nan, np.nan)
+        krw = np.array([snapshot.krw_quotes.get(currency) or missing for currency in self.currencies],
+                       dtype=np.float64).reshape(-1, 3)
+        usdt = np.array([snapshot.usdt_quotes.get(currency) or missing for currency in self.currencies],
+                        dtype=np.float64).reshape(-1, 3)
+        # Fall back to the last price where the book side is missing.
+        buy_price = np.where(np.isfinite(krw[:, 2]), krw[:, 2], krw[:, 0])
+        sell_price = np.where(np.isfinite(usdt[:, 1]), usdt[:, 1], usdt[:, 0])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bought = notional_krw * (1 - self.coinone_taker) / buy_price
+            withdrawn = _floor_to_step(bought, self.withdrawal_step)
+            arrived = withdrawn - self.withdrawal_fee
+            sold = _floor_to_step(arrived, self.sell_step)
+            received_usdt = sold * sell_price * (1 - self.binance_taker)
+            cost_percent = (1 - received_usdt * snapshot.fx_rate / notional_krw) * 100
+
+        valid = (self.usable & np.isfinite(cost_percent)
+                 & (withdrawn >= self.withdrawal_min) & (sold > 0) & (sold >= self.sell_min))
+        return {
+            'received_usdt': received_usdt,
+            'cost_percent': cost_percent,
+            'arrival_seconds': self.arrival_seconds,
+            'score': cost_percent + time_cost * self.arrival_seconds / 3600,
+            'valid': valid,
+        }
+
+    def rank(self, snapshot, notional_krw: float, time_cost: float = None):
+        """
+        :return: A list of `MediumCost` for every usable medium, cheapest score first.
+        """
+        values = self.compute(snapshot, notional_krw, time_cost)
+        valid = np.flatnonzero(values['valid'])
+        best = valid[np.argsort(values['score'][valid], kind='stable')]
+        return [MediumCost(self.currencies[i], float(values['cost_percent'][i]),
+                           float(values['arrival_seconds'][i]), float(values['received_usdt'][i]),
+                           float(values['score'][i]))
+                for i in best]
+
+
+# Metadata is reused across calls for the same candidates until a source is reloaded.
+_metadata = {}
+_metadata_lock = threading.Lock()
+
+
+def medium_metadata(currencies):
+    """
+    :param currencies: The candidate mediums.
+    :return: The `MediumMetadata` for the candidates, rebuilt only when a source was reloaded.
+    """
+    key = tuple(currencies)
+    table = current_coinone_currencies()
+    coinone_specs = market_specs(coinone)
+    binance_specs = market_specs(binance)
+    if route_table.refreshed_at is None:
+        route_table.refresh()
+    sources = (table, coinone_specs, binance_specs, route_table.refreshed_at)
+
+    with _metadata_lock:
+        metadata = _metadata.get(key)
+        if metadata is None or any(old is not new for old, new in zip(metadata.sources, sources)):
+            metadata = _metadata[key] = MediumMetadata(key, table, coinone_specs, binance_specs)
+            metadata.sources = sources
+        return metadata
+
+
+def rank_mediums(snapshot, notional_krw: float, candidates=None, time_cost: float = None):
+    """
+    Rank transfer mediums by the expected cost of moving `notional_krw` from Coinone to Binance.
+
+    :param snapshot: The `PremiumSnapshot` to read prices and the FX rate from.
+    :param notional_krw: The amount of KRW to move.
+    :param candidates: The mediums to consider. Every coin quoted on both exchanges if omitted.
+    :param time_cost: Percentage points added per hour in transit. TIME_COST_PER_HOUR if omitted.
+    :return: A list of `MediumCost`, best first. Mediums that cannot be withdrawn, deposited or sold are left out.
+    """
+    if candidates is None:
+        candidates = sorted(set(snapshot.krw_quotes) & set(snapshot.usdt_quotes))
+    return medium_metadata(candidates).rank(snapshot, notional_krw, time_cost)
@@ -4,6 +4,9 @@ from balance import *
 from exchanges import *
 from decimal import Decimal, getcontext, ROUND_DOWN
 from utils import *
+from market_spec import market_specs
+from order_tracker import order_tracker
+from positions import position_index
 
 
 def round_to_significant_digits(value, sig_digits):
@@ -15,6 +18,22 @@ def round_to_significant_digits(value, sig_digits):
     return value.quantize(Decimal('1e{0}'.format(-value.adjusted() + sig_digits - 1)), rounding=ROUND_DOWN)
 
 
+def net_of_fees(details, field, currency):
+    """
+    Reads an amount from order details and subtracts the fees charged in its currency.
+
+    :param details: Order details as returned by `buy`, `sell` or `trade_amount`.
+    :param field: The amount to read (e.g., 'quantity' or 'total_cost').
+    :param currency: The currency of the amount (e.g., 'XRP').
+    :return: The amount net of fees as a Decimal.
+    """
+    value = Decimal(str(details[field] or 0))
+    for fee in details.get('fee') or []:
+        if fee and fee.get('currency') == currency and fee.get('cost'):
+            value -= Decimal(str(fee['cost']))
+    return value
+
+
 def buy(exchange, target, quote, percentage):
     """
     Buy cryptocurrency using a specified percentage of the quote currency balance at market price.
@@ -32,37 +51,49 @@ def buy(exchange, target, quote, percentage):
         # Calculate the cost based on the specified percentage of the balance
         cost = Decimal(balance) * Decimal(percentage) / Decimal(100)
 
-        # Load markets to ensure the symbol is available
-        markets = exchange.load_markets()
+        return buy_cost(exchange, target, quote, cost)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return None
+
+
+def buy_cost(exchange, target, quote, cost):
+    """
+    Buy cryptocurrency for a fixed cost in the quote currency at market price.
+
+    :param exchange: The exchange object (e.g., ccxt.binance()).
+    :param target: The target currency to trade (e.g., 'BTC').
+    :param quote: The quote currency to trade against (e.g., 'USDT').
+    :param cost: The amount of the quote currency to spend.
+    :return: A dictionary with order details including average price, quantity, total cost, and fee if successful, None otherwise.
+    """
+    try:
+        cost = Decimal(str(cost))
 
         # Construct the trading pair symbol
         symbol = target + "/" + quote
 
-        # Check if the symbol is available
-        if symbol not in markets:
+        # Look up the precomputed sizing rules to ensure the symbol is available
+        spec = market_specs(exchange).get(symbol)
+        if spec is None:
             print(f"Error: Symbol {symbol} is not available on the exchange.")
             return None
 
-        # Get the market details for the symbol
-        market = markets[symbol]
-
         # Ensure the cost meets the minimum order size
-        min_order_cost = Decimal(market['limits']['cost']['min'])
-        if cost < min_order_cost:
+        if cost < spec.min_cost:
             print(
-                f"Error: Cost {cost} is less than the minimum order size {min_order_cost}.")
+                f"Error: Cost {cost} is less than the minimum order size {spec.min_cost}.")
             return None
 
         # Adjust the cost to meet the exchange's precision requirements
-        precision = market['precision']['price']
-        cost = cost.quantize(
-            Decimal('1e-{0}'.format(precision)), rounding=ROUND_DOWN)
+        cost = spec.floor_cost(cost)
 
         print("cost", cost)
 
         # Create a market buy order with the calculated cost
         order = exchange.create_market_buy_order_with_cost(symbol, float(cost))
         print(f"Market buy order created: {order}")
+        portfolio_ledger.apply_fill(exchange, order)
 
         # Extract order details
         # average_price = order.get('average', None)
@@ -109,36 +140,29 @@ def sell(exchange, target, quote, percentage):
         # Construct the trading pair symbol
         symbol = target + "/" + quote
 
-        # Load markets to ensure the symbol is available
-        markets = exchange.load_markets()
-
-        # Check if the symbol is available
-        if symbol not in markets:
+        # Look up the precomputed sizing rules to ensure the symbol is available
+        spec = market_specs(exchange).get(symbol)
+        if spec is None:
             print(f"Error: Symbol {symbol} is not available on the exchange.")
             return None
 
-        # Get the market details for the symbol
-        market = markets[symbol]
-
         # Ensure the amount meets the minimum order size
-        min_order_size = market['limits']['amount']['min']
-        if amount < min_order_size:
+        if amount < spec.min_amount:
             print(
-                f"Error: Amount {amount} is less than the minimum order size {min_order_size}.")
+                f"Error: Amount {amount} is less than the minimum order size {spec.min_amount}.")
             return None
 
         # Adjust the amount to meet the exchange's precision requirements
-        precision = market['precision']['amount']
-        amount = amount.quantize(
-            Decimal('1e-{0}'.format(precision)), rounding=ROUND_DOWN)
+        amount = spec.floor_amount(amount)
 
-        print("precision", precision)
+        print("precision", spec.amount_step)
 
         print("amount", amount)
 
         # Create a market sell order
         order = exchange.create_market_sell_order(symbol, amount)
         print(f"Market sell order created: {order}")
+        portfolio_ledger.apply_fill(exchange, order)
 
         # # Extract order details
         # average_price = order.get('average', None)
@@ -165,6 +189,51 @@ def sell(exchange, target, quote, percentage):
         return None
 
 
+def trade_amount(exchange, target, quote, side, amount):
+    """
+    Buy or sell a fixed amount of cryptocurrency at market price.
+
+    :param exchange: The exchange object (e.g., ccxt.binance()).
+    :param target: The target currency to trade (e.g., 'BTC').
+    :param quote: The quote currency to trade against (e.g., 'USDT').
+    :param side: 'buy' or 'sell'.
+    :param amount: The amount of the target currency.
+    :return: A dictionary with order details including average price, quantity, total cost, and fee if successful, None otherwise.
+    """
+    try:
+        # Construct the trading pair symbol
+        symbol = target + "/" + quote
+
+        # Look up the precomputed sizing rules to ensure the symbol is available
+        spec = market_specs(exchange).get(symbol)
+        if spec is None:
+            print(f"Error: Symbol {symbol} is not available on the exchange.")
+            return None
+
+        # Adjust the amount to meet the exchange's precision requirements
+        amount = spec.floor_amount(Decimal(str(amount)))
+        if amount < spec.min_amount:
+            print(
+                f"Error: Amount {amount} is less than the minimum order size {spec.min_amount}.")
+            return None
+
+        # Create the market order
+        order = exchange.create_order(symbol, 'market', side, float(amount))
+        print(f"Market {side} order created: {order}")
+        portfolio_ledger.apply_fill(exchange, order)
+
+        return {
+            'order': order,
+            'average_price': order['average'],
+            'quantity': order['filled'],
+            'total_cost': order['cost'],
+            'fee': order['fees'],
+        }
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return None
+
+
 def short(exchange, target, percentage, leverage):
     print(percentage, leverage)
     """
@@ -185,55 +254,48 @@ def short(exchange, target, percentage, leverage):
         # Calculate the cost based on the specified percentage of the USDT balance
         cost = Decimal(usdt_balance) * Decimal(percentage) / Decimal(100)
 
-        # Load markets to ensure the symbol is available
-        markets = exchange.load_markets()
-
         # Construct the trading pair symbol
         symbol = target + "/USDT"
 
-        # Check if the symbol is available
-        if symbol not in markets:
+        # Look up the precomputed sizing rules to ensure the symbol is available
+        spec = market_specs(exchange).get(symbol)
+        if spec is None:
             print(f"Error: Symbol {symbol} is not available on the exchange.")
             return None
 
-        # Get the market details for the symbol
-        market = markets[symbol]
-
         # Ensure the cost meets the minimum order size
-        min_order_cost = Decimal(market['limits']['cost']['min'])
-        if cost < min_order_cost:
+        if cost < spec.min_cost:
             print(
-                f"Error: Cost {cost} is less than the minimum order size {min_order_cost}.")
+                f"Error: Cost {cost} is less than the minimum order size {spec.min_cost}.")
             return None
 
         # Adjust the cost to meet the exchange's precision requirements
-        precision = market['precision']['quote']
-        cost = cost.quantize(
-            Decimal('1e-{0}'.format(precision)), rounding=ROUND_DOWN)
+        cost = spec.floor_cost(cost)
 
         # Set leverage for the target symbol
         exchange.fapiPrivatePostLeverage({
-            'symbol': market['id'],
+            'symbol': spec.id,
             'leverage': leverage
         })
 
-        # Fetch the ticker to get the latest price
-        ticker = exchange.fetch_ticker(symbol)
+        # Fetch the ticker to get the latest price (at most a second old)
+        ticker = cached_ticker(exchange, symbol, max_age=1)
         current_price = Decimal(ticker['last'])
 
         # Calculate the amount to short based on the cost and the current market price
         amount = cost / current_price
 
         # Adjust the amount to meet the exchange's precision requirements
-        amount_precision = market['precision']['amount']
-        amount = amount.quantize(
-            Decimal('1e-{0}'.format(amount_precision)), rounding=ROUND_DOWN)
+        amount = spec.floor_amount(amount)
         # amount = round_to_significant_digits(amount, 5)
 
         # Create a market sell order with the calculated amount
         order = exchange.create_order(
             symbol, 'market', 'sell', float(amount) * leverage)
         print(f"Market short order created: {order}")
+        portfolio_ledger.apply_fill(exchange, order)
+        if exchange is position_index.exchange:
+            position_index.apply_fill(order)
 
         return {
             'order': order,
@@ -255,8 +317,11 @@ def fetch_open_positions(exchange):
     :return: A list of dictionaries containing details about open positions.
     """
     try:
-        # Fetch open positions
-        positions = exchange.fapiPrivateV2GetPositionRisk()
+        # Fetch open positions with one bulk call, which also reconciles the position index
+        if exchange is position_index.exchange:
+            positions = position_index.reconcile() or exchange.fapiPrivateV2GetPositionRisk()
+        else:
+            positions = exchange.fapiPrivateV2GetPositionRisk()
 
         # Filter out positions with zero notional (no open position)
         open_positions = [position for position in positions if float(
@@ -296,71 +361,84 @@ def fetch_order_status(exchange, order_id, symbol):
         return None
 
 
-def wait_for_order_fulfillment(exchange, order_id, symbol, polling_interval=0.1):
+def wait_for_order_fulfillment(exchange, order_id, symbol, timeout=None):
     """
-    Waits for an order to be fulfilled or canceled by periodically checking its status.
+    Waits for an order to be fulfilled or canceled.
+
+    The order is watched by the shared order tracker, which batches status checks for every open order
+    and uses the user-data stream where one is running.
 
     :param exchange: The exchange object (e.g., ccxt.binance()).
     :param order_id: The ID of the order to check.
     :param symbol: The trading pair symbol (e.g., 'BTC/USDT').
-    :param polling_interval: The interval (in seconds) between status checks.
+    :param timeout: The longest time to wait in seconds, or None to wait indefinitely.
     :return: A dictionary with order details including average price, quantity, total cost, and fee if fulfilled, None otherwise.
     """
-    while True:
-        order_status = fetch_order_status(exchange, order_id, symbol)
-        if order_status:
-            status = order_status['status']
-            print(f"Current order status: {status}")
-            if status == 'closed':
-                print("The order has been fully fulfilled.")
-                return {
-                    'average_price': order_status.get('average', None),
-                    'quantity': order_status.get('filled', None),
-                    'total_cost': order_status.get('cost', None),
-                    'fee': order_status.get('fee', {}).get('cost', None)
-                }
-            elif status == 'canceled':
-                print("The order has been canceled.")
-                return None
-        else:
-            print("Failed to retrieve order status.")
+    try:
+        order_status = order_tracker.track(exchange, order_id, symbol).result(timeout)
+    except Exception as e:
+        print(f"An error occurred while waiting for the order: {e}")
+        return None
+
+    status = order_status['status']
+    if status == 'closed':
+        print("The order has been fully fulfilled.")
+        return {
+            'average_price': order_status.get('average', None),
+            'quantity': order_status.get('filled', None),
+            'total_cost': order_status.get('cost', None),
+            'fee': (order_status.get('fee') or {}).get('cost', None)
+        }
 
-        time.sleep(polling_interval)
+    print(f"The order has been {status}.")
+    return None
 
 
-def close_short(exchange, target, quote):
+def close_short(exchange, target, quote, amount=None):
     """
     Closes a short position by buying back the same amount of the target currency.
 
     :param exchange: The exchange instance (e.g., ccxt.binance()) configured for futures trading.
     :param target: The target currency to cover (e.g., 'BTC').
     :param quote: The quote currency to trade against (e.g., 'USDT').
+    :param amount: The part of the short to cover. The whole position if omitted.
     :return: A dictionary with order details if successful, None otherwise.
     """
     try:
-        # Fetch the current position size
-        positions = exchange.fapiPrivateV2GetPositionRisk()
         symbol = target + quote
 
-        position = next(
-            (pos for pos in positions if pos['symbol'] == symbol), None)
+        # Read the current position size from the position index, without a round trip
+        if exchange is position_index.exchange:
+            amount_to_buy = float(position_index.amount(symbol))
+        else:
+            positions = exchange.fapiPrivateV2GetPositionRisk()
+            position = next(
+                (pos for pos in positions if pos['symbol'] == symbol), None)
+            amount_to_buy = float(position['positionAmt']) if position else 0
 
-        print(position)
+        print(symbol, amount_to_buy)
 
-        if not position:
+        if amount_to_buy == 0:
             print(f"No position found for {symbol}")
             return None
-        # Calculate the amount to buy back (cover the short position)
-        amount_to_buy = float(position['positionAmt'])
 
         if amount_to_buy >= 0:
             print(f"No short position to close for {symbol}")
             return None
 
+        # Cover only the requested part, so other shorts on the same symbol stay open
+        params = {}
+        if amount is not None:
+            amount_to_buy = -min(float(amount), abs(amount_to_buy))
+            params['reduceOnly'] = True
+
         # Place a market buy order to cover the short position
-        order = exchange.create_market_buy_order(symbol, abs(amount_to_buy))
+        order = exchange.create_market_buy_order(symbol, abs(amount_to_buy), params)
         print(
             f"Market buy order created to close short position: {order['id']}")
+        portfolio_ledger.apply_fill(exchange, order)
+        if exchange is position_index.exchange:
+            position_index.apply_fill(order)
 
         return {
             'order': order,
@@ -0,0 +1,311 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+from collections import defaultdict
+
+import websockets
+
+from ledger import account_key
+
+
+BINANCE_SPOT_USER_WS_URL = 'wss://stream.binance.com:9443/ws/'
+BINANCE_FUTURES_USER_WS_URL = 'wss://fstream.binance.com/ws/'
+
+# Listen keys expire after 60 minutes without a keep-alive.
+LISTEN_KEY_KEEPALIVE = 30 * 60
+
+# Venues whose fetch_open_orders returns every symbol in one request. Others are polled per symbol.
+ALL_SYMBOL_OPEN_ORDERS = {'binance'}
+
+# Terminal stream events kept for orders that finish before `track` is called, in seconds.
+RECENT_EVENT_TTL = 60
+
+BINANCE_STATUSES = {
+    'NEW': 'open',
+    'PARTIALLY_FILLED': 'open',
+    'FILLED': 'closed',
+    'CANCELED': 'canceled',
+    'EXPIRED': 'expired',
+    'EXPIRED_IN_MATCH': 'expired',
+    'REJECTED': 'rejected',
+}
+
+
+class TrackedOrder:
+    def __init__(self, exchange, order_id, symbol):
+        """
+        An open order and the future resolved with its final ccxt order structure.
+        """
+        self.exchange = exchange
+        self.order_id = str(order_id)
+        self.symbol = symbol
+        self.future = concurrent.futures.Future()
+        self.tracked_at = time.time()
+        self.fees = defaultdict(float)
+
+
+class OrderTracker:
+    def __init__(self, min_interval: float = 0.2, max_interval: float = 2.0):
+        """
+        Watches every open order across venues and resolves a future per order once it is closed or canceled.
+
+        Venues with a running user-data stream are updated by push. All other venues are polled with one
+        `fetch_open_orders` request per venue (or per symbol where the venue requires one) regardless of how
+        many orders are open; orders that leave the open list are fetched once for their final fills. The
+        polling interval starts at `min_interval` and doubles while nothing changes, up to `max_interval`.
+
+        :param min_interval: The polling interval right after an order is added or finishes, in seconds.
+        :param max_interval: The longest polling interval, in seconds.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.orders = {}
+        self.recent_events = {}
+        self.streaming = set()
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.loop = None
+        self.polls = 0
+        self.listeners = []
+
+    def track(self, exchange, order_id, symbol):
+        """
+        :param exchange: The exchange the order was placed on.
+        :param order_id: The order ID.
+        :param symbol: The trading pair symbol (e.g., 'BTC/USDT').
+        :return: A `concurrent.futures.Future` resolved with the final ccxt order.
+        """
+        key = (account_key(exchange), str(order_id))
+        with self.lock:
+            tracked = self.orders.get(key)
+            if tracked is not None:
+                return tracked.future
+            tracked = TrackedOrder(exchange, order_id, symbol)
+            event = self.recent_events.pop(key, None)
+            if event is None:
+                self.orders[key] = tracked
+                self.interval = self.min_interval
+
+        if event is not None:
+            tracked.future.set_result(event[1])
+        else:
+            self._ensure_started()
+            self.wake_event.set()
+        return tracked.future
+
+    def track_order(self, exchange, order):
+        """
+        Track an order structure returned by `create_order`, resolving at once if it is already final.
+        """
+        if order.get('status') in ('closed', 'canceled', 'expired', 'rejected'):
+            future = concurrent.futures.Future()
+            future.set_result(order)
+            return future
+        return self.track(exchange, order['id'], order['symbol'])
+
+    def subscribe(self, listener):
+        """
+        Call `listener(exchange, message)` for every user-data stream message (e.g. ACCOUNT_UPDATE).
+        """
+        with self.lock:
+            self.listeners.append(listener)
+
+    def open_orders(self):
+        with self.lock:
+            return len(self.orders)
+
+    def _resolve(self, key, order):
+        with self.lock:
+            tracked = self.orders.pop(key, None)
+            if tracked is None:
+                self.recent_events[key] = (time.time(), order)
+                return
+            self.interval = self.min_interval
+        if not tracked.future.done():
+            tracked.future.set_result(order)
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.wake_event.wait(self.interval)
+            self.wake_event.clear()
+            try:
+                changed = self.poll()
+            except Exception as e:
+                print(f"An error occurred while polling orders: {e}")
+                changed = False
+            with self.lock:
+                self.interval = self.min_interval if changed else min(self.interval * 2, self.max_interval)
+                now = time.time()
+                for key in [key for key, (received_at, _) in self.recent_events.items()
+                            if now - received_at > RECENT_EVENT_TTL]:
+                    del self.recent_events[key]
+
+    def poll(self):
+        """
+        Poll every venue without a live user-data stream once.
+
+        :return: True if any tracked order finished.
+        """
+        groups = defaultdict(list)
+        with self.lock:
+            for key, tracked in self.orders.items():
+                if key[0] in self.streaming:
+                    continue
+                scope = None if tracked.exchange.id in ALL_SYMBOL_OPEN_ORDERS else tracked.symbol
+                groups[(key[0], scope)].append((key, tracked))
+        if not groups:
+            return False
+
+        changed = False
+        for (_, scope), entries in groups.items():
+            exchange = entries[0][1].exchange
+            if scope is None:
+                exchange.options['warnOnFetchOpenOrdersWithoutSymbol'] = False
+            try:
+                open_ids = {str(order['id']) for order in exchange.fetch_open_orders(scope)}
+            except Exception as e:
+                print(f"An error occurred while fetching open orders on {exchange.id}: {e}")
+                continue
+            self.polls += 1
+
+            for key, tracked in entries:
+                if tracked.order_id in open_ids:
+                    continue
+                try:
+                    order = exchange.fetch_order(tracked.order_id, tracked.symbol)
+                except Exception as e:
+                    # Retried on the next poll.
+                    print(f"An error occurred while checking the order status: {e}")
+                    continue
+                if order['status'] != 'open':
+                    self._resolve(key, order)
+                    changed = True
+        return changed
+
+    def start_user_stream(self, exchange, futures=False):
+        """
+        Receive order updates for a Binance account over its user-data stream instead of polling it.
+
+        :param exchange: The Binance spot or futures client.
+        :param futures: Whether the client is a USDT-M futures account.
+        """
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._user_stream(exchange, futures), self.loop)
+        self._ensure_started()
+
+    def _listen_key(self, exchange, futures, listen_key=None):
+        if futures:
+            if listen_key:
+                return exchange.fapiPrivatePutListenKey()
+            return exchange.fapiPrivatePostListenKey()['listenKey']
+        if listen_key:
+            return exchange.publicPutUserDataStream({'listenKey': listen_key})
+        return exchange.publicPostUserDataStream()['listenKey']
+
+    async def _user_stream(self, exchange, futures):
+        account = account_key(exchange)
+        base_url = BINANCE_FUTURES_USER_WS_URL if futures else BINANCE_SPOT_USER_WS_URL
+        loop = asyncio.get_running_loop()
+        while not self.stop_event.is_set():
+            keepalive = None
+            try:
+                listen_key = await loop.run_in_executor(None, self._listen_key, exchange, futures)
+                async with websockets.connect(base_url + listen_key) as ws:
+                    with self.lock:
+                        self.streaming.add(account)
+                    # Catch orders that finished while the stream was down.
+                    self.wake_event.set()
+                    keepalive = asyncio.ensure_future(self._keepalive(exchange, futures, listen_key))
+                    async for raw in ws:
+                        self.handle_user_event(exchange, json.loads(raw))
+            except Exception as e:
+                print(f"An error occurred in the {exchange.id} user-data stream: {e}")
+            finally:
+                if keepalive:
+                    keepalive.cancel()
+                with self.lock:
+                    self.streaming.discard(account)
+                # Fall back to polling until the stream is back.
+                self.wake_event.set()
+            await asyncio.sleep(1)
+
+    async def _keepalive(self, exchange, futures, listen_key):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(LISTEN_KEY_KEEPALIVE)
+            await loop.run_in_executor(None, self._listen_key, exchange, futures, listen_key)
+
+    def handle_user_event(self, exchange, message):
+        """
+        Apply a Binance `executionReport` (spot) or `ORDER_TRADE_UPDATE` (futures) message.
+        Every message is also passed to the subscribed listeners.
+        """
+        with self.lock:
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(exchange, message)
+            except Exception as e:
+                print(f"An error occurred in a user-data listener: {e}")
+
+        if message.get('e') == 'executionReport':
+            update = message
+            cost = float(update['Z'])
+        elif message.get('e') == 'ORDER_TRADE_UPDATE':
+            update = message['o']
+            cost = float(update['z']) * float(update['ap'])
+        else:
+            return
+
+        key = (account_key(exchange), str(update['i']))
+        with self.lock:
+            tracked = self.orders.get(key)
+            if tracked is not None and update.get('n') and update.get('N'):
+                tracked.fees[update['N']] += float(update['n'])
+            if tracked is not None:
+                fees = dict(tracked.fees)
+            else:
+                fees = {update['N']: float(update['n'])} if update.get('n') and update.get('N') else {}
+
+        status = BINANCE_STATUSES.get(update['X'], 'open')
+        if status == 'open':
+            return
+
+        filled = float(update['z'])
+        fee_list = [{'currency': currency, 'cost': fee} for currency, fee in fees.items()]
+        self._resolve(key, {
+            'id': str(update['i']),
+            'symbol': tracked.symbol if tracked is not None else update['s'],
+            'status': status,
+            'filled': filled,
+            'cost': cost,
+            'average': cost / filled if filled else None,
+            'fees': fee_list,
+            'fee': fee_list[0] if len(fee_list) == 1 else None,
+            'timestamp': message.get('E') or time.time() * 1000,
+            'info': message,
+        })
+
+
+order_tracker = OrderTracker()
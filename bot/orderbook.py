@@ -0,0 +1,131 @@
+import time
+
+
+class SequenceGapError(Exception):
+    """
+    Raised when a diff does not continue the book's update sequence.
+    """
+    pass
+
+
+class LocalOrderBook:
+    def __init__(self, venue, symbol):
+        """
+        Local L2 order book maintained from a snapshot plus incremental diffs.
+
+        :param venue: The venue name (e.g., 'binance').
+        :param symbol: The base currency (e.g., 'BTC').
+        """
+        self.venue = venue
+        self.symbol = symbol
+        self.bids = {}
+        self.asks = {}
+        self.last_update_id = None
+        self.synced = False
+        self.timestamp = None
+
+        # Cached best prices, recomputed only when the best level is removed.
+        self._best_bid = None
+        self._best_ask = None
+
+        # Futures `pu` chaining only applies once a diff has followed the snapshot.
+        self._has_applied_diff = False
+
+    def apply_snapshot(self, bids, asks, last_update_id, timestamp=None):
+        """
+        Replace the book with a full snapshot.
+
+        :param bids: An iterable of (price, quantity) pairs.
+        :param asks: An iterable of (price, quantity) pairs.
+        :param last_update_id: The sequence number the snapshot is valid for.
+        :param timestamp: The snapshot time in seconds, defaults to now.
+        """
+        self.bids = {float(price): float(qty) for price, qty in bids if float(qty) > 0}
+        self.asks = {float(price): float(qty) for price, qty in asks if float(qty) > 0}
+        self.last_update_id = last_update_id
+        self.synced = True
+        self.timestamp = timestamp or time.time()
+        self._has_applied_diff = False
+        self._best_bid = max(self.bids) if self.bids else None
+        self._best_ask = min(self.asks) if self.asks else None
+
+    def apply_diff(self, bids, asks, first_update_id, final_update_id, prev_final_update_id=None, timestamp=None):
+        """
+        Apply an incremental update following Binance's depth stream sequencing rules.
+
+        :param bids: An iterable of (price, quantity) pairs, quantity 0 removes the level.
+        :param asks: An iterable of (price, quantity) pairs, quantity 0 removes the level.
+        :param first_update_id: The first update id in the event (`U`).
+        :param final_update_id: The final update id in the event (`u`).
+        :param prev_final_update_id: The previous event's final update id (`pu`, futures only).
+        :param timestamp: The event time in seconds, defaults to now.
+        :return: True if the diff was applied, False if it was older than the book.
+        :raises SequenceGapError: If updates are missing between the book and the diff.
+        """
+        if not self.synced:
+            raise SequenceGapError(f"{self.venue} {self.symbol} book is not synced")
+
+        if final_update_id <= self.last_update_id:
+            return False
+
+        if prev_final_update_id is not None and self._has_applied_diff:
+            in_sequence = prev_final_update_id == self.last_update_id
+        else:
+            in_sequence = first_update_id <= self.last_update_id + 1
+
+        if not in_sequence:
+            self.synced = False
+            raise SequenceGapError(
+                f"{self.venue} {self.symbol} gap: book at {self.last_update_id}, "
+                f"diff {first_update_id}-{final_update_id}")
+
+        for price, qty in bids:
+            self._set_level(self.bids, float(price), float(qty), True)
+        for price, qty in asks:
+            self._set_level(self.asks, float(price), float(qty), False)
+
+        self.last_update_id = final_update_id
+        self.timestamp = timestamp or time.time()
+        self._has_applied_diff = True
+        return True
+
+    def _set_level(self, side, price, qty, is_bid):
+        if qty > 0:
+            side[price] = qty
+            if is_bid and (self._best_bid is None or price > self._best_bid):
+                self._best_bid = price
+            elif not is_bid and (self._best_ask is None or price < self._best_ask):
+                self._best_ask = price
+            return
+
+        side.pop(price, None)
+        if is_bid and price == self._best_bid:
+            self._best_bid = max(side) if side else None
+        elif not is_bid and price == self._best_ask:
+            self._best_ask = min(side) if side else None
+
+    def best_bid(self):
+        """
+        :return: The best (price, quantity) bid, or None if the side is empty.
+        """
+        if self._best_bid is None:
+            return None
+        return self._best_bid, self.bids[self._best_bid]
+
+    def best_ask(self):
+        """
+        :return: The best (price, quantity) ask, or None if the side is empty.
+        """
+        if self._best_ask is None:
+            return None
+        return self._best_ask, self.asks[self._best_ask]
+
+    def levels(self, side, depth=None):
+        """
+        :param side: 'bids' or 'asks'.
+        :param depth: Optional number of levels to return.
+        :return: A list of (price, quantity) pairs ordered from the best price outwards.
+        """
+        book = self.bids if side == 'bids' else self.asks
+        prices = sorted(book, reverse=(side == 'bids'))[:depth]
+        return [(price, book[price]) for price in prices]
@@ -0,0 +1,621 @@
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+
+import ccxt
+
+from exchanges import binance, binance_futures, binance_master, coinone
+from balance import fetch_balance, transfer_usdt, withdraw, withdraw_amount, complete_transfer
+from order import buy_cost, trade_amount, close_short, net_of_fees
+from hedge import hedge_engine
+from leg_executor import Leg, leg_executor
+from transfer_monitor import UNCERTAIN, transfer_monitor
+from ledger import portfolio_ledger
+from routes import BINANCE_TO_COINONE, COINONE_TO_BINANCE, route_table
+from currency_status import current_coinone_currencies
+from market_spec import Quantizer
+
+
+CYCLE_STATE_FILE = 'cycle_states.json'
+
+# The stages of one cycle, in order.
+SCAN = 'scan'
+HEDGE = 'hedge'
+TARGET_TRANSIT = 'target_transit'
+SELL_AND_CLOSE = 'sell_and_close'
+MEDIUM_BUY = 'medium_buy'
+MEDIUM_TRANSIT = 'medium_transit'
+MEDIUM_SELL = 'medium_sell'
+DONE = 'done'
+FAILED = 'failed'
+
+# A scan that found no target. The cycle is dropped without a record.
+DISCARDED = 'discarded'
+
+TERMINAL_STAGES = (DONE, FAILED, DISCARDED)
+
+# While in these stages the cycle owns its target's coins and short position, so no other cycle picks it.
+TARGET_STAGES = (SCAN, HEDGE, TARGET_TRANSIT, SELL_AND_CLOSE)
+
+# Attempts of a failing stage before the cycle is marked failed.
+STAGE_ATTEMPTS = 3
+
+# The smallest spot notional a cycle is started with, in USDT.
+MIN_CYCLE_NOTIONAL = 20
+
+# Finished cycles kept in memory and in the state file.
+FINISHED_KEPT = 100
+
+
+class CycleState:
+    PERSISTED = ('id', 'stage', 'notional', 'margin', 'transfer_margin', 'spot_reserved', 'margin_reserved',
+                 'target', 'medium', 'target_withdrawal_id', 'medium_withdrawal_id', 'target_amount',
+                 'target_arrived', 'krw_proceeds',
+                 'medium_amount', 'medium_arrived', 'received_usdt', 'details', 'error',
+                 'started_at', 'updated_at', 'finished_at')
+
+    def __init__(self, cycle_id, notional=0.0, margin=0.0, transfer_margin=0.0):
+        """
+        Everything one cycle has done so far, persisted after every stage.
+
+        Spot USDT stays reserved until the cycle's buy fills and futures margin until its short is closed;
+        from then on the balances themselves reflect the cycle.
+
+        :param cycle_id: The cycle number.
+        :param notional: The USDT the spot buy spends.
+        :param margin: The futures margin backing the short, in USDT.
+        :param transfer_margin: The part of `margin` moved from spot to futures before the hedge.
+        """
+        self.id = cycle_id
+        self.stage = SCAN
+        self.notional = notional
+        self.margin = margin
+        self.transfer_margin = transfer_margin
+        self.spot_reserved = notional + transfer_margin
+        self.margin_reserved = margin
+        self.target = None
+        self.medium = None
+        self.target_withdrawal_id = None
+        self.medium_withdrawal_id = None
+        self.target_amount = None
+        self.target_arrived = None
+        self.krw_proceeds = None
+        self.medium_amount = None
+        self.medium_arrived = None
+        self.received_usdt = None
+        self.details = {}
+        self.error = None
+        self.started_at = time.time()
+        self.updated_at = self.started_at
+        self.finished_at = None
+
+        # Runtime state, not persisted.
+        self.attempts = 0
+        self.transfer = None
+        self.busy = False
+
+    def profit(self):
+        """
+        :return: The USDT received for the medium less the notional spent, plus the hedge's PnL, or None if unfinished.
+        """
+        if self.received_usdt is None:
+            return None
+        profit = float(self.received_usdt) - self.notional
+        short_details = self.details.get('target_hedge')
+        close_details = self.details.get('target_close')
+        if (short_details and close_details and close_details.get('quantity')
+                and short_details.get('average_price') and close_details.get('average_price')):
+            profit += (float(short_details['average_price']) - float(close_details['average_price'])) \
+                * float(close_details['quantity'])
+        return profit
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.PERSISTED}
+
+    @classmethod
+    def from_dict(cls, data):
+        cycle = cls(data['id'])
+        for field in cls.PERSISTED:
+            if field in data:
+                setattr(cycle, field, data[field])
+        for field in ('target_amount', 'target_arrived', 'krw_proceeds', 'medium_amount', 'medium_arrived',
+                      'received_usdt'):
+            if getattr(cycle, field) is not None:
+                setattr(cycle, field, Decimal(str(getattr(cycle, field))))
+        return cycle
+
+
+class CapitalScheduler:
+    def __init__(self, leverage, max_cycles=3, cycle_notional=None, min_notional=MIN_CYCLE_NOTIONAL):
+        """
+        Decides when a new cycle may start and how much capital it gets.
+
+        A cycle needs spot USDT for its buy and futures margin for its short. Both are read from the
+        portfolio ledger less the reservations of cycles in flight. KRW and the medium are sized from
+        each cycle's own fills and need no reservation.
+
+        :param leverage: The leverage of the short.
+        :param max_cycles: The most cycles running at once.
+        :param cycle_notional: The USDT per cycle, or None to split the free capital evenly between the free slots.
+        :param min_notional: The smallest notional a cycle is started with.
+        """
+        self.leverage = leverage
+        self.max_cycles = max_cycles
+        self.cycle_notional = cycle_notional
+        self.min_notional = min_notional
+
+    def allocate(self, cycles):
+        """
+        :param cycles: Every cycle known to the pipeline, including finished ones that still hold margin.
+        :return: A tuple of (notional, margin, transfer_margin) for a new cycle, or None if none may start.
+        """
+        running = sum(1 for cycle in cycles if cycle.stage not in TERMINAL_STAGES)
+        if running >= self.max_cycles:
+            return None
+
+        spot = (fetch_balance(binance, 'USDT') or 0) - sum(cycle.spot_reserved for cycle in cycles)
+        futures = (fetch_balance(binance_futures, 'USDT') or 0) - sum(cycle.margin_reserved for cycle in cycles)
+
+        # The largest notional whose buy and margin both fit, moving spot USDT to futures where needed.
+        capacity = min(spot, (spot + futures) * self.leverage / (self.leverage + 1))
+        notional = self.cycle_notional or capacity / (self.max_cycles - running)
+        notional = min(notional, capacity)
+        if notional < self.min_notional:
+            return None
+
+        margin = notional / self.leverage
+        return notional, margin, max(0.0, margin - max(0.0, futures))
+
+
+class CyclePipeline:
+    def __init__(self, select_target, select_medium, leverage, max_cycles=3, cycle_notional=None,
+                 path=CYCLE_STATE_FILE):
+        """
+        Runs trading cycles as explicit state machines so that consecutive cycles overlap.
+
+        Each cycle moves through SCAN, HEDGE, TARGET_TRANSIT, SELL_AND_CLOSE, MEDIUM_BUY, MEDIUM_TRANSIT and
+        MEDIUM_SELL. Trading stages run on a worker pool. Transit stages only check a transfer monitor future,
+        so a cycle waiting for a deposit holds no thread. A new cycle starts whenever the scheduler finds
+        capital for it. Throughput therefore grows with the number of cycles in flight rather than with the
+        length of one cycle.
+
+        :param select_target: A function taking the set of targets held by other cycles and the notional,
+            returning the target currency or None.
+        :param select_medium: A function taking the KRW amount to move, returning the medium currency.
+        :param leverage: The leverage of the short.
+        :param max_cycles: The most cycles running at once.
+        :param cycle_notional: The USDT per cycle, or None to split the free capital evenly.
+        :param path: The file cycle states are persisted to.
+        """
+        self.select_target = select_target
+        self.select_medium = select_medium
+        self.leverage = leverage
+        self.scheduler = CapitalScheduler(leverage, max_cycles, cycle_notional)
+        self.path = path
+        self.cycles = []
+        self.finished = []
+        self.next_id = 1
+        self.completed = 0
+        self.failed = 0
+        self.profit_usdt = 0.0
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_cycles + 1, thread_name_prefix='cycle')
+        self.stages = {
+            SCAN: self._scan,
+            HEDGE: self._hedge,
+            TARGET_TRANSIT: self._target_transit,
+            SELL_AND_CLOSE: self._sell_and_close,
+            MEDIUM_BUY: self._medium_buy,
+            MEDIUM_TRANSIT: self._medium_transit,
+            MEDIUM_SELL: self._medium_sell,
+        }
+
+    def tick(self):
+        """
+        Advance every idle cycle on the worker pool and start a new cycle if capital allows.
+
+        :return: The order details of the cycles that finished since the last tick.
+        """
+        with self.lock:
+            cycles = list(self.cycles)
+
+        for cycle in cycles:
+            self._submit(cycle)
+
+        # Only one cycle scans at a time, so two cycles never pick the same target.
+        if not any(cycle.stage == SCAN for cycle in cycles):
+            try:
+                allocation = self.scheduler.allocate(cycles)
+            except Exception as e:
+                print(f"An error occurred while allocating capital: {e}")
+                allocation = None
+            if allocation:
+                with self.lock:
+                    cycle = CycleState(self.next_id, *allocation)
+                    self.next_id += 1
+                    self.cycles.append(cycle)
+                self._submit(cycle)
+
+        with self.lock:
+            finished, self.finished = self.finished, []
+        return finished
+
+    def run(self, interval: float = 1.0, on_finished=None):
+        """
+        Tick forever.
+
+        :param interval: Seconds between ticks.
+        :param on_finished: An optional function called with the order details of every finished cycle.
+        """
+        while True:
+            for order_details in self.tick():
+                if on_finished:
+                    on_finished(order_details)
+            time.sleep(interval)
+
+    def _submit(self, cycle):
+        if cycle.stage in TERMINAL_STAGES or cycle.busy:
+            return
+        if cycle.transfer is not None and not cycle.transfer.done():
+            return
+        cycle.busy = True
+        self.executor.submit(self._advance, cycle)
+
+    def _advance(self, cycle):
+        # Run stages until the cycle waits, fails or finishes.
+        try:
+            while cycle.stage not in TERMINAL_STAGES:
+                stage = cycle.stage
+                try:
+                    next_stage = self.stages[stage](cycle)
+                except Exception as e:
+                    print(f"An error occurred in the {stage} stage of cycle {cycle.id}: {e}")
+                    cycle.error = str(e)
+                    next_stage = None
+
+                if next_stage is None:
+                    cycle.attempts += 1
+                    if cycle.attempts >= STAGE_ATTEMPTS:
+                        self._transition(cycle, FAILED)
+                    break
+                if next_stage == stage:
+                    break
+                self._transition(cycle, next_stage)
+        finally:
+            cycle.busy = False
+
+    def _transition(self, cycle, stage):
+        if stage == HEDGE:
+            print(f"Cycle {cycle.id} started on {cycle.target} with {cycle.notional:.2f} USDT.")
+        elif stage != DISCARDED:
+            print(f"Cycle {cycle.id}: {cycle.stage} -> {stage}")
+        with self.lock:
+            cycle.stage = stage
+            cycle.attempts = 0
+            cycle.updated_at = time.time()
+            if stage not in TERMINAL_STAGES:
+                cycle.error = None
+            else:
+                cycle.finished_at = cycle.updated_at
+                # The short is the only capital a finished cycle can still hold.
+                cycle.spot_reserved = 0.0
+                if stage == DISCARDED:
+                    cycle.margin_reserved = 0.0
+                    self.cycles.remove(cycle)
+                    # A cycle that never traded gives its number back.
+                    if cycle.id == self.next_id - 1:
+                        self.next_id -= 1
+                elif stage == DONE:
+                    self.completed += 1
+                    self.profit_usdt += cycle.profit()
+                    self.finished.append(cycle.details)
+                else:
+                    self.failed += 1
+                    print(f"Cycle {cycle.id} failed: {cycle.error}")
+                self._prune()
+        if stage != DISCARDED:
+            self.save()
+
+    def _prune(self):
+        finished = [cycle for cycle in self.cycles
+                    if cycle.stage in TERMINAL_STAGES and not cycle.margin_reserved]
+        for cycle in finished[:-FINISHED_KEPT]:
+            self.cycles.remove(cycle)
+
+    def _scan(self, cycle):
+        with self.lock:
+            held = {other.target for other in self.cycles
+                    if other is not cycle and other.stage in TARGET_STAGES and other.target}
+        target = self.select_target(held, cycle.notional)
+        if target is None:
+            return DISCARDED
+        cycle.target = target
+        return HEDGE
+
+    def _hedge(self, cycle):
+        # Nothing is bought unless the short can be sent.
+        if not hedge_engine.prepare(cycle.target, self.leverage):
+            cycle.spot_reserved = 0.0
+            cycle.margin_reserved = 0.0
+            cycle.error = f"{cycle.target} cannot be hedged."
+            return FAILED
+
+        if cycle.transfer_margin > 0:
+            transfer_usdt(binance, 'spot', 'future', cycle.transfer_margin)
+            cycle.transfer_margin = 0.0
+
+        (buy_details, short_details), timings = leg_executor.execute('pipeline_hedge', [
+            Leg('binance', binance, buy_cost, (binance, cycle.target, 'USDT', cycle.notional)),
+            Leg('binance_futures', binance_futures, hedge_engine.short,
+                (cycle.target, self.leverage, 100, cycle.margin)),
+        ])
+        cycle.spot_reserved = 0.0
+
+        if buy_details and short_details:
+            hedge_engine.record_latency(cycle.target, timings[0].acked_at, timings[1].acked_at)
+            cycle.details['target_buy'] = buy_details
+            cycle.details['target_hedge'] = short_details
+            return TARGET_TRANSIT
+
+        # Unwind the leg that filled. The target's coins and position belong to this cycle alone.
+        # Only the coins left after fees are sold; `trade_amount` floors them to the amount step.
+        unwound = True
+        if buy_details:
+            cycle.details['target_buy'] = buy_details
+            unwind = trade_amount(binance, cycle.target, 'USDT', 'sell',
+                                  net_of_fees(buy_details, 'quantity', cycle.target))
+            if unwind:
+                cycle.details['unwind_sell'] = unwind
+            else:
+                unwound = False
+        if short_details:
+            cycle.details['target_hedge'] = short_details
+            unwind = close_short(binance_futures, cycle.target, 'USDT', short_details['quantity'])
+            if unwind:
+                cycle.details['unwind_close'] = unwind
+            else:
+                unwound = False
+        # A failed cycle keeps the margin of a short it could not close.
+        if 'target_hedge' not in cycle.details or 'unwind_close' in cycle.details:
+            cycle.margin_reserved = 0.0
+        cycle.error = "The hedge legs did not both fill."
+        if not unwound:
+            cycle.error += " Unwinding the filled leg also failed."
+        return FAILED
+
+    def _watch(self, cycle, from_exchange, to_exchange, currency, withdrawal_id):
+        cycle.transfer = transfer_monitor.watch_transfer(from_exchange, to_exchange, currency, withdrawal_id)
+
+    def _finish_transfer(self, cycle, to_exchange, currency):
+        transfer, cycle.transfer = cycle.transfer, None
+        record = transfer.result()
+        if not complete_transfer(to_exchange, currency, record):
+            cycle.error = f"The {currency} transfer was {record['status']}."
+            return None
+        return record
+
+    def _target_transit(self, cycle):
+        if cycle.transfer is None:
+            if cycle.target_withdrawal_id is None:
+                route = route_table.get(cycle.target, BINANCE_TO_COINONE)
+                if route is None:
+                    cycle.error = f"No withdrawal route for {cycle.target}."
+                    return None
+                # Only the coins this cycle bought are withdrawn, never another cycle's.
+                amount = net_of_fees(cycle.details['target_buy'], 'quantity', cycle.target)
+                if route.withdraw_step:
+                    amount = amount // route.withdraw_step * route.withdraw_step
+                withdrawal = withdraw(binance, binance_master, cycle.target, 100, route.address,
+                                      tag=route.tag, network=route.network, amount=amount)
+                if withdrawal is None:
+                    return None
+                cycle.target_amount = amount
+                cycle.target_withdrawal_id = withdrawal['id']
+                self.save()
+            self._watch(cycle, binance_master, coinone, cycle.target, cycle.target_withdrawal_id)
+            return TARGET_TRANSIT
+        if not cycle.transfer.done():
+            return TARGET_TRANSIT
+
+        transfer, cycle.transfer = cycle.transfer, None
+        record = transfer.result()
+        if record['status'] in ('failed', 'canceled'):
+            return self._unwind_target(cycle, record['status'])
+        if record['status'] == UNCERTAIN:
+            return self._check_target_arrival(cycle)
+        if not complete_transfer(coinone, cycle.target, record):
+            cycle.error = f"The {cycle.target} transfer was {record['status']}."
+            return None
+        if record.get('amount') is not None:
+            cycle.target_arrived = Decimal(str(record['amount']))
+        else:
+            cycle.target_arrived = self._expected_target_arrival(cycle)
+        return SELL_AND_CLOSE
+
+    def _expected_target_arrival(self, cycle):
+        route = route_table.get(cycle.target, BINANCE_TO_COINONE)
+        fee = route.withdraw_fee if route is not None and route.withdraw_fee else 0
+        return cycle.target_amount - fee
+
+    def _check_target_arrival(self, cycle):
+        # The deposit could not be matched, so the Coinone balance decides whether it arrived.
+        # The target is held by this cycle alone, so its Coinone balance is this cycle's coins.
+        portfolio_ledger.mark_uncertain(coinone)
+        expected = self._expected_target_arrival(cycle)
+        balance = Decimal(str(fetch_balance(coinone, cycle.target) or 0))
+        if balance < expected:
+            # Keep the position hedged and look again; the withdrawal is watched anew.
+            cycle.error = f"The {cycle.target} deposit is unconfirmed; {balance} of {expected} is on Coinone."
+            return TARGET_TRANSIT
+        cycle.target_arrived = expected
+        return SELL_AND_CLOSE
+
+    def _unwind_target(self, cycle, status):
+        # A failed withdrawal is refunded to the master account it was sent from, so the coins are sold
+        # there and the short is closed. A step that fails is retried; the withdrawal resolves again at once.
+        if 'unwind_sell' not in cycle.details:
+            portfolio_ledger.mark_uncertain(binance_master)
+            unwind = trade_amount(binance_master, cycle.target, 'USDT', 'sell', cycle.target_amount)
+            if not unwind:
+                cycle.error = f"The {cycle.target} withdrawal was {status} and selling the refund failed."
+                return None
+            cycle.details['unwind_sell'] = unwind
+            self.save()
+        if 'unwind_close' not in cycle.details:
+            unwind = close_short(binance_futures, cycle.target, 'USDT', cycle.details['target_hedge']['quantity'])
+            if not unwind:
+                cycle.error = f"The {cycle.target} withdrawal was {status} and closing the short failed."
+                return None
+            cycle.details['unwind_close'] = unwind
+        cycle.margin_reserved = 0.0
+        cycle.error = (f"The {cycle.target} withdrawal was {status}. The refund was sold in the master "
+                       f"account and the short closed.")
+        return FAILED
+
+    def _sell_and_close(self, cycle):
+        # Only the legs that have not filled yet are sent, so a retry never sells or closes twice.
+        legs = []
+        if 'target_sell' not in cycle.details:
+            legs.append(('target_sell', Leg('coinone', coinone, trade_amount,
+                                            (coinone, cycle.target, 'KRW', 'sell', cycle.target_arrived))))
+        if 'target_close' not in cycle.details:
+            # Only this cycle's short is covered; inventory hedges on the same symbol stay open.
+            legs.append(('target_close', Leg('binance_futures', binance_futures, close_short,
+                                             (binance_futures, cycle.target, 'USDT',
+                                              cycle.details['target_hedge']['quantity']))))
+        if legs:
+            results, _ = leg_executor.execute('pipeline_sell_and_close', [leg for _, leg in legs])
+            for (key, _), result in zip(legs, results):
+                if result:
+                    cycle.details[key] = result
+                    # Saved at once, so a restart never sends a filled leg again.
+                    self.save()
+
+        if 'target_close' in cycle.details:
+            cycle.margin_reserved = 0.0
+        if 'target_sell' not in cycle.details or 'target_close' not in cycle.details:
+            return None
+
+        cycle.krw_proceeds = net_of_fees(cycle.details['target_sell'], 'total_cost', 'KRW')
+        return MEDIUM_BUY
+
+    def _medium_buy(self, cycle):
+        if cycle.medium is None:
+            cycle.medium = self.select_medium(float(cycle.krw_proceeds))
+
+        details = buy_cost(coinone, cycle.medium, 'KRW', cycle.krw_proceeds)
+        if not details:
+            return None
+        cycle.details['medium_buy'] = details
+        cycle.medium_amount = net_of_fees(details, 'quantity', cycle.medium)
+        return MEDIUM_TRANSIT
+
+    def _medium_transit(self, cycle):
+        info = current_coinone_currencies().transfer_info(cycle.medium)
+        if cycle.transfer is None:
+            if cycle.medium_withdrawal_id is None:
+                route = route_table.get(cycle.medium, COINONE_TO_BINANCE)
+                if route is None or not route.address:
+                    cycle.error = f"No deposit address for {cycle.medium} on Binance."
+                    return None
+                amount = cycle.medium_amount
+                if info is not None and info.max_precision is not None:
+                    amount = Quantizer(info.max_precision, ccxt.DECIMAL_PLACES)(amount)
+                withdrawal = withdraw_amount(coinone, cycle.medium, amount, route.address, tag=route.tag)
+                if withdrawal is None:
+                    return None
+                cycle.medium_withdrawal_id = withdrawal['id']
+                self.save()
+            self._watch(cycle, coinone, binance, cycle.medium, cycle.medium_withdrawal_id)
+            return MEDIUM_TRANSIT
+        if not cycle.transfer.done():
+            return MEDIUM_TRANSIT
+
+        record = self._finish_transfer(cycle, binance, cycle.medium)
+        if record is None:
+            return FAILED
+        if record.get('amount') is not None:
+            cycle.medium_arrived = Decimal(str(record['amount']))
+        else:
+            fee = info.withdrawal_fee if info is not None and info.withdrawal_fee else 0
+            cycle.medium_arrived = cycle.medium_amount - Decimal(str(fee))
+        return MEDIUM_SELL
+
+    def _medium_sell(self, cycle):
+        details = trade_amount(binance, cycle.medium, 'USDT', 'sell', cycle.medium_arrived)
+        if not details:
+            return None
+        cycle.details['medium_sell'] = details
+        cycle.received_usdt = net_of_fees(details, 'total_cost', 'USDT')
+        return DONE
+
+    def summary(self):
+        """
+        :return: A dictionary with the running, completed and failed cycle counts, the realized profit in USDT
+            and the profit per hour since the pipeline started.
+        """
+        with self.lock:
+            running = sum(1 for cycle in self.cycles if cycle.stage not in TERMINAL_STAGES)
+            hours = (time.time() - self.started_at) / 3600
+            return {
+                'running': running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'profit_usdt': self.profit_usdt,
+                'profit_per_hour': self.profit_usdt / hours if hours > 0 else None,
+            }
+
+    def save(self):
+        """
+        Write every cycle's state to the state file.
+
+        The state is written to a temporary file that replaces the old one, so a crash mid-write never
+        leaves a truncated file, and saves are serialized so an older state never overwrites a newer one.
+        """
+        with self.save_lock:
+            with self.lock:
+                data = {'next_id': self.next_id, 'cycles': [cycle.to_dict() for cycle in self.cycles]}
+            temporary_path = self.path + '.tmp'
+            with open(temporary_path, mode='w') as file:
+                json.dump(data, file, default=str)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+
+    def load(self):
+        """
+        Restore cycles from the state file.
+
+        Cycles in transit are tracked again and an interrupted sell and close is retried. Each of its
+        legs is saved as soon as its result is known, so only a leg whose result was never recorded is
+        sent again. A cycle stopped in any other stage may have sent an order whose result was lost,
+        so it is marked failed for review. Failed cycles keep the margin of any short they left open.
+
+        :return: The number of cycles resumed.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, mode='r') as file:
+            data = json.load(file)
+
+        resumed = 0
+        with self.lock:
+            self.next_id = data['next_id']
+            for item in data['cycles']:
+                cycle = CycleState.from_dict(item)
+                if cycle.stage == SCAN:
+                    continue
+                if cycle.stage in (HEDGE, MEDIUM_BUY, MEDIUM_SELL):
+                    cycle.stage = FAILED
+                    cycle.error = f"Interrupted during {item['stage']}."
+                    cycle.spot_reserved = 0.0
+                elif cycle.stage not in TERMINAL_STAGES:
+                    resumed += 1
+                self.cycles.append(cycle)
+        return resumed
@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from exchanges import binance_futures
+
+
+# One futures position. `amount` is negative for shorts. `updated_at` is the exchange time in milliseconds.
+Position = namedtuple('Position', ['market_id', 'amount', 'entry_price', 'updated_at'])
+
+
+def _market_id(order):
+    info = order.get('info') or {}
+    if info.get('symbol'):
+        return info['symbol']
+    return order['symbol'].split(':')[0].replace('/', '')
+
+
+class PositionIndex:
+    def __init__(self, exchange=binance_futures, reconcile_interval: float = 60):
+        """
+        Futures positions keyed by market ID (e.g. 'BTCUSDT'), kept current from order fills and
+        ACCOUNT_UPDATE user-data messages and reconciled with one bulk position request.
+
+        A symbol whose order was acknowledged without fill details is marked stale, and its next read
+        fetches that one position from the exchange.
+
+        :param exchange: The Binance USDT-M futures client.
+        :param reconcile_interval: Seconds between background reconciliations.
+        """
+        self.exchange = exchange
+        self.reconcile_interval = reconcile_interval
+        self.positions = {}
+        self.stale = set()
+        self.loaded = False
+        self.version = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def reconcile(self):
+        """
+        Replace the index with one `fapiPrivateV2GetPositionRisk` call.
+
+        :return: The raw position rows, or None if updates arrived while the request was in flight.
+        """
+        with self.lock:
+            version = self.version
+        rows = self.exchange.fapiPrivateV2GetPositionRisk()
+        positions = {}
+        for row in rows:
+            positions[row['symbol']] = Position(
+                row['symbol'], Decimal(row['positionAmt']), Decimal(row['entryPrice']),
+                int(row.get('updateTime') or 0))
+
+        with self.lock:
+            if self.version != version:
+                return None
+            self.positions = positions
+            self.stale = set()
+            self.loaded = True
+            self.version += 1
+        return rows
+
+    def amount(self, market_id):
+        """
+        :param market_id: The futures market ID (e.g., 'BTCUSDT').
+        :return: The position amount as a Decimal, negative for shorts, 0 if there is none.
+        """
+        if not self.loaded:
+            self.reconcile()
+        with self.lock:
+            stale = market_id in self.stale
+        if stale:
+            self._reconcile_symbol(market_id)
+        with self.lock:
+            position = self.positions.get(market_id)
+        return position.amount if position else Decimal(0)
+
+    def _reconcile_symbol(self, market_id):
+        with self.lock:
+            version = self.version
+        rows = self.exchange.fapiPrivateV2GetPositionRisk({'symbol': market_id})
+        row = next((row for row in rows if row['symbol'] == market_id), None)
+
+        with self.lock:
+            if self.version != version:
+                # Another update arrived meanwhile; keep the symbol stale so the next read fetches it again.
+                return
+            if row is None:
+                self.positions.pop(market_id, None)
+            else:
+                self.positions[market_id] = Position(
+                    market_id, Decimal(row['positionAmt']), Decimal(row['entryPrice']),
+                    int(row.get('updateTime') or 0))
+            self.stale.discard(market_id)
+            self.version += 1
+
+    def mark_stale(self, market_id):
+        """
+        Make the next read of the position fetch it from the exchange.
+        """
+        with self.lock:
+            self.stale.add(market_id)
+            self.version += 1
+
+    def get(self, market_id):
+        with self.lock:
+            return self.positions.get(market_id)
+
+    def open_positions(self):
+        with self.lock:
+            return [position for position in self.positions.values() if position.amount != 0]
+
+    def apply_fill(self, order):
+        """
+        Apply a futures order's fill.
+
+        Fills already covered by a later ACCOUNT_UPDATE for the symbol are skipped, and orders acknowledged
+        without a fill mark the symbol stale.
+        """
+        market_id = _market_id(order)
+        filled = order.get('filled')
+        if not filled:
+            self.mark_stale(market_id)
+            return
+        delta = Decimal(str(filled)) * (1 if order['side'] == 'buy' else -1)
+        timestamp = order.get('timestamp') or int(time.time() * 1000)
+
+        with self.lock:
+            position = self.positions.get(market_id)
+            if position is not None and position.updated_at >= timestamp:
+                return
+            amount = (position.amount if position else Decimal(0)) + delta
+            entry_price = position.entry_price if position else Decimal(str(order.get('average') or 0))
+            self._set(Position(market_id, amount, entry_price, timestamp))
+
+    def handle_user_event(self, exchange, message):
+        """
+        Apply the positions of a futures ACCOUNT_UPDATE message. Other messages are ignored.
+        """
+        if exchange is not self.exchange or message.get('e') != 'ACCOUNT_UPDATE':
+            return
+        with self.lock:
+            for update in message['a'].get('P', []):
+                self._set(Position(update['s'], Decimal(update['pa']), Decimal(update['ep']), message['E']))
+                self.stale.discard(update['s'])
+
+    def _set(self, position):
+        # Flat positions are kept so their update time still guards against stale fills.
+        self.positions[position.market_id] = position
+        self.version += 1
+
+    def start(self):
+        """
+        Load the positions, then reconcile them on a daemon thread.
+        """
+        self.reconcile()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.reconcile_interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"An error occurred while reconciling positions: {e}")
+
+
+position_index = PositionIndex()
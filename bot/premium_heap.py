@@ -0,0 +1,180 @@
+import heapq
+import random
+import time
+
+
+class PremiumHeap:
+    def __init__(self, premiums=()):
+        """
+        Indexed max-heap of premium tuples keyed by symbol.
+
+        A symbol's premium is updated or removed in O(log n), the best premium is read in O(1), and
+        candidates can be walked best-first without rebuilding or sorting the whole set.
+
+        :param premiums: Optional initial (symbol, price_diff, price_diff_percent, ...) tuples.
+        """
+        self.heap = []
+        self.positions = {}
+        for premium in premiums:
+            self.update(premium)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, symbol):
+        return symbol in self.positions
+
+    def get(self, symbol):
+        """
+        :return: The current premium tuple of the symbol, or None.
+        """
+        position = self.positions.get(symbol)
+        return None if position is None else self.heap[position]
+
+    def peek(self):
+        """
+        :return: The highest premium tuple, or None if the heap is empty.
+        """
+        return self.heap[0] if self.heap else None
+
+    def update(self, premium):
+        """
+        Insert a premium or replace the symbol's previous one.
+
+        :param premium: A (symbol, price_diff, price_diff_percent, ...) tuple, ranked by price_diff_percent.
+        """
+        symbol = premium[0]
+        position = self.positions.get(symbol)
+        if position is None:
+            self.heap.append(premium)
+            self.positions[symbol] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+            return
+
+        previous = self.heap[position]
+        self.heap[position] = premium
+        if premium[2] > previous[2]:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def remove(self, symbol):
+        """
+        Remove a symbol if it is present.
+        """
+        position = self.positions.pop(symbol, None)
+        if position is None:
+            return
+
+        last = self.heap.pop()
+        if position == len(self.heap):
+            return
+
+        self.heap[position] = last
+        self.positions[last[0]] = position
+        self._sift_up(position)
+        self._sift_down(self.positions[last[0]])
+
+    def replace_all(self, premiums):
+        """
+        Apply a full set of premiums, updating changed symbols and removing symbols that are absent.
+
+        :param premiums: An iterable of premium tuples.
+        """
+        seen = set()
+        for premium in premiums:
+            seen.add(premium[0])
+            self.update(premium)
+        for symbol in [symbol for symbol in self.positions if symbol not in seen]:
+            self.remove(symbol)
+
+    def iter_best(self):
+        """
+        Yield premiums best-first by walking the heap with a frontier of candidate positions.
+
+        Taking the first k entries costs O(k log k) regardless of the heap size. The heap must not be
+        modified while iterating.
+        """
+        if not self.heap:
+            return
+
+        frontier = [(-self.heap[0][2], 0)]
+        while frontier:
+            _, position = heapq.heappop(frontier)
+            yield self.heap[position]
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self.heap):
+                    heapq.heappush(frontier, (-self.heap[child][2], child))
+
+    def next_best(self, predicate, skip=()):
+        """
+        :param predicate: A function taking a premium tuple and returning whether it is acceptable.
+        :param skip: Symbols to pass over without evaluating the predicate.
+        :return: The highest premium that passes the predicate, or None.
+        """
+        for premium in self.iter_best():
+            if premium[0] in skip:
+                continue
+            if predicate(premium):
+                return premium
+        return None
+
+    def _swap(self, i, j):
+        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+        self.positions[self.heap[i][0]] = i
+        self.positions[self.heap[j][0]] = j
+
+    def _sift_up(self, position):
+        while position > 0:
+            parent = (position - 1) // 2
+            if self.heap[position][2] <= self.heap[parent][2]:
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position):
+        size = len(self.heap)
+        while True:
+            largest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and self.heap[child][2] > self.heap[largest][2]:
+                    largest = child
+            if largest == position:
+                return
+            self._swap(position, largest)
+            position = largest
+
+
+def benchmark(sizes=(250, 5000), updates=20000):
+    """
+    Compare per-update heap maintenance against re-sorting every premium after each update.
+
+    :param sizes: The universe sizes to benchmark.
+    :param updates: The number of random single-symbol updates per run.
+    """
+    rng = random.Random(0)
+    for size in sizes:
+        premiums = {f'C{i}': (f'C{i}', 0.0, rng.uniform(-3, 8)) for i in range(size)}
+        stream = [(f'C{rng.randrange(size)}', 0.0, rng.uniform(-3, 8)) for _ in range(updates)]
+
+        heap = PremiumHeap(premiums.values())
+        start = time.perf_counter()
+        for premium in stream:
+            heap.update(premium)
+            heap.peek()
+        heap_time = time.perf_counter() - start
+
+        sorted_updates = updates // 20
+        start = time.perf_counter()
+        for premium in stream[:sorted_updates]:
+            premiums[premium[0]] = premium
+            sorted(premiums.values(), key=lambda x: x[2], reverse=True)[0]
+        sorted_time = (time.perf_counter() - start) / sorted_updates * updates
+
+        print(f"{size} symbols: heap {updates / heap_time:,.0f} updates/s, "
+              f"sorted {updates / sorted_time:,.0f} updates/s, "
+              f"speedup {sorted_time / heap_time:.0f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
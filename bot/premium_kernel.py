@@ -0,0 +1,148 @@
+import time
+import numpy as np
+
+
+class PremiumKernel:
+    def __init__(self, symbols):
+        """
+        Array-backed premium calculator over a fixed symbol index.
+
+        :param symbols: The currencies or trading pairs to index (e.g., ['BTC', 'XRP/KRW']).
+        """
+        self.symbols = list(symbols)
+        self.targets = [symbol.split('/')[0] for symbol in self.symbols]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        size = len(self.symbols)
+        self.krw_last = np.full(size, np.nan)
+        self.krw_bid = np.full(size, np.nan)
+        self.krw_ask = np.full(size, np.nan)
+        self.usdt_last = np.full(size, np.nan)
+        self.usdt_bid = np.full(size, np.nan)
+        self.usdt_ask = np.full(size, np.nan)
+
+    def load_quotes(self, krw_quotes, usdt_quotes):
+        """
+        Fill the price arrays from quote mappings keyed by base currency.
+
+        :param krw_quotes: A mapping of base currency to `Quote` on the KRW exchange.
+        :param usdt_quotes: A mapping of base currency to `Quote` on the USDT exchange.
+        """
+        missing = (np.nan, np.nan, np.nan)
+        krw = np.array([krw_quotes.get(target) or missing for target in self.targets],
+                       dtype=np.float64).reshape(-1, 3)
+        usdt = np.array([usdt_quotes.get(target) or missing for target in self.targets],
+                        dtype=np.float64).reshape(-1, 3)
+
+        self.krw_last[:], self.krw_bid[:], self.krw_ask[:] = krw.T
+        self.usdt_last[:], self.usdt_bid[:], self.usdt_ask[:] = usdt.T
+
+    def set_quote(self, symbol, krw_quote=None, usdt_quote=None):
+        """
+        Update the prices of a single symbol in place.
+
+        :param symbol: The indexed symbol to update.
+        :param krw_quote: An optional (last, bid, ask) tuple on the KRW exchange.
+        :param usdt_quote: An optional (last, bid, ask) tuple on the USDT exchange.
+        """
+        i = self.index[symbol]
+        if krw_quote is not None:
+            self.krw_last[i], self.krw_bid[i], self.krw_ask[i] = krw_quote
+        if usdt_quote is not None:
+            self.usdt_last[i], self.usdt_bid[i], self.usdt_ask[i] = usdt_quote
+
+    def compute(self, fx_rate: float):
+        """
+        Compute premiums for every indexed symbol in one vectorized pass.
+
+        :param fx_rate: The exchange rate from USDT to KRW.
+        :return: A dictionary of float64 arrays aligned with `symbols`:
+                 'krw_in_usdt', 'usdt_in_krw', 'price_diff', 'price_diff_percent' (last prices)
+                 and 'bid_ask_percent' (selling at the KRW bid after buying at the USDT ask).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            krw_in_usdt = self.krw_last / fx_rate
+            price_diff = krw_in_usdt - self.usdt_last
+            return {
+                'krw_in_usdt': krw_in_usdt,
+                'usdt_in_krw': self.usdt_last * fx_rate,
+                'price_diff': price_diff,
+                'price_diff_percent': price_diff / self.usdt_last * 100,
+                'bid_ask_percent': (self.krw_bid / fx_rate - self.usdt_ask) / self.usdt_ask * 100,
+            }
+
+    def rank(self, fx_rate: float, k=None, descending=True, key='price_diff_percent'):
+        """
+        Select the k best symbols with `argpartition` and sort only those.
+
+        :param fx_rate: The exchange rate from USDT to KRW.
+        :param k: The number of symbols to return. All priced symbols are returned if omitted.
+        :param descending: Whether the highest premium comes first.
+        :param key: The computed array to rank by.
+        :return: A list of (symbol, price_diff, price_diff_percent) tuples.
+        """
+        values = self.compute(fx_rate)
+        scores = values[key] if descending else -values[key]
+        valid = np.flatnonzero(np.isfinite(scores))
+
+        if k is None or k >= len(valid):
+            best = valid
+        else:
+            best = valid[np.argpartition(-scores[valid], k - 1)[:k]]
+        best = best[np.argsort(-scores[best], kind='stable')]
+
+        price_diff = values['price_diff']
+        price_diff_percent = values['price_diff_percent']
+        return [(self.symbols[i], float(price_diff[i]), float(price_diff_percent[i])) for i in best]
+
+
+def _python_premiums(symbols, krw_prices, usdt_prices, fx_rate):
+    # The per-symbol path the scanner used before the kernel existed.
+    premiums = []
+    for symbol in symbols:
+        target = symbol.split('/')[0]
+        ex_a_price = krw_prices[target] / fx_rate
+        price_diff = ex_a_price - usdt_prices[target]
+        price_diff_percent = price_diff / usdt_prices[target] * 100
+        premiums.append((symbol, price_diff, price_diff_percent))
+    return sorted(premiums, key=lambda x: x[2], reverse=True)
+
+
+def benchmark(sizes=(250, 5000), k=10, repeat=200, fx_rate=1300):
+    """
+    Compare the per-symbol Python path against the kernel on synthetic universes.
+
+    :param sizes: The universe sizes to benchmark.
+    :param k: The number of candidates to select with the kernel.
+    :param repeat: The number of timed iterations per path.
+    :param fx_rate: The exchange rate from USDT to KRW.
+    """
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        symbols = [f'C{i}/KRW' for i in range(size)]
+        usdt = rng.uniform(0.001, 50000, size)
+        krw = usdt * fx_rate * rng.uniform(0.97, 1.05, size)
+        usdt_prices = {f'C{i}': p for i, p in enumerate(usdt)}
+        krw_prices = {f'C{i}': p for i, p in enumerate(krw)}
+
+        kernel = PremiumKernel(symbols)
+        kernel.krw_last[:] = krw
+        kernel.usdt_last[:] = usdt
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            _python_premiums(symbols, krw_prices, usdt_prices, fx_rate)
+        python_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            kernel.rank(fx_rate, k)
+        kernel_time = (time.perf_counter() - start) / repeat
+
+        print(f"{size} symbols: python {python_time * 1e6:.1f} us, "
+              f"kernel top-{k} {kernel_time * 1e6:.1f} us, "
+              f"speedup {python_time / kernel_time:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
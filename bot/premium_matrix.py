@@ -0,0 +1,134 @@
+import concurrent.futures
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from exchanges import binance, bybit, coinone, upbit
+from snapshot import fetch_all_quotes
+
+
+# KRW venues compared against the USDT reference venues.
+KRW_VENUES = {
+    'coinone': coinone,
+    'upbit': upbit,
+}
+
+# USDT venues the KRW prices are compared against. Bybit is added with `include_bybit`.
+REFERENCE_VENUES = {
+    'binance': binance,
+}
+
+# The first three fields match the (symbol, price_diff, price_diff_percent) premium tuples.
+VenuePremium = namedtuple('VenuePremium', ['symbol', 'price_diff', 'price_diff_percent', 'venue', 'reference'])
+
+# One bulk request per venue runs in parallel on this pool.
+_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='premium-matrix')
+
+
+class PremiumMatrix:
+    def __init__(self, timestamp, fx_rate, venues, references, symbols, krw_prices, usdt_prices):
+        """
+        Premiums of every KRW venue against every reference venue for a shared symbol axis.
+
+        :param timestamp: When the prices were fetched.
+        :param fx_rate: The exchange rate from USDT to KRW.
+        :param venues: The KRW venue names (rows of `krw_prices`).
+        :param references: The USDT venue names (rows of `usdt_prices`).
+        :param symbols: The base currencies (columns of both price arrays).
+        :param krw_prices: A (venues, symbols) float64 array of KRW last prices, NaN where unlisted.
+        :param usdt_prices: A (references, symbols) float64 array of USDT last prices, NaN where unlisted.
+        """
+        self.timestamp = timestamp
+        self.fx_rate = fx_rate
+        self.venues = venues
+        self.references = references
+        self.symbols = symbols
+        self.krw_prices = krw_prices
+        self.usdt_prices = usdt_prices
+
+        # (venues, references, symbols) in one broadcast pass.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.price_diff = krw_prices[:, None, :] / fx_rate - usdt_prices[None, :, :]
+            self.price_diff_percent = self.price_diff / usdt_prices[None, :, :] * 100
+
+    def age(self):
+        return time.time() - self.timestamp
+
+    def ranked(self, k=None, symbols=None, venues=None, references=None):
+        """
+        :param k: Only return the k highest premiums if given.
+        :param symbols: Optional set of base currencies to restrict the ranking to.
+        :param venues: Optional set of KRW venue names to restrict the ranking to.
+        :param references: Optional set of USDT venue names to restrict the ranking to.
+        :return: A list of `VenuePremium` sorted by premium in descending order.
+        """
+        scores = self.price_diff_percent.copy()
+        if symbols is not None:
+            allowed = np.array([symbol in symbols for symbol in self.symbols], dtype=bool)
+            scores[:, :, ~allowed] = np.nan
+        if venues is not None:
+            allowed = np.array([venue in venues for venue in self.venues], dtype=bool)
+            scores[~allowed, :, :] = np.nan
+        if references is not None:
+            allowed = np.array([reference in references for reference in self.references], dtype=bool)
+            scores[:, ~allowed, :] = np.nan
+
+        flat = scores.ravel()
+        valid = np.flatnonzero(np.isfinite(flat))
+        if k is not None and k < len(valid):
+            valid = valid[np.argpartition(-flat[valid], k - 1)[:k]]
+        best = valid[np.argsort(-flat[valid], kind='stable')]
+
+        premiums = []
+        for venue, reference, column in zip(*np.unravel_index(best, scores.shape)):
+            premiums.append(VenuePremium(
+                self.symbols[column], float(self.price_diff[venue, reference, column]),
+                float(self.price_diff_percent[venue, reference, column]),
+                self.venues[venue], self.references[reference]))
+        return premiums
+
+
+def _collect(futures):
+    # One venue failing must not cost the others their row.
+    quotes = {}
+    for name, future in futures.items():
+        try:
+            quotes[name] = future.result()
+        except Exception as e:
+            print(f"An error occurred while fetching {name} quotes: {e}")
+    return quotes
+
+
+def fetch_premium_matrix(fx_rate: float, include_bybit=False, krw_venues=None, references=None):
+    """
+    Fetch every venue with one bulk ticker request each, in parallel, and build the premium matrix.
+
+    :param fx_rate: The exchange rate from USDT to KRW.
+    :param include_bybit: Whether to add Bybit spot as a second reference venue.
+    :param krw_venues: Optional mapping of KRW venue names to exchange instances.
+    :param references: Optional mapping of USDT venue names to exchange instances.
+    :return: A `PremiumMatrix`. Venues whose request failed are left out; if that leaves no shared symbols,
+        the matrix is empty and ranks nothing.
+    """
+    krw_venues = krw_venues or KRW_VENUES
+    references = dict(references or REFERENCE_VENUES)
+    if include_bybit:
+        references['bybit'] = bybit
+
+    krw_futures = {name: _executor.submit(fetch_all_quotes, exchange, 'KRW')
+                   for name, exchange in krw_venues.items()}
+    usdt_futures = {name: _executor.submit(fetch_all_quotes, exchange, 'USDT')
+                    for name, exchange in references.items()}
+    krw_quotes = _collect(krw_futures)
+    usdt_quotes = _collect(usdt_futures)
+
+    symbols = sorted(set().union(set(), *krw_quotes.values()) & set().union(set(), *usdt_quotes.values()))
+
+    def price_rows(quotes_by_venue):
+        return np.array([[quotes[symbol].last if symbol in quotes else np.nan for symbol in symbols]
+                         for quotes in quotes_by_venue.values()],
+                        dtype=np.float64).reshape(len(quotes_by_venue), len(symbols))
+
+    return PremiumMatrix(time.time(), fx_rate, list(krw_quotes), list(usdt_quotes), symbols,
+                         price_rows(krw_quotes), price_rows(usdt_quotes))
@@ -0,0 +1,163 @@
+import csv
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from exchanges import binance, binance_master
+
+
+ADDRESS_FILE = 'address.csv'
+
+BINANCE_TO_COINONE = 'binance_to_coinone'
+COINONE_TO_BINANCE = 'coinone_to_binance'
+
+# Everything a withdrawal needs for one currency and direction.
+# The step, fee and minimum are Decimals, or None where the sending venue does not publish them.
+WithdrawalRoute = namedtuple('WithdrawalRoute', [
+    'currency', 'direction', 'address', 'tag', 'network',
+    'withdraw_step', 'withdraw_fee', 'withdraw_min', 'withdraw_enabled'])
+
+# The default deposit network of one currency on Binance. `arrival_seconds` is None if Binance gives no estimate.
+DepositNetwork = namedtuple('DepositNetwork', [
+    'currency', 'network', 'deposit_enabled', 'min_confirm', 'arrival_seconds'])
+
+
+def _to_decimal(value):
+    return None if value in (None, '') else Decimal(str(value))
+
+
+def _default_deposit_network(currency, networks):
+    network = next((net for net in networks if net.get('isDefault')), networks[0] if networks else None)
+    if network is None:
+        return None
+    # Binance reports the estimated arrival time in minutes.
+    arrival = network.get('estimatedArrivalTime')
+    return DepositNetwork(currency, network['network'], bool(network.get('depositEnable')),
+                          int(network.get('minConfirm') or 0), float(arrival) * 60 if arrival else None)
+
+
+def _read_addresses(csv_path):
+    with open(csv_path, mode='r') as file:
+        return {row['Currency']: (row['Deposit Address'], row['Tag'], row['Deposit Network'])
+                for row in csv.DictReader(file)}
+
+
+class RouteTable:
+    def __init__(self, csv_path=ADDRESS_FILE, refresh_interval: float = 600):
+        """
+        Withdrawal routes per (currency, direction).
+
+        Binance to Coinone routes combine the Coinone deposit addresses in address.csv with the network
+        rules of one bulk `fetch_currencies` call on the Binance master account. Coinone to Binance routes
+        use the Binance deposit address, fetched once per currency and kept. The same call also gives the
+        default deposit network of every Binance currency.
+
+        :param csv_path: The address.csv file with the Coinone deposit addresses.
+        :param refresh_interval: Seconds between background refreshes.
+        """
+        self.csv_path = csv_path
+        self.refresh_interval = refresh_interval
+        self.routes = {}
+        self.deposit_networks = {}
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def refresh(self):
+        """
+        Rebuild the Binance to Coinone routes with one `fetch_currencies` call and one read of the CSV.
+
+        :return: The number of routes built.
+        """
+        addresses = _read_addresses(self.csv_path)
+        currencies = binance_master.fetch_currencies()
+
+        routes = {}
+        for currency, (address, tag, network) in addresses.items():
+            networks = (currencies.get(currency) or {}).get('info', {}).get('networkList', [])
+            rule = next((net for net in networks if net['network'] == network), None)
+            if rule is None:
+                routes[(currency, BINANCE_TO_COINONE)] = WithdrawalRoute(
+                    currency, BINANCE_TO_COINONE, address, tag, network, None, None, None, False)
+                continue
+            routes[(currency, BINANCE_TO_COINONE)] = WithdrawalRoute(
+                currency, BINANCE_TO_COINONE, address, tag, network,
+                _to_decimal(rule.get('withdrawIntegerMultiple')), _to_decimal(rule.get('withdrawFee')),
+                _to_decimal(rule.get('withdrawMin')), bool(rule.get('withdrawEnable')))
+
+        deposit_networks = {}
+        for currency, info in currencies.items():
+            network = _default_deposit_network(currency, (info.get('info') or {}).get('networkList', []))
+            if network is not None:
+                deposit_networks[currency] = network
+
+        with self.lock:
+            # Coinone to Binance routes are fetched individually and stay valid across refreshes.
+            for key, route in self.routes.items():
+                if key[1] == COINONE_TO_BINANCE:
+                    routes[key] = route
+            self.routes = routes
+            self.deposit_networks = deposit_networks
+            self.refreshed_at = time.time()
+        return len(routes)
+
+    def get(self, currency, direction=BINANCE_TO_COINONE):
+        """
+        :param currency: The currency to withdraw (e.g., 'XRP').
+        :param direction: BINANCE_TO_COINONE or COINONE_TO_BINANCE.
+        :return: The `WithdrawalRoute`, or None if there is none.
+        """
+        if self.refreshed_at is None:
+            self.refresh()
+
+        with self.lock:
+            route = self.routes.get((currency, direction))
+        if route is None and direction == COINONE_TO_BINANCE:
+            route = self._fetch_binance_route(currency)
+        return route
+
+    def deposit_network(self, currency):
+        """
+        :param currency: The currency deposited to Binance (e.g., 'XRP').
+        :return: Its default `DepositNetwork` on Binance, or None if Binance does not list it.
+        """
+        if self.refreshed_at is None:
+            self.refresh()
+        return self.deposit_networks.get(currency)
+
+    def _fetch_binance_route(self, currency):
+        try:
+            deposit_info = binance.fetch_deposit_address(currency)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+        route = WithdrawalRoute(currency, COINONE_TO_BINANCE, deposit_info.get('address'),
+                                deposit_info.get('tag'), deposit_info.get('network'), None, None, None, True)
+        with self.lock:
+            self.routes[(currency, COINONE_TO_BINANCE)] = route
+        return route
+
+    def start(self):
+        """
+        Build the routes, then keep refreshing them on a daemon thread.
+        """
+        self.refresh()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"An error occurred while refreshing withdrawal routes: {e}")
+
+
+route_table = RouteTable()
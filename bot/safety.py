@@ -2,37 +2,25 @@ import ccxt
 import concurrent.futures
 import requests
 from exchanges import *
+from universe import universe
+from itertools import islice
+from status_registry import status_registry
+
+
+# Candidates validated speculatively run their checks on this pool.
+_check_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='safety-check')
 
 
 def is_futures_tradable(target_currency):
     """
     Checks if the target currency's /USDT pair is tradable on both Binance Spot and Futures markets.
 
-    :param binance_spot: The exchange instance (e.g., ccxt.binance()) configured for spot trading.
-    :param binance_futures: The exchange instance (e.g., ccxt.binance()) configured for futures trading.
+    Reads the persisted universe index, so no API calls are made.
+
     :param target_currency: The target currency to check (e.g., 'BTC').
     :return: A tuple with boolean indicating if tradable and the market ID if tradable.
     """
-    pair = target_currency + '/USDT'
-    try:
-        # Load spot markets
-        spot_markets = binance.load_markets()
-        # Load futures markets
-        futures_markets = binance_futures.load_markets()
-
-        print(futures_markets[pair]['future'])
-
-        # Check if the pair is tradable on both spot and futures markets
-        is_spot_tradable = pair in spot_markets and spot_markets[
-            pair]['active'] and spot_markets[pair]['spot']
-        is_futures_tradable = pair in futures_markets and futures_markets[pair]['future']
-        market_id = futures_markets[pair]['id'] if is_futures_tradable else None
-
-        return is_spot_tradable and is_futures_tradable, market_id
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return False, None
-
+    return universe.is_futures_tradable(target_currency)
 
 
 def is_currency_depositable(currencies_info, currency):
@@ -93,6 +81,8 @@ def safety_check(target, network_data):
     """
     Checks if the target trade, withdrawal, and deposit are not suspended.
 
+    Statuses come from `status_registry`, so no bulk payload is downloaded per call.
+
     :param target: The target currency to check (e.g., 'BTC').
     :return: True if all checks pass, False otherwise.
     """
@@ -105,17 +95,61 @@ def safety_check(target, network_data):
         print(f"Deposit address for {target} unspecified")
         return False
 
-    # Assuming coinone and binance are already initialized ccxt exchange instances
-    if is_trade_suspended_coinone(coinone, target):
+    # Answered from the in-memory status registry; stale facts are refreshed on demand.
+    if status_registry.is_trade_suspended_coinone(target):
         print(f"Trade for {target} is suspended on Coinone.")
         return False
 
-    if is_withdrawal_suspended_binance(binance_master, target):
+    if status_registry.is_withdrawal_suspended_binance(target):
         print(f"Withdrawal for {target} is suspended on Binance.")
         return False
 
-    if not is_currency_depositable(coinone, target):
+    if status_registry.is_deposit_suspended_coinone(target):
         print(f"Deposit for {target} is suspended on Coinone.")
         return False
 
     return True
+
+
+def _check(predicate, candidate):
+    try:
+        return predicate(candidate)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return False
+
+
+def find_first_safe(candidates, predicate, width: int = 1):
+    """
+    Returns the highest-ranked candidate that passes the predicate, validating `width` candidates at once.
+
+    The next `width` candidates are checked in parallel. Results are read in rank order, so a candidate
+    is returned as soon as its own check passes and every higher-ranked check has failed; the
+    remaining lower-ranked checks are then cancelled.
+
+    :param candidates: Candidates sorted best-first (e.g., premium tuples).
+    :param predicate: A function taking a candidate and returning whether it is acceptable.
+    :param width: The number of candidates validated at once. 1 validates them one at a time.
+    :return: The highest-ranked candidate that passes, or None.
+    """
+    candidates = iter(candidates)
+    if width <= 1:
+        for candidate in candidates:
+            if _check(predicate, candidate):
+                return candidate
+        return None
+
+    while True:
+        window = list(islice(candidates, width))
+        if not window:
+            return None
+
+        futures = [_check_executor.submit(_check, predicate, candidate) for candidate in window]
+        try:
+            for candidate, future in zip(window, futures):
+                if future.result():
+                    return candidate
+        finally:
+            # Checks that already started finish in the background; their results are discarded.
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from fetch_data import take_scan_snapshot
+from http_pool import http_pool
+
+
+class ScannerService:
+    def __init__(self, fx_rate_source, interval: float = 1.0, pool=http_pool):
+        """
+        Long-running scanner that keeps taking premium snapshots over pooled keep-alive connections.
+
+        Cycles read the latest snapshot instead of scanning themselves, so the hot path pays no
+        connection setup and usually no request at all.
+
+        :param fx_rate_source: A function returning the fallback USDT to KRW rate (or None if unknown).
+        :param interval: Seconds between the start of consecutive scans.
+        :param pool: The `HttpPool` the exchange clients send requests through.
+        """
+        self.fx_rate_source = fx_rate_source
+        self.interval = interval
+        self.pool = pool
+        self.latest = None
+        self.scans = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Run one scan to open the connections, then keep scanning on a daemon thread.
+        """
+        self.scan()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def scan(self):
+        """
+        Take one snapshot and publish it as the latest.
+
+        :return: The new `PremiumSnapshot`, or None if the scan failed.
+        """
+        fx_rate = self.fx_rate_source()
+
+        start = time.monotonic()
+        try:
+            snapshot = take_scan_snapshot(fx_rate)
+        except Exception as e:
+            print(f"An error occurred during the scan: {e}")
+            self.errors += 1
+            return None
+
+        self.last_latency = time.monotonic() - start
+        self.total_latency += self.last_latency
+        self.scans += 1
+        self.latest = snapshot
+        return snapshot
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.scan()
+            self.stop_event.wait(max(0, self.interval - (time.monotonic() - started)))
+
+    def latest_snapshot(self, max_age: float = None):
+        """
+        :param max_age: The oldest snapshot accepted, in seconds.
+        :return: The latest `PremiumSnapshot`, or None if there is none recent enough.
+        """
+        snapshot = self.latest
+        if snapshot is None or (max_age is not None and snapshot.age() > max_age):
+            return None
+        return snapshot
+
+    def stats(self):
+        """
+        :return: A dictionary with scan counts, scan latencies and per-host connection reuse.
+        """
+        return {
+            'scans': self.scans,
+            'errors': self.errors,
+            'last_latency': self.last_latency,
+            'average_latency': self.total_latency / self.scans if self.scans else None,
+            'connections': self.pool.stats(),
+        }
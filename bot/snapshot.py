@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from exchanges import binance, coinone
+from premium_kernel import PremiumKernel
+from fx import fx_engine
+
+
+# Last trade price together with the top of book for a single market.
+Quote = namedtuple('Quote', ['last', 'bid', 'ask'])
+
+
+class PremiumSnapshot(namedtuple('PremiumSnapshot', ['timestamp', 'fx_rate', 'krw_quotes', 'usdt_quotes'])):
+    """
+    Immutable, timestamped view of every KRW and USDT price needed for one premium scan.
+
+    `krw_quotes` and `usdt_quotes` map a base currency (e.g. 'BTC') to a `Quote`.
+    """
+    __slots__ = ()
+
+    def age(self):
+        """
+        :return: Seconds elapsed since the snapshot was taken.
+        """
+        return time.time() - self.timestamp
+
+    def price_diff(self, target: str):
+        """
+        Calculate the price difference for a target currency from the snapshot prices.
+
+        :param target: The target currency (e.g., 'BTC').
+        :return: The same tuple as `calc_price_diff`.
+        :raises KeyError: If the target is not quoted on both exchanges.
+        """
+        ex_a_price_krw = self.krw_quotes[target].last
+        ex_b_price = self.usdt_quotes[target].last
+
+        ex_a_price = ex_a_price_krw / self.fx_rate
+
+        price_diff = ex_a_price - ex_b_price
+        price_diff_percent = price_diff / ex_b_price * 100
+
+        return price_diff, price_diff_percent, ex_a_price_krw, ex_a_price, ex_b_price, self.fx_rate
+
+    def rank(self, symbols, k=None, descending=True):
+        """
+        Rank symbols with a `PremiumKernel` loaded with the snapshot prices.
+
+        :param symbols: Currencies or trading pairs to rank (e.g., 'BTC' or 'BTC/KRW').
+        :param k: Only return the k best entries if given.
+        :param descending: Whether the highest premium comes first.
+        :return: A list of (symbol, price_diff, price_diff_percent).
+        """
+        key = tuple(symbols)
+        with _kernels_lock:
+            kernel = _kernels.get(key)
+            if kernel is None:
+                kernel = _kernels[key] = PremiumKernel(key)
+            kernel.load_quotes(self.krw_quotes, self.usdt_quotes)
+            return kernel.rank(self.fx_rate, k, descending)
+
+    def premiums(self, symbols, k=None):
+        """
+        :param symbols: Currencies or trading pairs to rank (e.g., 'BTC' or 'BTC/KRW').
+        :param k: Only return the k highest premiums if given.
+        :return: A list of (symbol, price_diff, price_diff_percent) sorted by premium in descending order.
+        """
+        return self.rank(symbols, k)
+
+    def transfer_losses(self, mediums):
+        """
+        :param mediums: The transfer medium currencies (e.g., ['XRP', 'TRX']).
+        :return: A list of (medium, price_diff, price_diff_percent) sorted by premium in ascending order.
+        """
+        return self.rank(mediums, descending=False)
+
+
+# Kernels are reused across snapshots so the symbol index and arrays are built once.
+_kernels = {}
+_kernels_lock = threading.Lock()
+
+
+def fetch_all_quotes(exchange, quote: str):
+    """
+    Fetch every ticker quoted in `quote` from the exchange with a single bulk request.
+
+    :param exchange: The exchange instance (e.g., ccxt.coinone()).
+    :param quote: The quote currency to keep (e.g., 'KRW').
+    :return: A dictionary mapping base currencies to `Quote` tuples.
+    """
+    tickers = exchange.fetch_tickers()
+
+    suffix = '/' + quote
+    quotes = {}
+    for symbol, ticker in tickers.items():
+        if not symbol.endswith(suffix):
+            continue
+        quotes[symbol[:-len(suffix)]] = Quote(
+            ticker['last'], ticker['bid'], ticker['ask'])
+    return quotes
+
+
+def take_premium_snapshot(fx_rate: float, ex_a=coinone, ex_b=binance):
+    """
+    Take a premium snapshot using one bulk ticker request per exchange.
+
+    :param fx_rate: The exchange rate from USDT to KRW, used until the FX engine has a rate.
+    :param ex_a: The KRW exchange instance (default is Coinone).
+    :param ex_b: The USDT exchange instance (default is Binance).
+    :return: A `PremiumSnapshot`.
+    """
+    krw_quotes = fetch_all_quotes(ex_a, 'KRW')
+    usdt_quotes = fetch_all_quotes(ex_b, 'USDT')
+
+    return build_premium_snapshot(fx_rate, krw_quotes, usdt_quotes)
+
+
+def build_premium_snapshot(fx_rate: float, krw_quotes, usdt_quotes):
+    """
+    Feed the FX engine from the fetched quotes and build a snapshot at its current rate.
+
+    :param fx_rate: The rate to fall back to if the FX engine has no rate yet.
+    :param krw_quotes: A dictionary mapping base currencies to `Quote` tuples on the KRW exchange.
+    :param usdt_quotes: A dictionary mapping base currencies to `Quote` tuples on the USDT exchange.
+    :return: A `PremiumSnapshot`.
+    """
+    timestamp = time.time()
+    rate = fx_engine.update_from_quotes(krw_quotes, usdt_quotes, timestamp) or fx_rate
+
+    return PremiumSnapshot(timestamp, rate, MappingProxyType(krw_quotes), MappingProxyType(usdt_quotes))
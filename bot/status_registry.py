@@ -0,0 +1,145 @@
+import threading
+import time
+
+from exchanges import binance_master, coinone
+from currency_status import refresh_coinone_currencies
+
+
+def load_coinone_trade_status():
+    """
+    :return: A dictionary mapping each Coinone KRW base currency to whether its market is active.
+    """
+    return {market['base']: market['active'] is not False
+            for market in coinone.fetch_markets() if market['quote'] == 'KRW'}
+
+
+def load_coinone_deposit_status():
+    """
+    :return: A dictionary mapping each Coinone currency to whether deposits are enabled.
+    """
+    table = refresh_coinone_currencies()
+    return {currency: table.is_depositable(currency) for currency in table.statuses}
+
+
+def load_binance_withdraw_status():
+    """
+    :return: A dictionary mapping each Binance currency to whether withdrawals are enabled.
+    """
+    return {code: bool(currency.get('withdraw')) for code, currency in binance_master.fetch_currencies().items()}
+
+
+# Bulk loaders per fact, each one request.
+STATUS_SOURCES = {
+    'coinone_trade': load_coinone_trade_status,
+    'coinone_deposit': load_coinone_deposit_status,
+    'binance_withdraw': load_binance_withdraw_status,
+}
+
+
+class CurrencyStatusRegistry:
+    def __init__(self, sources=None, refresh_interval: float = 60, max_age: float = 180):
+        """
+        In-memory index of trade, deposit and withdraw status per currency, refreshed in bulk.
+
+        Each source is one bulk request that is refreshed on a background schedule. Lookups are
+        dictionary reads; a source older than `max_age` is refreshed on demand before answering.
+
+        :param sources: A dictionary mapping fact names to bulk loaders, defaults to `STATUS_SOURCES`.
+        :param refresh_interval: Seconds between background refreshes.
+        :param max_age: The oldest fact a lookup accepts, in seconds.
+        """
+        self.sources = dict(sources or STATUS_SOURCES)
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.facts = {}
+        self.lock = threading.Lock()
+        self.source_locks = {name: threading.Lock() for name in self.sources}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def refresh(self, name, max_age: float = None):
+        """
+        Reload one source with its bulk request.
+
+        :param name: The fact name (e.g., 'coinone_trade').
+        :param max_age: If given, skip the request when another caller refreshed the source meanwhile.
+        :return: True if the source is loaded, False if the request failed.
+        """
+        with self.source_locks[name]:
+            age = self.age(name)
+            if max_age is not None and age is not None and age <= max_age:
+                return True
+            try:
+                index = self.sources[name]()
+            except Exception as e:
+                print(f"An error occurred while refreshing {name}: {e}")
+                return False
+            with self.lock:
+                self.facts[name] = (index, time.time())
+            return True
+
+    def refresh_all(self):
+        for name in self.sources:
+            self.refresh(name)
+
+    def start(self):
+        """
+        Load every source, then keep refreshing them on a daemon thread.
+        """
+        self.refresh_all()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.refresh_interval):
+            self.refresh_all()
+
+    def age(self, name):
+        """
+        :return: The age of a source in seconds, or None if it was never loaded.
+        """
+        with self.lock:
+            fact = self.facts.get(name)
+        return None if fact is None else time.time() - fact[1]
+
+    def lookup(self, name, currency, max_age: float = None):
+        """
+        :param name: The fact name (e.g., 'binance_withdraw').
+        :param currency: The currency to look up (e.g., 'BTC').
+        :param max_age: The oldest fact accepted, in seconds. Defaults to the registry's bound.
+        :return: The status for the currency, or None if the source does not list it or could not be loaded.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        age = self.age(name)
+        if age is None or age > max_age:
+            self.refresh(name, max_age)
+
+        with self.lock:
+            fact = self.facts.get(name)
+        return None if fact is None else fact[0].get(currency)
+
+    def is_trade_suspended_coinone(self, currency):
+        """
+        :return: True if the currency's KRW market on Coinone is inactive.
+        """
+        return self.lookup('coinone_trade', currency) is False
+
+    def is_deposit_suspended_coinone(self, currency):
+        """
+        :return: True if deposits are suspended on Coinone or the currency is unknown.
+        """
+        return not self.lookup('coinone_deposit', currency)
+
+    def is_withdrawal_suspended_binance(self, currency):
+        """
+        :return: True if withdrawals are suspended on Binance or the currency is unknown.
+        """
+        return not self.lookup('binance_withdraw', currency)
+
+
+status_registry = CurrencyStatusRegistry()
@@ -33,7 +33,7 @@ def fetch_all_tradable_pairs(exchange):
     :param exchange: The exchange instance (e.g., ccxt.coinone()).
     :return: A list of tradable pairs.
     """
-    markets = exchange.load_markets()
+    markets = cached_markets(exchange)
     tradable_pairs = [
         symbol for symbol in markets]
     # print(tradable_pairs)
@@ -49,7 +49,7 @@ def check_usdt_pair_tradable(exchange, currency):
     :return: Tuple containing a boolean indicating if the pair is tradable and the market ID if tradable.
     """
     symbol = currency + "/USDT"
-    markets = exchange.load_markets()
+    markets = cached_markets(exchange)
     if symbol in markets and markets[symbol]['active']:
         return True, markets[symbol]['id']
     return False, None
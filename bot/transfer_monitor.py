@@ -0,0 +1,296 @@
+import concurrent.futures
+import threading
+import time
+from collections import defaultdict
+
+from ledger import account_key, portfolio_ledger
+
+
+WITHDRAWAL = 'withdrawal'
+DEPOSIT = 'deposit'
+
+# Poll every few seconds around the expected arrival time and rarely otherwise.
+FAST_INTERVAL = 2
+SLOW_INTERVAL = 30
+NEAR_WINDOW = 60
+
+# How long a transfer takes when the caller gives no estimate, in seconds.
+DEFAULT_EXPECTED_SECONDS = 180
+
+# Records are fetched from slightly before the oldest pending transfer, in milliseconds.
+CURSOR_MARGIN = 60 * 1000
+
+# A deposit nobody has seen arrive by then is resolved as uncertain, in seconds after its watch started.
+DEPOSIT_DEADLINE_SECONDS = 6 * 60 * 60
+
+FINAL_STATUSES = ('ok', 'failed', 'canceled')
+
+# The status of a transfer whose outcome could not be confirmed. The receiving account is refetched.
+UNCERTAIN = 'uncertain'
+
+COINONE_STATUSES = {
+    'SUCCESS': 'ok',
+    'FAIL': 'failed',
+    'CANCEL': 'canceled',
+    'REJECT': 'failed',
+}
+
+
+def normalize_coinone_transaction(transaction):
+    status = 'pending'
+    for marker, mapped in COINONE_STATUSES.items():
+        if marker in (transaction.get('status') or '').upper():
+            status = mapped
+            break
+    return {
+        'id': str(transaction.get('transaction_id') or transaction.get('id')),
+        'txid': transaction.get('txid'),
+        'currency': transaction.get('currency'),
+        'amount': float(transaction['amount']) if transaction.get('amount') is not None else None,
+        'status': status,
+        'timestamp': int(transaction.get('created_at') or 0),
+        'info': transaction,
+    }
+
+
+def fetch_transfers(exchange, kind, since):
+    """
+    Fetch every withdrawal or deposit record of an account created since `since`, across all currencies.
+
+    :param exchange: The exchange instance (e.g., ccxt.binance()).
+    :param kind: WITHDRAWAL or DEPOSIT.
+    :param since: The earliest creation time in milliseconds.
+    :return: A list of ccxt-style transaction dictionaries.
+    """
+    if exchange.id == 'coinone':
+        # ccxt has no unified transfer history for Coinone, so the v2.1 endpoint is called directly.
+        response = exchange.v2_1PrivatePostTransactionCoinHistory({
+            'is_deposit': kind == DEPOSIT,
+            'from_ts': since,
+            'to_ts': int(time.time() * 1000),
+            'size': 100,
+        })
+        return [normalize_coinone_transaction(transaction) for transaction in response.get('transactions', [])]
+    if kind == WITHDRAWAL:
+        return exchange.fetch_withdrawals(None, since)
+    return exchange.fetch_deposits(None, since)
+
+
+class TransferHandle:
+    def __init__(self, exchange, kind, currency, transfer_id=None, txid=None, expected_at=None, since=None,
+                 deadline=None):
+        """
+        One pending withdrawal or deposit. `future` resolves with the final transaction record.
+
+        :param exchange: The account the record appears on.
+        :param kind: WITHDRAWAL or DEPOSIT.
+        :param currency: The currency transferred (e.g., 'XRP').
+        :param transfer_id: The withdrawal ID, if known.
+        :param txid: The on-chain transaction ID, if known.
+        :param expected_at: When the transfer is expected to complete, in seconds since the epoch.
+        :param since: The earliest time the record can have been created, in milliseconds.
+        :param deadline: When to stop waiting and resolve as uncertain, in seconds since the epoch. None waits forever.
+        """
+        self.exchange = exchange
+        self.kind = kind
+        self.currency = currency
+        self.transfer_id = None if transfer_id is None else str(transfer_id)
+        self.txid = txid
+        self.expected_at = expected_at or time.time() + DEFAULT_EXPECTED_SECONDS
+        self.since = since or int(time.time() * 1000)
+        self.deadline = deadline
+        self.record = None
+        self.future = concurrent.futures.Future()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def done(self):
+        return self.future.done()
+
+
+class TransferMonitor:
+    def __init__(self):
+        """
+        Tracks every pending withdrawal and deposit across accounts with one polling loop.
+
+        Each account is polled with one request per kind covering all currencies, from a `since` cursor at
+        the oldest pending transfer. Records are indexed by ID and txid. An account is polled every
+        FAST_INTERVAL seconds while one of its transfers is near its expected completion time and up to
+        SLOW_INTERVAL seconds otherwise.
+        """
+        self.handles = defaultdict(list)
+        self.by_id = defaultdict(dict)
+        self.by_txid = defaultdict(dict)
+        self.next_poll = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.thread = None
+
+    def watch(self, handle):
+        """
+        Start tracking a `TransferHandle`.
+
+        :return: The handle.
+        """
+        source = (account_key(handle.exchange), handle.kind)
+        with self.lock:
+            self.handles[source].append(handle)
+            next_poll = time.time() + self._delay([handle], time.time())
+            if len(self.handles[source]) == 1 or next_poll < self.next_poll[source]:
+                self.next_poll[source] = next_poll
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        self.wake_event.set()
+        return handle
+
+    def watch_withdrawal(self, exchange, currency, withdrawal_id, expected_seconds=None):
+        """
+        :return: A `TransferHandle` resolving with the final withdrawal record.
+        """
+        expected_at = time.time() + (expected_seconds or DEFAULT_EXPECTED_SECONDS)
+        return self.watch(TransferHandle(exchange, WITHDRAWAL, currency, transfer_id=withdrawal_id,
+                                         expected_at=expected_at, since=int(time.time() * 1000) - CURSOR_MARGIN))
+
+    def watch_deposit(self, exchange, currency, txid, expected_seconds=None,
+                      deadline_seconds=DEPOSIT_DEADLINE_SECONDS):
+        """
+        :return: A `TransferHandle` resolving with the final deposit record, or with an UNCERTAIN record
+            if none arrives within `deadline_seconds`.
+        """
+        now = time.time()
+        return self.watch(TransferHandle(exchange, DEPOSIT, currency, txid=txid,
+                                         expected_at=now + (expected_seconds or NEAR_WINDOW),
+                                         since=int(now * 1000) - CURSOR_MARGIN, deadline=now + deadline_seconds))
+
+    def watch_transfer(self, from_exchange, to_exchange, currency, withdrawal_id, expected_seconds=None):
+        """
+        Track a withdrawal and then the deposit with its txid on the receiving account.
+
+        :return: A `concurrent.futures.Future` resolving with the final deposit record, or with the withdrawal
+            record if the withdrawal did not succeed. A withdrawal without a txid cannot be matched to its
+            deposit, so it resolves with an UNCERTAIN copy of the withdrawal record.
+        """
+        future = concurrent.futures.Future()
+        withdrawal = self.watch_withdrawal(from_exchange, currency, withdrawal_id, expected_seconds)
+
+        def on_withdrawal(done):
+            try:
+                record = done.result()
+            except Exception as e:
+                future.set_exception(e)
+                return
+            if record['status'] != 'ok':
+                future.set_result(record)
+                return
+            if not record.get('txid'):
+                print(f"Withdrawal {withdrawal_id} of {currency} has no txid; its deposit cannot be tracked.")
+                portfolio_ledger.mark_uncertain(to_exchange)
+                future.set_result(dict(record, status=UNCERTAIN))
+                return
+            deposit = self.watch_deposit(to_exchange, currency, record['txid'])
+            deposit.future.add_done_callback(lambda done: (
+                future.set_exception(done.exception()) if done.exception() else future.set_result(done.result())))
+
+        withdrawal.future.add_done_callback(on_withdrawal)
+        return future
+
+    def pending(self):
+        with self.lock:
+            return sum(len(handles) for handles in self.handles.values())
+
+    def _delay(self, handles, now):
+        delays = []
+        for handle in handles:
+            until = handle.expected_at - now
+            if abs(until) <= NEAR_WINDOW:
+                delays.append(FAST_INTERVAL)
+            elif until > 0:
+                delays.append(min(SLOW_INTERVAL, until - NEAR_WINDOW))
+            else:
+                delays.append(SLOW_INTERVAL)
+        return max(FAST_INTERVAL, min(delays)) if delays else SLOW_INTERVAL
+
+    def _run(self):
+        while True:
+            with self.lock:
+                due = min((self.next_poll[source] for source, handles in self.handles.items() if handles),
+                          default=None)
+            timeout = None if due is None else max(0, due - time.time())
+            self.wake_event.wait(timeout)
+            self.wake_event.clear()
+
+            now = time.time()
+            self._expire(now)
+            with self.lock:
+                sources = [source for source, handles in self.handles.items()
+                           if handles and self.next_poll[source] <= now]
+            for source in sources:
+                try:
+                    self.poll(source)
+                except Exception as e:
+                    print(f"An error occurred while polling {source[1]}s on {source[0][0]}: {e}")
+                with self.lock:
+                    self.next_poll[source] = time.time() + self._delay(self.handles[source], time.time())
+
+    def _expire(self, now):
+        with self.lock:
+            expired = []
+            for handles in self.handles.values():
+                for handle in list(handles):
+                    if handle.deadline is not None and handle.deadline <= now:
+                        handles.remove(handle)
+                        expired.append(handle)
+
+        for handle in expired:
+            print(f"{handle.kind.capitalize()} of {handle.currency} on {handle.exchange.id} "
+                  f"was not seen before its deadline.")
+            # The transfer may have landed unnoticed, so the next balance read refetches the account.
+            portfolio_ledger.mark_uncertain(handle.exchange)
+            handle.record = dict(handle.record or {}, id=handle.transfer_id, txid=handle.txid,
+                                 currency=handle.currency, amount=None, status=UNCERTAIN)
+            handle.future.set_result(handle.record)
+
+    def poll(self, source):
+        """
+        Fetch one account's records of one kind since its oldest pending transfer and resolve finished handles.
+        """
+        with self.lock:
+            handles = list(self.handles[source])
+        if not handles:
+            return
+        since = min(handle.since for handle in handles)
+        records = fetch_transfers(handles[0].exchange, source[1], since)
+        self.requests += 1
+
+        with self.lock:
+            for record in records:
+                if record.get('id') is not None:
+                    self.by_id[source][str(record['id'])] = record
+                if record.get('txid'):
+                    self.by_txid[source][record['txid']] = record
+
+            finished = []
+            for handle in handles:
+                record = (self.by_id[source].get(handle.transfer_id) if handle.transfer_id
+                          else self.by_txid[source].get(handle.txid))
+                if record is None:
+                    continue
+                handle.record = record
+                if record['status'] in FINAL_STATUSES:
+                    finished.append(handle)
+                    self.handles[source].remove(handle)
+
+            # Drop indexed records nobody is waiting for.
+            if not self.handles[source]:
+                self.by_id[source].clear()
+                self.by_txid[source].clear()
+
+        for handle in finished:
+            print(f"{handle.kind.capitalize()} of {handle.currency} on {source[0][0]}: {handle.record['status']}")
+            handle.future.set_result(handle.record)
+
+
+transfer_monitor = TransferMonitor()
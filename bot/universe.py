@@ -0,0 +1,212 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from exchanges import binance, binance_futures, coinone
+from cache import cached_markets
+
+
+UNIVERSE_FILE = 'universe.json'
+ADDRESS_NETWORK_FILE = 'address_network.csv'
+
+# Seconds between background refreshes of the index.
+UNIVERSE_REFRESH_INTERVAL = 3600
+
+# One row per currency that is tradable on every venue and listed in address_network.csv.
+UniverseEntry = namedtuple('UniverseEntry', [
+    'currency', 'coinone_id', 'spot_id', 'futures_id',
+    'coinone_amount_precision', 'coinone_price_precision',
+    'spot_amount_precision', 'spot_price_precision',
+    'futures_amount_precision', 'futures_price_precision'])
+
+
+class UniverseIndex:
+    def __init__(self, entries=None, fingerprints=None):
+        """
+        Precomputed intersection of Coinone KRW, Binance spot USDT and Binance USDT-M futures markets
+        with the currencies in address_network.csv. Lookups are dictionary reads and make no API calls.
+
+        :param entries: A dictionary mapping currencies to `UniverseEntry` tuples.
+        :param fingerprints: Hashes of the upstream inputs the entries were built from.
+        """
+        self.entries = {}
+        self.fingerprints = fingerprints or {}
+        # Updated in place, so references handed out by `coinone_symbols` stay current.
+        self.symbols = []
+        self.set_entries(entries or {})
+
+    def set_entries(self, entries):
+        """
+        Swap in a new entry dictionary. Readers see either the old or the new one, never a partial update.
+        """
+        self.entries = entries
+        self.symbols[:] = [currency + '/KRW' for currency in entries]
+
+    def __contains__(self, currency):
+        return currency in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, currency):
+        """
+        :return: The `UniverseEntry` for the currency, or None.
+        """
+        return self.entries.get(currency)
+
+    def currencies(self):
+        return list(self.entries)
+
+    def coinone_symbols(self):
+        """
+        :return: The Coinone KRW trading pairs in the universe (e.g., ['BTC/KRW', ...]).
+            The list is updated in place on every refresh.
+        """
+        return self.symbols
+
+    def is_futures_tradable(self, currency):
+        """
+        :return: A tuple with a boolean indicating if the currency is in the universe and its futures market ID.
+        """
+        entry = self.entries.get(currency)
+        return (True, entry.futures_id) if entry else (False, None)
+
+    def save(self, path=UNIVERSE_FILE):
+        """
+        Write the index as compact row-oriented JSON.
+        """
+        data = {
+            'fingerprints': self.fingerprints,
+            'fields': UniverseEntry._fields,
+            'rows': [list(entry) for entry in self.entries.values()],
+        }
+        with open(path, mode='w') as file:
+            json.dump(data, file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path=UNIVERSE_FILE):
+        """
+        Read an index written by `save`. Returns an empty index if the file does not exist.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, mode='r') as file:
+            data = json.load(file)
+        if tuple(data['fields']) != UniverseEntry._fields:
+            print(f"Universe file {path} has an outdated layout and will be rebuilt.")
+            return cls()
+        entries = {row[0]: UniverseEntry(*row) for row in data['rows']}
+        return cls(entries, data['fingerprints'])
+
+
+def _fingerprint(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _market_view(markets, quote, kind):
+    # Only the fields the universe depends on, keyed by base currency.
+    view = {}
+    for market in markets.values():
+        if market['quote'] != quote or not market.get(kind) or market.get('active') is False:
+            continue
+        if kind == 'swap' and not market.get('linear'):
+            continue
+        precision = market['precision']
+        view[market['base']] = (market['id'], precision.get('amount'), precision.get('price'))
+    return view
+
+
+def _read_csv_currencies(csv_path):
+    with open(csv_path, mode='r') as file:
+        return sorted(row['Currency'] for row in csv.DictReader(file))
+
+
+def refresh_universe(index=None, path=UNIVERSE_FILE, csv_path=ADDRESS_NETWORK_FILE, max_age=None):
+    """
+    Update the universe index if any upstream market list or the CSV changed since it was built.
+
+    Each venue's markets are read once from the shared cache and reduced to the fields the index depends on.
+    If none of their fingerprints changed, nothing else is done. Otherwise only the currencies whose
+    entries differ are added, replaced or removed, on a copy that is swapped in at once. The file is
+    rewritten to record the new fingerprints.
+
+    :param index: The index to refresh. Loaded from `path` if omitted.
+    :param path: The file the index is persisted to.
+    :param csv_path: The address_network.csv file.
+    :param max_age: The oldest cached market list accepted, in seconds.
+    :return: The refreshed `UniverseIndex`.
+    """
+    if index is None:
+        index = UniverseIndex.load(path)
+
+    views = {
+        'coinone': _market_view(cached_markets(coinone, max_age), 'KRW', 'spot'),
+        'spot': _market_view(cached_markets(binance, max_age), 'USDT', 'spot'),
+        'futures': _market_view(cached_markets(binance_futures, max_age), 'USDT', 'swap'),
+        'csv': {currency: True for currency in _read_csv_currencies(csv_path)},
+    }
+    fingerprints = {name: _fingerprint(view) for name, view in views.items()}
+    if fingerprints == index.fingerprints:
+        return index
+
+    currencies = set(views['csv']) & set(views['coinone']) & set(views['spot']) & set(views['futures'])
+
+    changes = {}
+    for currency in sorted(currencies):
+        coinone_id, coinone_amount, coinone_price = views['coinone'][currency]
+        spot_id, spot_amount, spot_price = views['spot'][currency]
+        futures_id, futures_amount, futures_price = views['futures'][currency]
+        entry = UniverseEntry(currency, coinone_id, spot_id, futures_id,
+                              coinone_amount, coinone_price, spot_amount, spot_price,
+                              futures_amount, futures_price)
+        if index.entries.get(currency) != entry:
+            changes[currency] = entry
+    removed = set(index.entries) - currencies
+
+    index.fingerprints = fingerprints
+    if changes or removed:
+        entries = {currency: entry for currency, entry in index.entries.items() if currency not in removed}
+        entries.update(changes)
+        index.set_entries(entries)
+        print(f"Universe refreshed: {len(entries)} currencies, {len(changes)} changed, {len(removed)} removed.")
+    # Saved even when no entry changed, so the next refresh stops at the fingerprint check.
+    index.save(path)
+    return index
+
+
+def start_universe_refresh(index=None, interval: float = UNIVERSE_REFRESH_INTERVAL):
+    """
+    Build the index now if it is empty, then keep refreshing it on a daemon thread.
+
+    :param index: The index to refresh. Defaults to `universe`.
+    :param interval: Seconds between refreshes.
+    :return: The refresh thread.
+    """
+    if index is None:
+        index = universe
+    if not len(index):
+        refresh_universe(index)
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                refresh_universe(index)
+            except Exception as e:
+                print(f"An error occurred while refreshing the universe: {e}")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+# The index used during cycles, kept current by `start_universe_refresh`.
+universe = UniverseIndex.load()
+
+
+if __name__ == "__main__":
+    refresh_universe(universe)